@@ -18,9 +18,12 @@ import datetime
 import json
 import logging
 import re
+import time
 from base64 import b64encode
-from functools import partial
+from functools import lru_cache, partial
+from os import environ
 from typing import (
+    TYPE_CHECKING,
     Any,
     Mapping,
     MutableMapping,
@@ -30,41 +33,55 @@ from typing import (
     cast,
 )
 
-import google.auth
-from google.api.monitored_resource_pb2 import (  # pylint: disable = no-name-in-module
-    MonitoredResource,
-)
-from google.cloud.logging_v2.services.logging_service_v2 import (
-    LoggingServiceV2Client,
-)
-from google.cloud.logging_v2.services.logging_service_v2.transports.grpc import (
-    LoggingServiceV2GrpcTransport,
-)
-from google.cloud.logging_v2.types.log_entry import LogEntry
-from google.cloud.logging_v2.types.logging import WriteLogEntriesRequest
-from google.logging.type.log_severity_pb2 import (  # pylint: disable = no-name-in-module
-    LogSeverity,
-)
-from google.protobuf.json_format import MessageToDict
-from google.protobuf.struct_pb2 import (  # pylint: disable = no-name-in-module
-    Struct,
-)
-from google.protobuf.timestamp_pb2 import (  # pylint: disable = no-name-in-module
-    Timestamp,
+from opentelemetry.exporter.cloud_logging.environment_variables import (
+    OTEL_EXPORTER_GCP_LOGGING_COMPRESSION,
 )
 from opentelemetry.exporter.cloud_logging.version import __version__
+from opentelemetry.metrics import MeterProvider
+from opentelemetry.resourcedetector.gcp_resource_detector._lazy import (
+    LazyModule,
+)
 from opentelemetry.resourcedetector.gcp_resource_detector._mapping import (
     get_monitored_resource,
 )
+from opentelemetry.resourcedetector.gcp_resource_detector._self_telemetry import (
+    ExporterTelemetry,
+)
 from opentelemetry.sdk import version as opentelemetry_sdk_version
 from opentelemetry.sdk._logs import LogData
 from opentelemetry.sdk._logs.export import LogExporter
 from opentelemetry.sdk.resources import Resource
 from opentelemetry.trace import format_span_id, format_trace_id
 from opentelemetry.util.types import AnyValue
-from proto.datetime_helpers import (  # type: ignore[import]
-    DatetimeWithNanoseconds,
-)
+
+if TYPE_CHECKING:
+    import grpc
+    from google.api import (  # pylint: disable = no-name-in-module
+        monitored_resource_pb2,
+    )
+    from google.api.monitored_resource_pb2 import (  # pylint: disable = no-name-in-module
+        MonitoredResource,
+    )
+    from google.cloud.logging_v2 import types as logging_types
+    from google.cloud.logging_v2.services.logging_service_v2 import (
+        LoggingServiceV2Client,
+    )
+    from google.cloud.logging_v2.types.log_entry import LogEntry
+    from google.logging.type import (  # pylint: disable = no-name-in-module
+        log_severity_pb2,
+    )
+    from google.protobuf import json_format, struct_pb2, timestamp_pb2
+    from proto.datetime_helpers import (  # type: ignore[import]
+        DatetimeWithNanoseconds,
+    )
+else:
+    # imported on first use, which is also when writing to a file
+    monitored_resource_pb2 = LazyModule("google.api.monitored_resource_pb2")
+    logging_types = LazyModule("google.cloud.logging_v2.types")
+    log_severity_pb2 = LazyModule("google.logging.type.log_severity_pb2")
+    json_format = LazyModule("google.protobuf.json_format")
+    struct_pb2 = LazyModule("google.protobuf.struct_pb2")
+    timestamp_pb2 = LazyModule("google.protobuf.timestamp_pb2")
 
 DEFAULT_MAX_ENTRY_SIZE = 256000  # 256 KB
 DEFAULT_MAX_REQUEST_SIZE = 10000000  # 10 MB
@@ -86,35 +103,73 @@ _OPTIONS = [
     ("grpc.primary_user_agent", _USER_AGENT),
 ]
 
+
+def _pooled_channel(compression: Optional[grpc.Compression]) -> grpc.Channel:
+    """Channel shared with the other exporters created without a client, see
+    _channel_pool."""
+    # pylint: disable=import-outside-toplevel
+    from google.cloud.logging_v2.services.logging_service_v2.transports.grpc import (
+        LoggingServiceV2GrpcTransport,
+    )
+    from opentelemetry.resourcedetector.gcp_resource_detector._channel_pool import (
+        CHANNEL_POOL,
+    )
+
+    credentials = CHANNEL_POOL.default_credentials()
+
+    def create_channel() -> grpc.Channel:
+        return LoggingServiceV2GrpcTransport.create_channel(
+            credentials=credentials,
+            options=_OPTIONS,
+            compression=compression,
+        )
+
+    return CHANNEL_POOL.channel(
+        (LoggingServiceV2GrpcTransport.DEFAULT_HOST, credentials, compression),
+        create_channel,
+    )
+
+
 # severityMapping maps the integer severity level values from OTel [0-24]
 # to matching Cloud Logging severity levels.
-SEVERITY_MAPPING: dict[int, int] = {
-    0: LogSeverity.DEFAULT,
-    1: LogSeverity.DEBUG,
-    2: LogSeverity.DEBUG,
-    3: LogSeverity.DEBUG,
-    4: LogSeverity.DEBUG,
-    5: LogSeverity.DEBUG,
-    6: LogSeverity.DEBUG,
-    7: LogSeverity.DEBUG,
-    8: LogSeverity.DEBUG,
-    9: LogSeverity.INFO,
-    10: LogSeverity.INFO,
-    11: LogSeverity.NOTICE,
-    12: LogSeverity.NOTICE,
-    13: LogSeverity.WARNING,
-    14: LogSeverity.WARNING,
-    15: LogSeverity.WARNING,
-    16: LogSeverity.WARNING,
-    17: LogSeverity.ERROR,
-    18: LogSeverity.ERROR,
-    19: LogSeverity.ERROR,
-    20: LogSeverity.ERROR,
-    21: LogSeverity.CRITICAL,
-    22: LogSeverity.CRITICAL,
-    23: LogSeverity.ALERT,
-    24: LogSeverity.EMERGENCY,
-}
+@lru_cache(maxsize=None)
+def _severity_mapping() -> dict[int, int]:
+    LogSeverity = log_severity_pb2.LogSeverity  # pylint: disable=invalid-name
+    return {
+        0: LogSeverity.DEFAULT,
+        1: LogSeverity.DEBUG,
+        2: LogSeverity.DEBUG,
+        3: LogSeverity.DEBUG,
+        4: LogSeverity.DEBUG,
+        5: LogSeverity.DEBUG,
+        6: LogSeverity.DEBUG,
+        7: LogSeverity.DEBUG,
+        8: LogSeverity.DEBUG,
+        9: LogSeverity.INFO,
+        10: LogSeverity.INFO,
+        11: LogSeverity.NOTICE,
+        12: LogSeverity.NOTICE,
+        13: LogSeverity.WARNING,
+        14: LogSeverity.WARNING,
+        15: LogSeverity.WARNING,
+        16: LogSeverity.WARNING,
+        17: LogSeverity.ERROR,
+        18: LogSeverity.ERROR,
+        19: LogSeverity.ERROR,
+        20: LogSeverity.ERROR,
+        21: LogSeverity.CRITICAL,
+        22: LogSeverity.CRITICAL,
+        23: LogSeverity.ALERT,
+        24: LogSeverity.EMERGENCY,
+    }
+
+
+def __getattr__(name: str) -> Any:
+    # SEVERITY_MAPPING needs the client library, so it is built on first access
+    if name == "SEVERITY_MAPPING":
+        return _severity_mapping()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 INVALID_LOG_NAME_MESSAGE = "%s is not a valid log name. log name must be <512 characters and only contain characters: A-Za-z0-9/-_."
 
@@ -183,7 +238,7 @@ def _sanitized_body(
 
 
 def _set_payload_in_log_entry(log_entry: LogEntry, body: AnyValue):
-    struct = Struct()
+    struct = struct_pb2.Struct()
     if isinstance(body, Mapping):
         sanitized = _sanitized_body(body)
         try:
@@ -232,7 +287,7 @@ def _get_monitored_resource(
         location = match.group("location")
         agent_engine_id = match.group("agent_engine_id")
         # https://cloud.google.com/monitoring/api/resources#tag_aiplatform.googleapis.com/ReasoningEngine
-        return MonitoredResource(
+        return monitored_resource_pb2.MonitoredResource(
             type="aiplatform.googleapis.com/ReasoningEngine",
             labels={
                 # Intentionally omit the project ID
@@ -245,7 +300,7 @@ def _get_monitored_resource(
     if not monitored_resource_data:
         return None
 
-    return MonitoredResource(
+    return monitored_resource_pb2.MonitoredResource(
         type=monitored_resource_data.type,
         labels=monitored_resource_data.labels,
     )
@@ -259,6 +314,8 @@ class CloudLoggingExporter(LogExporter):
         client: Optional[LoggingServiceV2Client] = None,
         *,
         structured_json_file: Optional[TextIO] = None,
+        compression: Optional[grpc.Compression] = None,
+        meter_provider: Optional[MeterProvider] = None,
     ) -> None:
         """Create a CloudLoggingExporter
 
@@ -276,10 +333,31 @@ class CloudLoggingExporter(LogExporter):
                 <https://cloud.google.com/logging/docs/structured-logging>`_. If provided,
                 ``client`` must not be provided and logs will only be written to the file-like
                 object.
+            compression: Compression of the requests sent on the channel created when no
+                ``client`` is given, e.g. ``grpc.Compression.Gzip``. Alternatively, can be
+                configured with :envvar:`OTEL_EXPORTER_GCP_LOGGING_COMPRESSION`. Not
+                compressed by default.
+            meter_provider: MeterProvider to report the exporter's own metrics with, as
+                the ``gcp.exporter.*`` instruments of the
+                ``opentelemetry.exporter.cloud_logging`` meter: export durations, request
+                sizes and log entries per request, failed requests by gRPC status code,
+                and log entries dropped for exceeding Cloud Logging's size limit. Not
+                reported by default.
         """
 
+        self._telemetry: Optional[ExporterTelemetry] = None
+        if meter_provider is not None:
+            self._telemetry = ExporterTelemetry(
+                meter_provider,
+                "opentelemetry.exporter.cloud_logging",
+                __version__,
+                "{entry}",
+            )
+
         self.project_id: str
         if not project_id:
+            import google.auth  # pylint: disable=import-outside-toplevel
+
             _, default_project_id = google.auth.default()
             self.project_id = str(default_project_id)
         else:
@@ -300,13 +378,27 @@ class CloudLoggingExporter(LogExporter):
                 self._write_log_entries_to_file, structured_json_file
             )
         else:
-            client = client or LoggingServiceV2Client(
-                transport=LoggingServiceV2GrpcTransport(
-                    channel=LoggingServiceV2GrpcTransport.create_channel(
-                        options=_OPTIONS,
+            if client is None:
+                # pylint: disable=import-outside-toplevel
+                from google.cloud.logging_v2.services.logging_service_v2 import (
+                    LoggingServiceV2Client,
+                )
+                from google.cloud.logging_v2.services.logging_service_v2.transports.grpc import (
+                    LoggingServiceV2GrpcTransport,
+                )
+                from opentelemetry.resourcedetector.gcp_resource_detector._channel_pool import (
+                    compression_from_env,
+                )
+
+                if compression is None:
+                    compression = compression_from_env(
+                        OTEL_EXPORTER_GCP_LOGGING_COMPRESSION
+                    )
+                client = LoggingServiceV2Client(
+                    transport=LoggingServiceV2GrpcTransport(
+                        channel=_pooled_channel(compression)
                     )
                 )
-            )
             self._write_log_entries = partial(
                 self._write_log_entries_to_client, client
             )
@@ -321,10 +413,18 @@ class CloudLoggingExporter(LogExporter):
         return self.default_log_name
 
     def export(self, batch: Sequence[LogData]):
+        start = time.monotonic()
+        try:
+            self._export(batch)
+        finally:
+            if self._telemetry is not None:
+                self._telemetry.record_export(time.monotonic() - start)
+
+    def _export(self, batch: Sequence[LogData]) -> None:
         now = datetime.datetime.now()
         log_entries = []
         for log_data in batch:
-            log_entry = LogEntry()
+            log_entry = logging_types.LogEntry()
             log_record = log_data.log_record
             attributes = log_record.attributes or {}
             project_id = str(
@@ -333,7 +433,7 @@ class CloudLoggingExporter(LogExporter):
             log_entry.log_name = f"projects/{project_id}/logs/{self.pick_log_id(attributes.get(LOG_NAME_ATTRIBUTE_KEY), log_record.event_name)}"
             # If timestamp is unset fall back to observed_time_unix_nano as recommended,
             # see https://github.com/open-telemetry/opentelemetry-proto/blob/4abbb78/opentelemetry/proto/logs/v1/logs.proto#L176-L179
-            ts = Timestamp()
+            ts = timestamp_pb2.Timestamp()
             if log_record.timestamp or log_record.observed_timestamp:
                 ts.FromNanoseconds(
                     log_record.timestamp or log_record.observed_timestamp
@@ -355,9 +455,9 @@ class CloudLoggingExporter(LogExporter):
                 log_entry.span_id = format_span_id(log_record.span_id)
             if (
                 log_record.severity_number
-                and log_record.severity_number.value in SEVERITY_MAPPING
+                and log_record.severity_number.value in _severity_mapping()
             ):
-                log_entry.severity = SEVERITY_MAPPING[  # type: ignore[assignment]
+                log_entry.severity = _severity_mapping()[  # type: ignore[assignment]
                     log_record.severity_number.value  # type: ignore[index]
                 ]
             log_entry.labels = {
@@ -393,11 +493,11 @@ class CloudLoggingExporter(LogExporter):
             # - logging.googleapis.com/insertId
 
             # https://cloud.google.com/logging/docs/agent/logging/configuration#timestamp-processing
-            timestamp = cast(DatetimeWithNanoseconds, entry.timestamp)
+            timestamp = cast("DatetimeWithNanoseconds", entry.timestamp)
             json_dict["time"] = timestamp.rfc3339()
 
-            json_dict["severity"] = LogSeverity.Name(
-                cast(LogSeverity.ValueType, entry.severity)
+            json_dict["severity"] = log_severity_pb2.LogSeverity.Name(
+                cast("log_severity_pb2.LogSeverity.ValueType", entry.severity)
             )
             json_dict["logging.googleapis.com/labels"] = dict(entry.labels)
             json_dict["logging.googleapis.com/spanId"] = entry.span_id
@@ -410,7 +510,9 @@ class CloudLoggingExporter(LogExporter):
                 json_dict["message"] = entry.text_payload
             if entry.json_payload:
                 json_dict.update(
-                    MessageToDict(LogEntry.pb(entry).json_payload)
+                    json_format.MessageToDict(
+                        logging_types.LogEntry.pb(entry).json_payload
+                    )
                 )
 
             # Use dumps to avoid invalid json written to the stream if serialization fails for any reason
@@ -419,48 +521,52 @@ class CloudLoggingExporter(LogExporter):
                 + "\n"
             )
 
-    @staticmethod
     def _write_log_entries_to_client(
-        client: LoggingServiceV2Client, log_entries: list[LogEntry]
+        self, client: LoggingServiceV2Client, log_entries: list[LogEntry]
     ):
+        def write(batch: list[LogEntry]) -> None:
+            request = logging_types.WriteLogEntriesRequest(
+                entries=batch, partial_success=True
+            )
+            if self._telemetry is not None:
+                self._telemetry.record_request(
+                    logging_types.WriteLogEntriesRequest.pb(
+                        request
+                    ).ByteSize(),
+                    len(batch),
+                )
+            try:
+                client.write_log_entries(request)
+            # pylint: disable=broad-except
+            except Exception as ex:
+                logging.error(
+                    "Error while writing to Cloud Logging", exc_info=ex
+                )
+                if self._telemetry is not None:
+                    self._telemetry.record_failure(ex)
+
         batch: list[LogEntry] = []
         batch_byte_size = 0
         for entry in log_entries:
-            msg_size = LogEntry.pb(entry).ByteSize()
+            msg_size = logging_types.LogEntry.pb(entry).ByteSize()
             if msg_size > DEFAULT_MAX_ENTRY_SIZE:
                 logging.warning(
                     "Cannot write log that is %s bytes which exceeds Cloud Logging's maximum limit of %s bytes.",
                     msg_size,
                     DEFAULT_MAX_ENTRY_SIZE,
                 )
+                if self._telemetry is not None:
+                    self._telemetry.record_dropped("entry", 1)
                 continue
             if msg_size + batch_byte_size > DEFAULT_MAX_REQUEST_SIZE:
-                try:
-                    client.write_log_entries(
-                        WriteLogEntriesRequest(
-                            entries=batch, partial_success=True
-                        )
-                    )
-                # pylint: disable=broad-except
-                except Exception as ex:
-                    logging.error(
-                        "Error while writing to Cloud Logging", exc_info=ex
-                    )
+                write(batch)
                 batch = [entry]
                 batch_byte_size = msg_size
             else:
                 batch.append(entry)
                 batch_byte_size += msg_size
         if batch:
-            try:
-                client.write_log_entries(
-                    WriteLogEntriesRequest(entries=batch, partial_success=True)
-                )
-            # pylint: disable=broad-except
-            except Exception as ex:
-                logging.error(
-                    "Error while writing to Cloud Logging", exc_info=ex
-                )
+            write(batch)
 
     def shutdown(self):
         pass
@@ -19,3 +19,12 @@ OTEL_EXPORTER_GCP_LOGGING_PROJECT_ID = "OTEL_EXPORTER_GCP_LOGGING_PROJECT_ID"
     GCP project ID for the exporter to send logs to. Equivalent to constructor parameter to
     :class:`opentelemetry.exporter.cloud_logging.CloudLoggingExporter`.
 """
+
+OTEL_EXPORTER_GCP_LOGGING_COMPRESSION = "OTEL_EXPORTER_GCP_LOGGING_COMPRESSION"
+"""
+.. envvar:: OTEL_EXPORTER_GCP_LOGGING_COMPRESSION
+
+    Compression of the requests sent to Cloud Logging, one of ``gzip``, ``deflate`` or
+    ``none``. Equivalent to constructor parameter to
+    :class:`opentelemetry.exporter.cloud_logging.CloudLoggingExporter`.
+"""
@@ -16,12 +16,13 @@ from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from functools import partial
 from io import StringIO
-from typing import Callable, Iterable, List, Sequence, cast
+from typing import Any, Callable, Iterable, List, Optional, Sequence, cast
 from unittest.mock import patch
 
 import grpc
 import pytest
 from fixtures.snapshot_logging_calls import WriteLogEntryCallSnapshotExtension
+from google.auth.credentials import AnonymousCredentials, Credentials
 from google.cloud.logging_v2.services.logging_service_v2.transports.grpc import (
     LoggingServiceV2GrpcTransport,
 )
@@ -37,6 +38,9 @@ from grpc import (
     unary_unary_rpc_method_handler,
 )
 from opentelemetry.exporter.cloud_logging import CloudLoggingExporter
+from opentelemetry.resourcedetector.gcp_resource_detector._channel_pool import (
+    CHANNEL_POOL,
+)
 from opentelemetry.sdk._logs import LogData
 from syrupy.assertion import SnapshotAssertion
 from syrupy.extensions.json import JSONSnapshotExtension
@@ -100,6 +104,12 @@ class CloudLoggingFake:
     get_calls: Callable[[], List[WriteLogEntriesCall]]
 
 
+def _insecure_channel(
+    target: str, credentials: Optional[Credentials] = None, **kwargs: Any
+) -> grpc.Channel:
+    return insecure_channel(target, **kwargs)
+
+
 @pytest.fixture(name="cloudloggingfake")
 def fixture_cloudloggingfake() -> Iterable[CloudLoggingFake]:
     """Fixture providing faked Cloud Logging api with captured requests"""
@@ -119,7 +129,10 @@ def fixture_cloudloggingfake() -> Iterable[CloudLoggingFake]:
             with patch.object(
                 LoggingServiceV2GrpcTransport,
                 "create_channel",
-                partial(insecure_channel, target=f"localhost:{port}"),
+                partial(_insecure_channel, f"localhost:{port}"),
+            ), patch(
+                "google.auth.default",
+                return_value=(AnonymousCredentials(), None),
             ):
                 yield CloudLoggingFake(
                     exporter=CloudLoggingExporter(
@@ -129,6 +142,8 @@ def fixture_cloudloggingfake() -> Iterable[CloudLoggingFake]:
                     get_calls=handler.get_calls,
                 )
     finally:
+        # don't leak the channel to the fake into other tests
+        CHANNEL_POOL.clear()
         if server:
             server.stop(None)
 
@@ -28,26 +28,39 @@ Be sure to review the changes.
 import re
 from io import StringIO
 from textwrap import dedent
-from typing import Mapping, Union
+from typing import Iterable, Mapping, Optional, Union
+from unittest import mock
 
+import grpc
 import pytest
 from fixtures.cloud_logging_fake import (
     CloudLoggingFake,
     ExportAndAssertSnapshot,
 )
+from google.api_core.exceptions import ServiceUnavailable
 from google.auth.credentials import AnonymousCredentials
 from google.cloud.logging_v2.services.logging_service_v2 import (
     LoggingServiceV2Client,
 )
+from google.cloud.logging_v2.services.logging_service_v2.transports.grpc import (
+    LoggingServiceV2GrpcTransport,
+)
+from google.cloud.logging_v2.types import WriteLogEntriesRequest
 from opentelemetry._logs.severity import SeverityNumber
 from opentelemetry.exporter.cloud_logging import (
     CloudLoggingExporter,
     is_log_id_valid,
 )
+from opentelemetry.resourcedetector.gcp_resource_detector._channel_pool import (
+    CHANNEL_POOL,
+)
 from opentelemetry.sdk._logs import LogData
 from opentelemetry.sdk._logs._internal import LogRecord
+from opentelemetry.sdk.metrics import MeterProvider
+from opentelemetry.sdk.metrics.export import InMemoryMetricReader
 from opentelemetry.sdk.resources import Resource
 from opentelemetry.sdk.util.instrumentation import InstrumentationScope
+from test_common.metrics import metric_points
 
 PROJECT_ID = "fakeproject"
 
@@ -143,6 +156,60 @@ def test_too_large_log_raises_warning(caplog) -> None:
     )
 
 
+@pytest.fixture(name="clear_channel_pool")
+def fixture_clear_channel_pool() -> Iterable[None]:
+    CHANNEL_POOL.clear()
+    yield
+    CHANNEL_POOL.clear()
+
+
+@pytest.mark.parametrize(
+    "kwargs, environ, expected",
+    [
+        pytest.param({}, {}, None, id="default"),
+        pytest.param(
+            {"compression": grpc.Compression.Gzip},
+            {},
+            grpc.Compression.Gzip,
+            id="arg",
+        ),
+        pytest.param(
+            {},
+            {"OTEL_EXPORTER_GCP_LOGGING_COMPRESSION": "Deflate"},
+            grpc.Compression.Deflate,
+            id="env",
+        ),
+        pytest.param(
+            {"compression": grpc.Compression.NoCompression},
+            {"OTEL_EXPORTER_GCP_LOGGING_COMPRESSION": "gzip"},
+            grpc.Compression.NoCompression,
+            id="arg_overrides_env",
+        ),
+    ],
+)
+def test_compression(
+    kwargs: dict,
+    environ: dict,
+    expected: Optional[grpc.Compression],
+    clear_channel_pool: None,
+) -> None:
+    with mock.patch.dict("os.environ", environ), mock.patch(
+        "google.auth.default", return_value=(AnonymousCredentials(), None)
+    ), mock.patch.object(
+        LoggingServiceV2GrpcTransport, "create_channel"
+    ) as create_channel:
+        CloudLoggingExporter(project_id=PROJECT_ID, **kwargs)
+
+    assert create_channel.call_args.kwargs["compression"] == expected
+
+
+def test_invalid_compression_env() -> None:
+    with mock.patch.dict(
+        "os.environ", {"OTEL_EXPORTER_GCP_LOGGING_COMPRESSION": "brotli"}
+    ), pytest.raises(ValueError):
+        CloudLoggingExporter(project_id=PROJECT_ID)
+
+
 def test_user_agent(cloudloggingfake: CloudLoggingFake) -> None:
     cloudloggingfake.exporter.export(
         [
@@ -423,3 +490,62 @@ def test_structured_json_lines():
         {"logging.googleapis.com/labels":{"event.name":"foo","key":"4"},"logging.googleapis.com/spanId":"0000000000000016","logging.googleapis.com/trace":"projects/fakeproject/traces/00000000000000000000000000000019","logging.googleapis.com/trace_sampled":false,"message":"hello","severity":"ERROR","time":"2025-01-15T21:25:10.997977393Z"}
         """
     ), "Each `LogData` should be on its own line"
+
+
+def test_self_telemetry(cloudloggingfake: CloudLoggingFake) -> None:
+    reader = InMemoryMetricReader()
+    exporter = CloudLoggingExporter(
+        project_id=PROJECT_ID,
+        meter_provider=MeterProvider(metric_readers=[reader]),
+    )
+    exporter.export(
+        [
+            LogData(
+                log_record=LogRecord(body=body, resource=Resource({})),
+                instrumentation_scope=InstrumentationScope("test"),
+            )
+            # the last one exceeds the 256 KB limit
+            for body in ["abc", "def", "g" * 300000]
+        ]
+    )
+
+    points = metric_points(reader)
+    assert len(points.pop("gcp.exporter.export.duration")) == 1
+    (call,) = cloudloggingfake.get_calls()
+    assert points == {
+        "gcp.exporter.request.size": [
+            (
+                {},
+                WriteLogEntriesRequest.pb(
+                    call.write_log_entries_request
+                ).ByteSize(),
+            )
+        ],
+        "gcp.exporter.request.items": [({}, 2)],
+        "gcp.exporter.dropped": [({"type": "entry"}, 1)],
+    }
+
+
+def test_self_telemetry_failures(cloudloggingfake: CloudLoggingFake) -> None:
+    reader = InMemoryMetricReader()
+    exporter = CloudLoggingExporter(
+        project_id=PROJECT_ID,
+        meter_provider=MeterProvider(metric_readers=[reader]),
+    )
+    with mock.patch.object(
+        LoggingServiceV2Client,
+        "write_log_entries",
+        side_effect=ServiceUnavailable("unavailable"),
+    ):
+        exporter.export(
+            [
+                LogData(
+                    log_record=LogRecord(body="abc", resource=Resource({})),
+                    instrumentation_scope=InstrumentationScope("test"),
+                )
+            ]
+        )
+
+    assert metric_points(reader)["gcp.exporter.request.failures"] == [
+        ({"rpc.grpc.status_code": "UNAVAILABLE"}, 1)
+    ]
@@ -12,48 +12,31 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from __future__ import annotations
+
 import logging
 import math
 import random
+import time
 from dataclasses import replace
+from os import environ
 from time import time_ns
-from typing import Dict, List, NoReturn, Optional, Set, Union
-
-import google.auth
-from google.api.distribution_pb2 import (  # pylint: disable=no-name-in-module
-    Distribution,
-)
-from google.api.label_pb2 import (  # pylint: disable=no-name-in-module
-    LabelDescriptor,
-)
+from typing import TYPE_CHECKING, Dict, List, NoReturn, Optional, Set, Union
 
-# pylint: disable=no-name-in-module
-from google.api.metric_pb2 import Metric as GMetric
-from google.api.metric_pb2 import (  # pylint: disable=no-name-in-module
-    MetricDescriptor,
-)
-from google.api.monitored_resource_pb2 import (  # pylint: disable=no-name-in-module
-    MonitoredResource,
-)
-from google.cloud.monitoring_v3 import (
-    CreateMetricDescriptorRequest,
-    CreateTimeSeriesRequest,
-    MetricServiceClient,
-    Point,
-    TimeInterval,
-    TimeSeries,
-    TypedValue,
+from opentelemetry.exporter.cloud_monitoring.environment_variables import (
+    OTEL_EXPORTER_GCP_MONITORING_COMPRESSION,
 )
-from google.cloud.monitoring_v3.services.metric_service.transports.grpc import (
-    MetricServiceGrpcTransport,
-)
-
-# pylint: disable=no-name-in-module
-from google.protobuf.timestamp_pb2 import Timestamp
 from opentelemetry.exporter.cloud_monitoring.version import __version__
+from opentelemetry.metrics import MeterProvider
+from opentelemetry.resourcedetector.gcp_resource_detector._lazy import (
+    LazyModule,
+)
 from opentelemetry.resourcedetector.gcp_resource_detector._mapping import (
     get_monitored_resource,
 )
+from opentelemetry.resourcedetector.gcp_resource_detector._self_telemetry import (
+    ExporterTelemetry,
+)
 from opentelemetry.sdk import version as opentelemetry_sdk_version
 from opentelemetry.sdk.metrics.export import (
     ExponentialHistogram,
@@ -69,6 +52,34 @@ from opentelemetry.sdk.metrics.export import (
     Sum,
 )
 
+if TYPE_CHECKING:
+    import grpc
+    from google.api import (  # pylint: disable=no-name-in-module
+        distribution_pb2,
+        label_pb2,
+        metric_pb2,
+        monitored_resource_pb2,
+    )
+    from google.api.metric_pb2 import (  # pylint: disable=no-name-in-module
+        MetricDescriptor,
+    )
+    from google.cloud import monitoring_v3
+    from google.cloud.monitoring_v3 import (
+        MetricServiceClient,
+        Point,
+        TimeSeries,
+    )
+    from google.protobuf import timestamp_pb2
+else:
+    # imported when the exporter is created, like in the Cloud Trace exporter
+    distribution_pb2 = LazyModule("google.api.distribution_pb2")
+    label_pb2 = LazyModule("google.api.label_pb2")
+    metric_pb2 = LazyModule("google.api.metric_pb2")
+    monitored_resource_pb2 = LazyModule("google.api.monitored_resource_pb2")
+    monitoring_v3 = LazyModule("google.cloud.monitoring_v3")
+    timestamp_pb2 = LazyModule("google.protobuf.timestamp_pb2")
+
+
 logger = logging.getLogger(__name__)
 MAX_BATCH_WRITE = 200
 WRITE_INTERVAL = 10
@@ -88,6 +99,32 @@ _OPTIONS = [
 ]
 
 
+def _pooled_channel(compression: Optional[grpc.Compression]) -> grpc.Channel:
+    """Channel shared with the other exporters created without a client, see
+    _channel_pool."""
+    # pylint: disable=import-outside-toplevel
+    from google.cloud.monitoring_v3.services.metric_service.transports.grpc import (
+        MetricServiceGrpcTransport,
+    )
+    from opentelemetry.resourcedetector.gcp_resource_detector._channel_pool import (
+        CHANNEL_POOL,
+    )
+
+    credentials = CHANNEL_POOL.default_credentials()
+
+    def create_channel() -> grpc.Channel:
+        return MetricServiceGrpcTransport.create_channel(
+            credentials=credentials,
+            options=_OPTIONS,
+            compression=compression,
+        )
+
+    return CHANNEL_POOL.channel(
+        (MetricServiceGrpcTransport.DEFAULT_HOST, credentials, compression),
+        create_channel,
+    )
+
+
 # pylint is unable to resolve members of protobuf objects
 # pylint: disable=no-member
 # pylint: disable=too-many-branches
@@ -108,6 +145,17 @@ class CloudMonitoringMetricsExporter(MetricExporter):
             each other.
         prefix: the prefix of the metric. It is "workload.googleapis.com" by
             default if not specified.
+        compression: Compression of the requests sent on the channel created
+            when no client is given, e.g. ``grpc.Compression.Gzip``.
+            Alternatively, can be configured with
+            :envvar:`OTEL_EXPORTER_GCP_MONITORING_COMPRESSION`. Not compressed
+            by default.
+        meter_provider: MeterProvider to report the exporter's own metrics
+            with, as the ``gcp.exporter.*`` instruments of the
+            ``opentelemetry.exporter.cloud_monitoring`` meter: export
+            durations, request sizes and points per request, failed requests
+            by gRPC status code, and the points of metrics that couldn't be
+            written. Not reported by default.
     """
 
     def __init__(
@@ -116,19 +164,36 @@ class CloudMonitoringMetricsExporter(MetricExporter):
         client: Optional[MetricServiceClient] = None,
         add_unique_identifier: bool = False,
         prefix: Optional[str] = "workload.googleapis.com",
+        *,
+        compression: Optional[grpc.Compression] = None,
+        meter_provider: Optional[MeterProvider] = None,
     ):
         # Default preferred_temporality is all CUMULATIVE so need to customize
         super().__init__()
 
-        self.client = client or MetricServiceClient(
-            transport=MetricServiceGrpcTransport(
-                channel=MetricServiceGrpcTransport.create_channel(
-                    options=_OPTIONS,
+        if client is None:
+            # pylint: disable=import-outside-toplevel
+            from google.cloud.monitoring_v3.services.metric_service.transports.grpc import (
+                MetricServiceGrpcTransport,
+            )
+            from opentelemetry.resourcedetector.gcp_resource_detector._channel_pool import (
+                compression_from_env,
+            )
+
+            if compression is None:
+                compression = compression_from_env(
+                    OTEL_EXPORTER_GCP_MONITORING_COMPRESSION
+                )
+            client = monitoring_v3.MetricServiceClient(
+                transport=MetricServiceGrpcTransport(
+                    channel=_pooled_channel(compression)
                 )
             )
-        )
+        self.client = client
         self.project_id: str
         if not project_id:
+            import google.auth  # pylint: disable=import-outside-toplevel
+
             _, default_project_id = google.auth.default()
             self.project_id = str(default_project_id)
         else:
@@ -147,6 +212,15 @@ class CloudMonitoringMetricsExporter(MetricExporter):
         ) = divmod(time_ns(), NANOS_PER_SECOND)
         self._prefix = prefix
 
+        self._telemetry: Optional[ExporterTelemetry] = None
+        if meter_provider is not None:
+            self._telemetry = ExporterTelemetry(
+                meter_provider,
+                "opentelemetry.exporter.cloud_monitoring",
+                __version__,
+                "{point}",
+            )
+
     def _batch_write(self, series: List[TimeSeries]) -> None:
         """Cloud Monitoring allows writing up to 200 time series at once
 
@@ -155,21 +229,30 @@ class CloudMonitoringMetricsExporter(MetricExporter):
         """
         write_ind = 0
         while write_ind < len(series):
-            self.client.create_time_series(
-                CreateTimeSeriesRequest(
-                    name=self.project_name,
-                    time_series=series[
-                        write_ind : write_ind + MAX_BATCH_WRITE
-                    ],
-                ),
+            request = monitoring_v3.CreateTimeSeriesRequest(
+                name=self.project_name,
+                time_series=series[write_ind : write_ind + MAX_BATCH_WRITE],
             )
+            if self._telemetry is not None:
+                self._telemetry.record_request(
+                    monitoring_v3.CreateTimeSeriesRequest.pb(
+                        request
+                    ).ByteSize(),
+                    len(request.time_series),
+                )
+            try:
+                self.client.create_time_series(request)
+            except Exception as ex:
+                if self._telemetry is not None:
+                    self._telemetry.record_failure(ex)
+                raise
             write_ind += MAX_BATCH_WRITE
 
     def _get_metric_descriptor(
         self, metric: Metric
     ) -> Optional[MetricDescriptor]:
         """We can map Metric to MetricDescriptor using Metric.name or
-        MetricDescriptor.type. We create the MetricDescriptor if it doesn't
+        metric_pb2.MetricDescriptor.type. We create the MetricDescriptor if it doesn't
         exist already and cache it. Note that recreating MetricDescriptors is
         a no-op if it already exists.
 
@@ -180,7 +263,7 @@ class CloudMonitoringMetricsExporter(MetricExporter):
         if descriptor_type in self._metric_descriptors:
             return self._metric_descriptors[descriptor_type]
 
-        descriptor = MetricDescriptor(
+        descriptor = metric_pb2.MetricDescriptor(
             type=descriptor_type,
             display_name=metric.name,
             description=metric.description or "",
@@ -193,27 +276,33 @@ class CloudMonitoringMetricsExporter(MetricExporter):
                     continue
                 seen_keys.add(key)
                 descriptor.labels.append(
-                    LabelDescriptor(key=_normalize_label_key(key))
+                    label_pb2.LabelDescriptor(key=_normalize_label_key(key))
                 )
 
         if self.unique_identifier:
             descriptor.labels.append(
-                LabelDescriptor(key=UNIQUE_IDENTIFIER_KEY)
+                label_pb2.LabelDescriptor(key=UNIQUE_IDENTIFIER_KEY)
             )
 
         data = metric.data
         if isinstance(data, Sum):
             descriptor.metric_kind = (
-                MetricDescriptor.MetricKind.CUMULATIVE
+                metric_pb2.MetricDescriptor.MetricKind.CUMULATIVE
                 if data.is_monotonic
-                else MetricDescriptor.MetricKind.GAUGE
+                else metric_pb2.MetricDescriptor.MetricKind.GAUGE
             )
         elif isinstance(data, Gauge):
-            descriptor.metric_kind = MetricDescriptor.MetricKind.GAUGE
+            descriptor.metric_kind = (
+                metric_pb2.MetricDescriptor.MetricKind.GAUGE
+            )
         elif isinstance(data, Histogram):
-            descriptor.metric_kind = MetricDescriptor.MetricKind.CUMULATIVE
+            descriptor.metric_kind = (
+                metric_pb2.MetricDescriptor.MetricKind.CUMULATIVE
+            )
         elif isinstance(data, ExponentialHistogram):
-            descriptor.metric_kind = MetricDescriptor.MetricKind.CUMULATIVE
+            descriptor.metric_kind = (
+                metric_pb2.MetricDescriptor.MetricKind.CUMULATIVE
+            )
         else:
             # Exhaustive check
             _: NoReturn = data
@@ -226,14 +315,18 @@ class CloudMonitoringMetricsExporter(MetricExporter):
         first_point = data.data_points[0] if len(data.data_points) else None
         if isinstance(first_point, NumberDataPoint):
             descriptor.value_type = (
-                MetricDescriptor.ValueType.INT64
+                metric_pb2.MetricDescriptor.ValueType.INT64
                 if isinstance(first_point.value, int)
-                else MetricDescriptor.ValueType.DOUBLE
+                else metric_pb2.MetricDescriptor.ValueType.DOUBLE
             )
         elif isinstance(first_point, HistogramDataPoint):
-            descriptor.value_type = MetricDescriptor.ValueType.DISTRIBUTION
+            descriptor.value_type = (
+                metric_pb2.MetricDescriptor.ValueType.DISTRIBUTION
+            )
         elif isinstance(first_point, ExponentialHistogramDataPoint):
-            descriptor.value_type = MetricDescriptor.ValueType.DISTRIBUTION
+            descriptor.value_type = (
+                metric_pb2.MetricDescriptor.ValueType.DISTRIBUTION
+            )
         elif first_point is None:
             pass
         else:
@@ -246,7 +339,7 @@ class CloudMonitoringMetricsExporter(MetricExporter):
 
         try:
             response_descriptor = self.client.create_metric_descriptor(
-                CreateMetricDescriptorRequest(
+                monitoring_v3.CreateMetricDescriptorRequest(
                     name=self.project_name, metric_descriptor=descriptor
                 )
             )
@@ -257,6 +350,8 @@ class CloudMonitoringMetricsExporter(MetricExporter):
                 descriptor,
                 exc_info=ex,
             )
+            if self._telemetry is not None:
+                self._telemetry.record_failure(ex)
             return None
         self._metric_descriptors[descriptor_type] = response_descriptor
         return descriptor
@@ -272,13 +367,13 @@ class CloudMonitoringMetricsExporter(MetricExporter):
             mean = (
                 data_point.sum / data_point.count if data_point.count else 0.0
             )
-            point_value = TypedValue(
-                distribution_value=Distribution(
+            point_value = monitoring_v3.TypedValue(
+                distribution_value=distribution_pb2.Distribution(
                     count=data_point.count,
                     mean=mean,
                     bucket_counts=data_point.bucket_counts,
-                    bucket_options=Distribution.BucketOptions(
-                        explicit_buckets=Distribution.BucketOptions.Explicit(
+                    bucket_options=distribution_pb2.Distribution.BucketOptions(
+                        explicit_buckets=distribution_pb2.Distribution.BucketOptions.Explicit(
                             bounds=data_point.explicit_bounds,
                         )
                     ),
@@ -301,8 +396,8 @@ class CloudMonitoringMetricsExporter(MetricExporter):
             # Determine bucket options
             if not data_point.positive.bucket_counts:
                 # If no positive buckets, use explicit buckets with bounds=[0]
-                bucket_options = Distribution.BucketOptions(
-                    explicit_buckets=Distribution.BucketOptions.Explicit(
+                bucket_options = distribution_pb2.Distribution.BucketOptions(
+                    explicit_buckets=distribution_pb2.Distribution.BucketOptions.Explicit(
                         bounds=[0.0],
                     )
                 )
@@ -314,8 +409,8 @@ class CloudMonitoringMetricsExporter(MetricExporter):
                 scale = math.pow(growth_factor, data_point.positive.offset)
                 num_finite_buckets = len(bucket_counts) - 2
 
-                bucket_options = Distribution.BucketOptions(
-                    exponential_buckets=Distribution.BucketOptions.Exponential(
+                bucket_options = distribution_pb2.Distribution.BucketOptions(
+                    exponential_buckets=distribution_pb2.Distribution.BucketOptions.Exponential(
                         num_finite_buckets=num_finite_buckets,
                         growth_factor=growth_factor,
                         scale=scale,
@@ -325,8 +420,8 @@ class CloudMonitoringMetricsExporter(MetricExporter):
             mean = (
                 data_point.sum / data_point.count if data_point.count else 0.0
             )
-            point_value = TypedValue(
-                distribution_value=Distribution(
+            point_value = monitoring_v3.TypedValue(
+                distribution_value=distribution_pb2.Distribution(
                     count=data_point.count,
                     mean=mean,
                     bucket_counts=bucket_counts,
@@ -335,29 +430,33 @@ class CloudMonitoringMetricsExporter(MetricExporter):
             )
         else:
             if isinstance(data_point.value, int):
-                point_value = TypedValue(int64_value=data_point.value)
+                point_value = monitoring_v3.TypedValue(
+                    int64_value=data_point.value
+                )
             else:
-                point_value = TypedValue(double_value=data_point.value)
+                point_value = monitoring_v3.TypedValue(
+                    double_value=data_point.value
+                )
 
-            if kind is MetricDescriptor.MetricKind.CUMULATIVE:
+            if kind is metric_pb2.MetricDescriptor.MetricKind.CUMULATIVE:
                 pass
 
         # DELTA case should never happen but adding it to be future proof
         if (
-            kind is MetricDescriptor.MetricKind.CUMULATIVE
-            or kind is MetricDescriptor.MetricKind.DELTA
+            kind is metric_pb2.MetricDescriptor.MetricKind.CUMULATIVE
+            or kind is metric_pb2.MetricDescriptor.MetricKind.DELTA
         ):
-            interval = TimeInterval(
+            interval = monitoring_v3.TimeInterval(
                 start_time=_timestamp_from_nanos(
                     data_point.start_time_unix_nano
                 ),
                 end_time=_timestamp_from_nanos(data_point.time_unix_nano),
             )
         else:
-            interval = TimeInterval(
+            interval = monitoring_v3.TimeInterval(
                 end_time=_timestamp_from_nanos(data_point.time_unix_nano),
             )
-        return Point(interval=interval, value=point_value)
+        return monitoring_v3.Point(interval=interval, value=point_value)
 
     def export(
         self,
@@ -366,6 +465,14 @@ class CloudMonitoringMetricsExporter(MetricExporter):
         timeout_millis: float = 10_000,
         **kwargs,
     ) -> MetricExportResult:
+        start = time.monotonic()
+        try:
+            return self._export(metrics_data)
+        finally:
+            if self._telemetry is not None:
+                self._telemetry.record_export(time.monotonic() - start)
+
+    def _export(self, metrics_data: MetricsData) -> MetricExportResult:
         all_series = []
 
         for resource_metric in metrics_data.resource_metrics:
@@ -374,7 +481,7 @@ class CloudMonitoringMetricsExporter(MetricExporter):
             )
             # convert it to proto
             monitored_resource = (
-                MonitoredResource(
+                monitored_resource_pb2.MonitoredResource(
                     type=monitored_resource_data.type,
                     labels=monitored_resource_data.labels,
                 )
@@ -397,6 +504,10 @@ class CloudMonitoringMetricsExporter(MetricExporter):
 
                     descriptor = self._get_metric_descriptor(metric)
                     if not descriptor:
+                        if self._telemetry is not None:
+                            self._telemetry.record_dropped(
+                                "point", len(metric.data.data_points)
+                            )
                         continue
 
                     for data_point in metric.data.data_points:
@@ -413,11 +524,11 @@ class CloudMonitoringMetricsExporter(MetricExporter):
                         point = self._to_point(
                             descriptor.metric_kind, data_point
                         )
-                        series = TimeSeries(
+                        series = monitoring_v3.TimeSeries(
                             resource=monitored_resource,
                             metric_kind=descriptor.metric_kind,
                             points=[point],
-                            metric=GMetric(
+                            metric=metric_pb2.Metric(
                                 type=descriptor.type,
                                 labels=labels,
                             ),
@@ -442,8 +553,8 @@ class CloudMonitoringMetricsExporter(MetricExporter):
         pass
 
 
-def _timestamp_from_nanos(nanos: int) -> Timestamp:
-    ts = Timestamp()
+def _timestamp_from_nanos(nanos: int) -> timestamp_pb2.Timestamp:
+    ts = timestamp_pb2.Timestamp()
     ts.FromNanoseconds(nanos)
     return ts
 
@@ -21,3 +21,14 @@ OTEL_EXPORTER_GCP_MONITORING_PROJECT_ID = (
     GCP project ID for the exporter to send metrics to. Equivalent to constructor parameter to
     :class:`opentelemetry.exporter.cloud_monitoring.CloudMonitoringMetricsExporter`.
 """
+
+OTEL_EXPORTER_GCP_MONITORING_COMPRESSION = (
+    "OTEL_EXPORTER_GCP_MONITORING_COMPRESSION"
+)
+"""
+.. envvar:: OTEL_EXPORTER_GCP_MONITORING_COMPRESSION
+
+    Compression of the requests sent to Cloud Monitoring, one of ``gzip``, ``deflate`` or
+    ``none``. Equivalent to constructor parameter to
+    :class:`opentelemetry.exporter.cloud_monitoring.CloudMonitoringMetricsExporter`.
+"""
@@ -16,7 +16,17 @@ from collections import defaultdict
 from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from functools import partial
-from typing import Callable, Iterable, List, Mapping, Tuple, Type, cast
+from typing import (
+    Any,
+    Callable,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+    Type,
+    cast,
+)
 from unittest.mock import patch
 
 import grpc
@@ -24,6 +34,7 @@ import pytest
 from google.api.metric_pb2 import (  # pylint: disable=no-name-in-module
     MetricDescriptor,
 )
+from google.auth.credentials import AnonymousCredentials, Credentials
 from google.cloud.monitoring_v3 import (
     CreateMetricDescriptorRequest,
     CreateTimeSeriesRequest,
@@ -46,6 +57,9 @@ from grpc import (
 from opentelemetry.exporter.cloud_monitoring import (
     CloudMonitoringMetricsExporter,
 )
+from opentelemetry.resourcedetector.gcp_resource_detector._channel_pool import (
+    CHANNEL_POOL,
+)
 from opentelemetry.sdk.metrics import MeterProvider
 from opentelemetry.sdk.metrics.export import PeriodicExportingMetricReader
 
@@ -131,6 +145,12 @@ class GcmFake:
     get_calls: Callable[[], GcmCalls]
 
 
+def _insecure_channel(
+    target: str, credentials: Optional[Credentials] = None, **kwargs: Any
+) -> grpc.Channel:
+    return insecure_channel(target, **kwargs)
+
+
 @pytest.fixture(name="gcmfake")
 def fixture_gcmfake() -> Iterable[GcmFake]:
     """Fixture providing faked GCM api with captured requests"""
@@ -150,7 +170,10 @@ def fixture_gcmfake() -> Iterable[GcmFake]:
             with patch.object(
                 MetricServiceGrpcTransport,
                 "create_channel",
-                partial(insecure_channel, target=f"localhost:{port}"),
+                partial(_insecure_channel, f"localhost:{port}"),
+            ), patch(
+                "google.auth.default",
+                return_value=(AnonymousCredentials(), None),
             ):
                 yield GcmFake(
                     exporter=CloudMonitoringMetricsExporter(
@@ -159,6 +182,8 @@ def fixture_gcmfake() -> Iterable[GcmFake]:
                     get_calls=handler.get_calls,
                 )
     finally:
+        # don't leak the channel to the fake into other tests
+        CHANNEL_POOL.clear()
         if server:
             server.stop(None)
 
@@ -28,16 +28,33 @@ tox -e py310-ci-test-cloudmonitoring -- --snapshot-update
 Be sure to review the changes.
 """
 
-from typing import List, Union
+from typing import Iterable, List, Optional, Union
+from unittest import mock
 
+import grpc
 import pytest
 from fixtures.gcmfake import GcmFake, GcmFakeMeterProvider
+from google.api_core.exceptions import ServiceUnavailable
 from google.auth.credentials import AnonymousCredentials
-from google.cloud.monitoring_v3 import MetricServiceClient
+from google.cloud.monitoring_v3 import (
+    CreateTimeSeriesRequest,
+    MetricServiceClient,
+)
+from google.cloud.monitoring_v3.services.metric_service.transports.grpc import (
+    MetricServiceGrpcTransport,
+)
 from opentelemetry.exporter.cloud_monitoring import (
     CloudMonitoringMetricsExporter,
 )
 from opentelemetry.metrics import CallbackOptions, Observation
+from opentelemetry.resourcedetector.gcp_resource_detector._channel_pool import (
+    CHANNEL_POOL,
+)
+from opentelemetry.sdk.metrics import MeterProvider
+from opentelemetry.sdk.metrics.export import (
+    InMemoryMetricReader,
+    MetricExportResult,
+)
 from opentelemetry.sdk.metrics.view import (
     ExplicitBucketHistogramAggregation,
     ExponentialBucketHistogramAggregation,
@@ -45,6 +62,7 @@ from opentelemetry.sdk.metrics.view import (
 )
 from opentelemetry.sdk.resources import Resource
 from opentelemetry.util.types import Attributes
+from test_common.metrics import metric_points
 
 PROJECT_ID = "fakeproject"
 LABELS: Attributes = {
@@ -64,6 +82,60 @@ def test_create_monitoring_exporter() -> None:
     )
 
 
+@pytest.fixture(name="clear_channel_pool")
+def fixture_clear_channel_pool() -> Iterable[None]:
+    CHANNEL_POOL.clear()
+    yield
+    CHANNEL_POOL.clear()
+
+
+@pytest.mark.parametrize(
+    "kwargs, environ, expected",
+    [
+        pytest.param({}, {}, None, id="default"),
+        pytest.param(
+            {"compression": grpc.Compression.Gzip},
+            {},
+            grpc.Compression.Gzip,
+            id="arg",
+        ),
+        pytest.param(
+            {},
+            {"OTEL_EXPORTER_GCP_MONITORING_COMPRESSION": "Deflate"},
+            grpc.Compression.Deflate,
+            id="env",
+        ),
+        pytest.param(
+            {"compression": grpc.Compression.NoCompression},
+            {"OTEL_EXPORTER_GCP_MONITORING_COMPRESSION": "gzip"},
+            grpc.Compression.NoCompression,
+            id="arg_overrides_env",
+        ),
+    ],
+)
+def test_compression(
+    kwargs: dict,
+    environ: dict,
+    expected: Optional[grpc.Compression],
+    clear_channel_pool: None,
+) -> None:
+    with mock.patch.dict("os.environ", environ), mock.patch(
+        "google.auth.default", return_value=(AnonymousCredentials(), None)
+    ), mock.patch.object(
+        MetricServiceGrpcTransport, "create_channel"
+    ) as create_channel:
+        CloudMonitoringMetricsExporter(project_id=PROJECT_ID, **kwargs)
+
+    assert create_channel.call_args.kwargs["compression"] == expected
+
+
+def test_invalid_compression_env() -> None:
+    with mock.patch.dict(
+        "os.environ", {"OTEL_EXPORTER_GCP_MONITORING_COMPRESSION": "brotli"}
+    ), pytest.raises(ValueError):
+        CloudMonitoringMetricsExporter(project_id=PROJECT_ID)
+
+
 @pytest.mark.parametrize(
     "value", [pytest.param(123, id="int"), pytest.param(45.6, id="float")]
 )
@@ -274,3 +346,44 @@ def test_with_resource(
     counter.add(12, LABELS)
     meter_provider.force_flush()
     assert gcmfake.get_calls() == snapshot_gcmcalls
+
+
+def test_self_telemetry(gcmfake: GcmFake) -> None:
+    telemetry_reader = InMemoryMetricReader()
+    exporter = CloudMonitoringMetricsExporter(
+        project_id=PROJECT_ID,
+        meter_provider=MeterProvider(metric_readers=[telemetry_reader]),
+    )
+    reader = InMemoryMetricReader()
+    counter = (
+        MeterProvider(metric_readers=[reader])
+        .get_meter(__name__)
+        .create_counter("mycounter")
+    )
+    counter.add(1, {"key": "a"})
+    counter.add(1, {"key": "b"})
+    metrics_data = reader.get_metrics_data()
+
+    assert exporter.export(metrics_data) == MetricExportResult.SUCCESS
+    with mock.patch.object(
+        exporter.client,
+        "create_time_series",
+        side_effect=ServiceUnavailable("unavailable"),
+    ):
+        assert exporter.export(metrics_data) == MetricExportResult.FAILURE
+
+    points = metric_points(telemetry_reader)
+    assert len(points.pop("gcp.exporter.export.duration")) == 1
+    ((_, request_size),) = points.pop("gcp.exporter.request.size")
+    (call,) = gcmfake.get_calls()[
+        "/google.monitoring.v3.MetricService/CreateTimeSeries"
+    ]
+    assert (
+        request_size == 2 * CreateTimeSeriesRequest.pb(call.message).ByteSize()
+    )
+    assert points == {
+        "gcp.exporter.request.items": [({}, 4)],
+        "gcp.exporter.request.failures": [
+            ({"rpc.grpc.status_code": "UNAVAILABLE"}, 1)
+        ],
+    }
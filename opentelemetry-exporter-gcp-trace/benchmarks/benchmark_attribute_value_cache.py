@@ -0,0 +1,88 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Translation time of a 512 span batch with and without ``attribute_value_cache_size``,
+for both the default protobuf translation and ``use_proto_plus``.
+
+Run with ``python benchmarks/benchmark_attribute_value_cache.py``.
+"""
+
+# pylint: disable=protected-access
+
+import timeit
+from unittest import mock
+
+from opentelemetry.exporter.cloud_trace import CloudTraceSpanExporter
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import _Span as Span
+from opentelemetry.trace import SpanContext
+
+BATCH_SIZE = 512
+
+
+def make_spans():
+    resource = Resource({"service.name": "frontend"})
+    spans = []
+    for i in range(BATCH_SIZE):
+        span = Span(
+            name="GET /api/products/{id}",
+            context=SpanContext(
+                trace_id=0x6E0C63257DE34C92BF9EFCD03927272E + i,
+                span_id=i + 1,
+                is_remote=False,
+            ),
+            resource=resource,
+            attributes={
+                "http.method": "GET",
+                "http.scheme": "https",
+                "http.route": "/api/products/{id}",
+                "http.flavor": "1.1",
+                "http.status_code": 200,
+                "http.user_agent": "Mozilla/5.0 (X11; Linux x86_64)",
+                "net.host.name": "frontend.example.com",
+                "net.host.port": 443,
+            },
+        )
+        span._start_time = 10**18 + i * 1000
+        span._end_time = span._start_time + 250000
+        spans.append(span)
+    return spans
+
+
+def bench(func, number=20, repeat=5):
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number
+
+
+def main():
+    spans = make_spans()
+    for name, use_proto_plus in (("protobuf", False), ("proto-plus", True)):
+        times = []
+        for cache_size in (0, 256):
+            exporter = CloudTraceSpanExporter(
+                "project",
+                client=mock.Mock(),
+                use_proto_plus=use_proto_plus,
+                attribute_value_cache_size=cache_size,
+            )
+            times.append(bench(lambda: exporter._translate_to_requests(spans)))
+        uncached_time, cached_time = times
+        print(
+            f"{name}: {uncached_time * 1e3:.3f} ms per {BATCH_SIZE} spans "
+            f"uncached, {cached_time * 1e3:.3f} ms cached "
+            f"({uncached_time / cached_time:.2f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
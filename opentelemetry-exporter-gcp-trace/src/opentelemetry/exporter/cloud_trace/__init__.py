@@ -70,43 +70,68 @@ API
 ---
 """
 
+from __future__ import annotations
+
+import contextvars
 import logging
 import re
+import threading
+import time
+from collections import OrderedDict
 from collections.abc import Sequence as SequenceABC
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from os import environ
 from typing import (
+    TYPE_CHECKING,
     Any,
+    Callable,
     Dict,
     List,
+    NamedTuple,
     Optional,
     Pattern,
     Sequence,
     Tuple,
+    Type,
+    TypeVar,
+    Union,
+    cast,
     overload,
 )
 
-import google.auth
 import opentelemetry.trace as trace_api
-from google.cloud.trace_v2 import BatchWriteSpansRequest, TraceServiceClient
-from google.cloud.trace_v2 import types as trace_types
-from google.cloud.trace_v2.services.trace_service.transports import (
-    TraceServiceGrpcTransport,
+from google.protobuf.message import DecodeError, Message
+from opentelemetry.context import (
+    _SUPPRESS_INSTRUMENTATION_KEY,
+    attach,
+    detach,
+    set_value,
 )
-from google.protobuf.timestamp_pb2 import (  # pylint: disable=no-name-in-module
-    Timestamp,
+from opentelemetry.exporter.cloud_trace._spill_queue import SpillQueue
+from opentelemetry.exporter.cloud_trace._truncation_warnings import (
+    TruncationWarnings,
 )
-from google.rpc import code_pb2, status_pb2
 from opentelemetry.exporter.cloud_trace.environment_variables import (
+    OTEL_EXPORTER_GCP_TRACE_COMPRESSION,
     OTEL_EXPORTER_GCP_TRACE_PROJECT_ID,
     OTEL_EXPORTER_GCP_TRACE_RESOURCE_REGEX,
+    OTEL_EXPORTER_GCP_TRACE_SPILL_DIRECTORY,
 )
 from opentelemetry.exporter.cloud_trace.version import __version__
+from opentelemetry.metrics import MeterProvider
 from opentelemetry.resourcedetector.gcp_resource_detector import (
     _constants as _resource_constants,
 )
+from opentelemetry.resourcedetector.gcp_resource_detector._lazy import (
+    LazyModule,
+)
 from opentelemetry.resourcedetector.gcp_resource_detector._mapping import (
     get_monitored_resource,
 )
+from opentelemetry.resourcedetector.gcp_resource_detector._self_telemetry import (
+    ExporterTelemetry,
+)
 from opentelemetry.sdk import version as opentelemetry_sdk_version
 from opentelemetry.sdk.resources import Resource
 from opentelemetry.sdk.trace import Event
@@ -120,6 +145,34 @@ from opentelemetry.trace import format_span_id, format_trace_id
 from opentelemetry.trace.status import StatusCode
 from opentelemetry.util import types
 
+if TYPE_CHECKING:
+    import grpc
+    from google.api_core import exceptions as api_exceptions
+    from google.api_core import retry as api_retry
+    from google.cloud import trace_v2
+    from google.cloud.trace_v2 import (
+        BatchWriteSpansRequest,
+        TraceServiceClient,
+    )
+    from google.cloud.trace_v2 import types as trace_types
+    from google.rpc import code_pb2, status_pb2
+    from opentelemetry.exporter.cloud_trace._translation_pool import (
+        TranslationPool,
+    )
+    from opentelemetry.exporter.cloud_trace._wire_encoder import (
+        EncodedRequestSender,
+        WireEncoder,
+    )
+else:
+    # Importing the client library takes hundreds of milliseconds, so it is only
+    # imported once an exporter is created, see LazyModule.
+    api_exceptions = LazyModule("google.api_core.exceptions")
+    api_retry = LazyModule("google.api_core.retry")
+    trace_v2 = LazyModule("google.cloud.trace_v2")
+    trace_types = LazyModule("google.cloud.trace_v2.types")
+    code_pb2 = LazyModule("google.rpc.code_pb2")
+    status_pb2 = LazyModule("google.rpc.status_pb2")
+
 logger = logging.getLogger(__name__)
 
 _OTEL_SDK_VERSION = opentelemetry_sdk_version.__version__
@@ -135,6 +188,9 @@ _OPTIONS = [
 ]
 
 
+# Span or resource attribute overriding the project a span is written to
+PROJECT_ID_ATTRIBUTE_KEY = "gcp.project_id"
+
 MAX_NUM_LINKS = 128
 MAX_NUM_EVENTS = 32
 MAX_EVENT_ATTRS = 4
@@ -143,39 +199,256 @@ MAX_SPAN_ATTRS = 32
 MAX_ATTR_KEY_BYTES = 128
 MAX_ATTR_VAL_BYTES = 16 * 1024  # 16 kilobytes
 
+# Spans, links and events over the limits above are counted and summarized in one warning
+# per interval rather than logged one by one, see TruncationWarnings. The exporters'
+# self-telemetry counts the same truncations as gcp.exporter.dropped.
+_TRUNCATION_WARNING_INTERVAL = 60.0  # seconds
+_TRUNCATION_WARNINGS = TruncationWarnings(_TRUNCATION_WARNING_INTERVAL)
+_SPAN_ATTRS_TRUNCATED = f"spans with more than {MAX_SPAN_ATTRS} attributes"
+_LINKS_TRUNCATED = f"spans with more than {MAX_NUM_LINKS} links"
+_LINK_ATTRS_TRUNCATED = f"links with more than {MAX_LINK_ATTRS} attributes"
+_EVENTS_TRUNCATED = f"spans with more than {MAX_NUM_EVENTS} events"
+_EVENT_ATTRS_TRUNCATED = f"events with more than {MAX_EVENT_ATTRS} attributes"
 
-def _create_default_client() -> TraceServiceClient:
-    return TraceServiceClient(
-        transport=TraceServiceGrpcTransport(
-            channel=TraceServiceGrpcTransport.create_channel(options=_OPTIONS)
-        )
+
+# Raw protobuf classes underlying the proto-plus types. Building these directly avoids the
+# proto-plus marshalling overhead, see
+# https://proto-plus-python.readthedocs.io/en/stable/messages.html#wrapping-and-unwrapping
+@lru_cache(maxsize=None)
+def _span_pb_type() -> Any:
+    return trace_types.Span.pb()
+
+
+@lru_cache(maxsize=None)
+def _attribute_value_pb_type() -> Any:
+    return trace_types.AttributeValue.pb()
+
+
+@lru_cache(maxsize=None)
+def _batch_write_spans_request_pb_type() -> Any:
+    return trace_v2.BatchWriteSpansRequest.pb()
+
+
+# Limits for a single BatchWriteSpans request. Larger batches are split into several
+# requests.
+MAX_BATCH_WRITE_SPANS = 1000
+MAX_BATCH_WRITE_BYTES = 10000000  # 10 MB
+
+# Spans from a single process almost always share one Resource, so only a handful of
+# distinct resources need their translated labels cached.
+_MAX_CACHED_RESOURCES = 32
+
+# Child span counts of parent spans that weren't exported yet, see
+# _CloudTraceExporterBase._take_child_span_counts.
+_MAX_PENDING_CHILD_SPAN_COUNTS = 10000
+
+# BatchWriteSpans requests failing with one of these errors are retried until the export
+# deadline. The delay between attempts grows exponentially and is jittered (see
+# google.api_core.retry.exponential_sleep_generator) so that exporters don't retry in
+# lockstep while the backend recovers.
+_RETRY_INITIAL_DELAY = 0.5
+_RETRY_MAX_DELAY = 8.0
+_RETRY_DELAY_MULTIPLIER = 2.0
+
+
+@lru_cache(maxsize=None)
+def _retryable_errors() -> Tuple[Type[Exception], ...]:
+    return (api_exceptions.ServiceUnavailable, api_exceptions.DeadlineExceeded)
+
+
+@lru_cache(maxsize=None)
+def _retry() -> api_retry.Retry:
+    return api_retry.Retry(
+        predicate=api_retry.if_exception_type(*_retryable_errors()),
+        initial=_RETRY_INITIAL_DELAY,
+        maximum=_RETRY_MAX_DELAY,
+        multiplier=_RETRY_DELAY_MULTIPLIER,
     )
 
 
-class CloudTraceSpanExporter(SpanExporter):
-    """Cloud Trace span exporter for OpenTelemetry.
+# Requests that failed with one of these errors are worth writing again later, e.g. from
+# the spill queue. RetryError is raised when the retries ran out of time.
+@lru_cache(maxsize=None)
+def _transient_errors() -> Tuple[Type[Exception], ...]:
+    return _retryable_errors() + (api_exceptions.RetryError,)
 
-    Args:
-        project_id: GCP project ID for the project to send spans to. Alternatively, can be
-            configured with :envvar:`OTEL_EXPORTER_GCP_TRACE_PROJECT_ID`.
-        client: Cloud Trace client. If not given, will be taken from gcloud
-            default credentials
-        resource_regex: Resource attributes with keys matching this regex will be added to
-            exported spans as labels (default: None). Alternatively, can be configured with
-            :envvar:`OTEL_EXPORTER_GCP_TRACE_RESOURCE_REGEX`.
+
+DEFAULT_SPILL_MAX_BYTES = 64 * 1024 * 1024  # 64 MiB
+_SPILL_REPLAY_INTERVAL = 10.0
+
+
+# Attribute values interned by _AttributeValueCache. Sequences aren't, as e.g. (1, 2) and
+# (True, 2) are equal but translate differently, and neither are floats, as 0.0 and -0.0
+# are equal but translate differently.
+_INTERNABLE_VALUE_TYPES = (str, int, bool)
+# Longer strings are rarely repeated and would make the cache's memory use unpredictable.
+_MAX_INTERNED_STR_LENGTH = 256
+
+_T = TypeVar("_T")
+
+
+class AttributeValueCacheInfo(NamedTuple):
+    """Statistics of the attribute value cache, see
+    :meth:`CloudTraceSpanExporter.attribute_value_cache_info`."""
+
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+class _AttributeValueCache:
+    """Bounded LRU of translated span attribute values.
+
+    The translation of an attribute value doesn't depend on its key, so values are cached
+    by type and value alone and shared by every key they appear under.
+
+    This is on the hot path of every attribute, so it doesn't take a lock: each
+    OrderedDict operation is atomic under the GIL, and a concurrent eviction only costs
+    a retranslation. The hit and miss counts may miss updates when several threads
+    export concurrently.
+    """
+
+    def __init__(self, maxsize: int):
+        self._maxsize = maxsize
+        self._values: OrderedDict[Tuple[type, Any], Any] = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, value: Any, translate: Callable[[Any], _T]) -> Optional[_T]:
+        """Return the cached translation of ``value``, translating and caching it with
+        ``translate`` on a miss. Returns None for values that aren't cached."""
+        value_type = type(value)
+        if value_type not in _INTERNABLE_VALUE_TYPES or (
+            value_type is str and len(value) > _MAX_INTERNED_STR_LENGTH
+        ):
+            return None
+
+        key = (value_type, value)
+        values = self._values
+        cached = values.get(key)
+        if cached is not None:
+            try:
+                values.move_to_end(key)
+            except KeyError:
+                # evicted by another thread in the meantime
+                pass
+            self._hits += 1
+            return cached
+
+        self._misses += 1
+        translated = translate(value)
+        values[key] = translated
+        if len(values) > self._maxsize:
+            try:
+                values.popitem(last=False)
+            except KeyError:
+                pass
+        return translated
+
+    def info(self) -> AttributeValueCacheInfo:
+        return AttributeValueCacheInfo(
+            self._hits, self._misses, self._maxsize, len(self._values)
+        )
+
+
+class _ResourceValueCache:
+    """Translated values of a resource's span labels, looking up other values in the
+    exporter's :class:`_AttributeValueCache` if it has one.
+
+    Every span of the resource carries its labels, which with a ``resource_regex`` of
+    ``.*`` are all of the resource's attributes, so each label value is translated once
+    per resource rather than once per span. Labels are strings, and a span attribute with the same string value
+    translates the same, so values are looked up by value alone.
     """
 
     def __init__(
         self,
-        project_id=None,
-        client=None,
-        resource_regex=None,
+        labels: Dict[str, str],
+        fallback: Optional[_AttributeValueCache],
     ):
-        self.client: TraceServiceClient = client or _create_default_client()
+        self._labels = labels
+        # the label values translated by each translation function, as the proto-plus,
+        # raw protobuf and wire translations each have their own
+        self._translated: Dict[Callable[[Any], Any], Dict[str, Any]] = {}
+        self._fallback = fallback
+
+    def get(self, value: Any, translate: Callable[[Any], _T]) -> Optional[_T]:
+        """Same as :meth:`_AttributeValueCache.get`."""
+        if type(value) is str:
+            translated = self._translated.get(translate)
+            if translated is None:
+                translated = self._translated[translate] = {
+                    label_value: translate(label_value)
+                    for label_value in self._labels.values()
+                }
+            cached = translated.get(value)
+            if cached is not None:
+                return cached
+        if self._fallback is not None:
+            return self._fallback.get(value, translate)
+        return None
+
+
+_ValueCache = Union[_AttributeValueCache, _ResourceValueCache]
+
+
+class _ResourceLabels(NamedTuple):
+    """Span labels of a resource, see :meth:`_CloudTraceExporterBase._get_resource_labels`."""
+
+    labels: Dict[str, str]
+    value_cache: _ResourceValueCache
+
+
+def _create_default_client(
+    compression: Optional[grpc.Compression] = None,
+) -> TraceServiceClient:
+    # pylint: disable=import-outside-toplevel
+    from google.cloud.trace_v2.services.trace_service.transports import (
+        TraceServiceGrpcTransport,
+    )
+    from opentelemetry.resourcedetector.gcp_resource_detector._channel_pool import (
+        CHANNEL_POOL,
+    )
 
+    credentials = CHANNEL_POOL.default_credentials()
+
+    def create_channel() -> grpc.Channel:
+        return TraceServiceGrpcTransport.create_channel(
+            credentials=credentials,
+            options=_OPTIONS,
+            compression=compression,
+        )
+
+    # shared with the other exporters created without a client, see _channel_pool
+    channel = CHANNEL_POOL.channel(
+        (TraceServiceGrpcTransport.DEFAULT_HOST, credentials, compression),
+        create_channel,
+    )
+    return trace_v2.TraceServiceClient(
+        transport=TraceServiceGrpcTransport(channel=channel)
+    )
+
+
+class _CloudTraceExporterBase:
+    """Configuration and span translation shared by the Cloud Trace exporters."""
+
+    def __init__(
+        self,
+        project_id: Optional[str],
+        resource_regex: Optional[str],
+        use_proto_plus: bool,
+        max_concurrent_requests: int,
+        export_timeout_millis: float,
+        attribute_value_cache_size: int,
+        group_spans_by_trace: bool,
+        meter_provider: Optional[MeterProvider],
+    ):
         if not project_id:
             project_id = environ.get(OTEL_EXPORTER_GCP_TRACE_PROJECT_ID)
         if not project_id:
+            import google.auth  # pylint: disable=import-outside-toplevel
+
             _, project_id = google.auth.default()
         self.project_id = project_id
 
@@ -187,45 +460,353 @@ class CloudTraceSpanExporter(SpanExporter):
             re.compile(resource_regex) if resource_regex else None
         )
 
-    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
-        """Export the spans to Cloud Trace.
+        # Maps id(resource) to the resource and its extracted span labels. The resource is
+        # kept alive by the cache so its id can't be reused by a different object.
+        self._resource_labels_cache: OrderedDict[
+            int, Tuple[Resource, _ResourceLabels]
+        ] = OrderedDict()
+        self._resource_labels_lock = threading.Lock()
+        self._use_proto_plus = use_proto_plus
+
+        if max_concurrent_requests < 1:
+            raise ValueError("max_concurrent_requests must be at least 1")
+        self._max_concurrent_requests = max_concurrent_requests
+
+        if export_timeout_millis <= 0:
+            raise ValueError("export_timeout_millis must be positive")
+        self._export_timeout = export_timeout_millis / 1e3
+
+        if attribute_value_cache_size < 0:
+            raise ValueError("attribute_value_cache_size must not be negative")
+        self._attribute_value_cache: Optional[_AttributeValueCache] = None
+        if attribute_value_cache_size:
+            self._attribute_value_cache = _AttributeValueCache(
+                attribute_value_cache_size
+            )
 
-        See: https://cloud.google.com/trace/docs/reference/v2/rest/v2/projects.traces/batchWrite
+        self._group_spans_by_trace = group_spans_by_trace
+        # Maps (trace_id, span_id) of a local parent span to the number of its child
+        # spans exported before it.
+        self._child_span_counts: OrderedDict[
+            Tuple[int, int], int
+        ] = OrderedDict()
+        self._child_span_counts_lock = threading.Lock()
+
+        self._telemetry: Optional[ExporterTelemetry] = None
+        if meter_provider is not None:
+            self._telemetry = ExporterTelemetry(
+                meter_provider,
+                "opentelemetry.exporter.cloud_trace",
+                __version__,
+                "{span}",
+            )
+
+    def attribute_value_cache_info(self) -> AttributeValueCacheInfo:
+        """Return hit and miss counts of the attribute value cache, to help choose its
+        size. All zeros if the cache is disabled."""
+        if self._attribute_value_cache is None:
+            return AttributeValueCacheInfo(0, 0, 0, 0)
+        return self._attribute_value_cache.info()
+
+    def _translate_to_requests(
+        self, spans: Sequence[ReadableSpan]
+    ) -> List[BatchWriteSpansRequest]:
+        """Translate the spans into the BatchWriteSpans requests to send.
 
         Args:
-            spans: Sequence of spans to export
+            spans: Sequence of spans to convert
         """
-        try:
-            self.client.batch_write_spans(
-                request=BatchWriteSpansRequest(
-                    name="projects/{}".format(self.project_id),
-                    spans=self._translate_to_cloud_trace(spans),
+        spans, group_lengths = self._group_spans(spans)
+        return self._translate_grouped(
+            spans, group_lengths, self._take_child_span_counts(spans)
+        )
+
+    def _translate_grouped(
+        self,
+        spans: Sequence[ReadableSpan],
+        group_lengths: Optional[Sequence[int]],
+        child_span_counts: Optional[Sequence[int]],
+    ) -> List[BatchWriteSpansRequest]:
+        """:meth:`_translate_to_requests` of spans already grouped by
+        :meth:`_group_spans`, with their :meth:`_take_child_span_counts`."""
+        project_ids = self._get_project_ids(spans)
+        if self._use_proto_plus:
+            spans_pb = [
+                trace_types.Span.pb(span)
+                for span in self._translate_to_cloud_trace(
+                    spans, project_ids, child_span_counts
                 )
+            ]
+        else:
+            spans_pb = self._translate_to_cloud_trace_pb(
+                spans, project_ids, child_span_counts
             )
-        # pylint: disable=broad-except
-        except Exception as ex:
-            logger.error("Error while writing to Cloud Trace", exc_info=ex)
-            return SpanExportResult.FAILURE
+        if self._telemetry is not None:
+            _record_dropped(self._telemetry, spans_pb)
+        if project_ids is None:
+            return self._batch_write_requests(spans_pb, group_lengths)
+
+        requests: List[BatchWriteSpansRequest] = []
+        for project_id, (
+            project_spans_pb,
+            project_group_lengths,
+        ) in _split_by_project(spans_pb, group_lengths, project_ids).items():
+            requests.extend(
+                self._batch_write_requests(
+                    project_spans_pb, project_group_lengths, project_id
+                )
+            )
+        return requests
+
+    def _encode_requests(
+        self, wire_encoder: WireEncoder, spans: Sequence[ReadableSpan]
+    ) -> List[_EncodedBatchWriteSpansRequest]:
+        """Equivalent of :meth:`_translate_to_requests` encoding the requests with
+        ``wire_encoder``."""
+        spans, group_lengths = self._group_spans(spans)
+        return self._encode_grouped(
+            wire_encoder,
+            spans,
+            group_lengths,
+            self._take_child_span_counts(spans),
+        )
 
-        return SpanExportResult.SUCCESS
+    def _encode_grouped(
+        self,
+        wire_encoder: WireEncoder,
+        spans: Sequence[ReadableSpan],
+        group_lengths: Optional[Sequence[int]],
+        child_span_counts: Optional[Sequence[int]],
+    ) -> List[_EncodedBatchWriteSpansRequest]:
+        """Equivalent of :meth:`_translate_grouped` encoding the requests with
+        ``wire_encoder``."""
+        project_ids = self._get_project_ids(spans)
+        if project_ids is None:
+            project_ids = [str(self.project_id)] * len(spans)
+        encoded = wire_encoder.encode_spans(
+            spans,
+            project_ids,
+            self._get_resource_labels,
+            child_span_counts,
+            self._attribute_value_cache,
+        )
+        if self._telemetry is not None:
+            self._telemetry.record_dropped(
+                "attribute", encoded.dropped_attributes
+            )
+            self._telemetry.record_dropped("link", encoded.dropped_links)
+            self._telemetry.record_dropped("event", encoded.dropped_events)
+
+        requests: List[_EncodedBatchWriteSpansRequest] = []
+        for project_id, (indices, project_group_lengths,) in _split_by_project(
+            range(len(spans)), group_lengths, project_ids
+        ).items():
+            name = "projects/{}".format(project_id)
+            for batch in self._batch_spans(
+                name,
+                [encoded.size(index) for index in indices],
+                project_group_lengths,
+            ):
+                requests.append(
+                    wire_encoder.make_request(
+                        name, encoded, [indices[i] for i in batch]
+                    )
+                )
+        return requests
 
-    def _translate_to_cloud_trace(
+    def _group_spans(
         self, spans: Sequence[ReadableSpan]
+    ) -> Tuple[Sequence[ReadableSpan], Optional[List[int]]]:
+        """Order the spans by trace if they are grouped by trace, and return them with
+        the lengths of the groups to keep in the same request, see
+        :meth:`_batch_write_requests`."""
+        if not self._group_spans_by_trace:
+            return spans, None
+        traces = _group_by_trace(spans)
+        return [span for trace in traces for span in trace], [
+            len(trace) for trace in traces
+        ]
+
+    def _get_project_ids(
+        self, spans: Sequence[ReadableSpan]
+    ) -> Optional[List[str]]:
+        """Return the project each span is written to: its PROJECT_ID_ATTRIBUTE_KEY
+        attribute, else its resource's, else the exporter's project. None if all spans
+        go to the exporter's project.
+        """
+        default_project_id = str(self.project_id)
+        project_ids: List[str] = []
+        routed = False
+        last_resource: Optional[Resource] = None
+        resource_project_id = default_project_id
+        for span in spans:
+            if span.resource is not last_resource:
+                last_resource = span.resource
+                resource_project_id = str(
+                    span.resource.attributes.get(PROJECT_ID_ATTRIBUTE_KEY)
+                    or default_project_id
+                )
+            project_id = resource_project_id
+            if span.attributes:
+                project_id = str(
+                    span.attributes.get(PROJECT_ID_ATTRIBUTE_KEY)
+                    or resource_project_id
+                )
+            routed = routed or project_id != default_project_id
+            project_ids.append(project_id)
+        return project_ids if routed else None
+
+    def _batch_write_requests(
+        self,
+        spans_pb: Sequence[Message],
+        group_lengths: Optional[Sequence[int]] = None,
+        project_id: Optional[str] = None,
+    ) -> List[BatchWriteSpansRequest]:
+        """Split the spans into BatchWriteSpans requests of at most MAX_BATCH_WRITE_SPANS
+        spans and MAX_BATCH_WRITE_BYTES serialized bytes.
+
+        Args:
+            spans_pb: Sequence of raw protobuf spans to write
+            group_lengths: Lengths of consecutive groups of ``spans_pb`` to keep in the
+                same request when they fit. Defaults to one group per span.
+            project_id: Project the spans belong to. Defaults to the exporter's project.
+        """
+        name = "projects/{}".format(project_id or self.project_id)
+        span_sizes = [
+            _length_delimited_size(span_pb.ByteSize()) for span_pb in spans_pb
+        ]
+        return [
+            _make_batch_write_request(name, [spans_pb[i] for i in batch])
+            for batch in self._batch_spans(name, span_sizes, group_lengths)
+        ]
+
+    def _batch_spans(
+        self,
+        name: str,
+        span_sizes: Sequence[int],
+        group_lengths: Optional[Sequence[int]],
+    ) -> List[List[int]]:
+        """Split spans into the BatchWriteSpans requests of :meth:`_batch_write_requests`.
+
+        Args:
+            name: Name of the project the requests write to
+            span_sizes: Encoded size of each span as a field of the request
+            group_lengths: See :meth:`_batch_write_requests`
+
+        Returns:
+            The indices of the spans in each request. Spans larger than a request are
+            left out.
+        """
+        request_base_size = _length_delimited_size(len(name.encode("utf-8")))
+        if group_lengths is None:
+            group_lengths = [1] * len(span_sizes)
+
+        batches: List[List[int]] = []
+        batch: List[int] = []
+        batch_byte_size = request_base_size
+
+        def add_batch() -> None:
+            batches.append(batch)
+            if self._telemetry is not None:
+                self._telemetry.record_request(batch_byte_size, len(batch))
+
+        group_start = 0
+        for group_length in group_lengths:
+            group_end = group_start + group_length
+            # start a new request rather than splitting a group that fits in one
+            if batch and (
+                batch_byte_size + sum(span_sizes[group_start:group_end])
+                > MAX_BATCH_WRITE_BYTES
+                or len(batch) + group_length > MAX_BATCH_WRITE_SPANS
+            ):
+                add_batch()
+                batch = []
+                batch_byte_size = request_base_size
+
+            for index in range(group_start, group_end):
+                span_size = span_sizes[index]
+                if request_base_size + span_size > MAX_BATCH_WRITE_BYTES:
+                    logger.warning(
+                        "Cannot write span that is %s bytes which exceeds the maximum "
+                        "request size of %s bytes.",
+                        span_size,
+                        MAX_BATCH_WRITE_BYTES,
+                    )
+                    if self._telemetry is not None:
+                        self._telemetry.record_dropped("span", 1)
+                    continue
+                if batch and (
+                    batch_byte_size + span_size > MAX_BATCH_WRITE_BYTES
+                    or len(batch) >= MAX_BATCH_WRITE_SPANS
+                ):
+                    add_batch()
+                    batch = []
+                    batch_byte_size = request_base_size
+                batch.append(index)
+                batch_byte_size += span_size
+            group_start = group_end
+        if batch:
+            add_batch()
+        return batches
+
+    def _take_child_span_counts(
+        self, spans: Sequence[ReadableSpan]
+    ) -> Optional[List[int]]:
+        """Return the number of local child spans of each span, or None if spans aren't
+        grouped by trace.
+
+        Child spans usually end, and so are exported, before their parent. Children are
+        counted here as they are exported and the count is kept until the parent is
+        exported, for at most _MAX_PENDING_CHILD_SPAN_COUNTS parents. Children exported
+        after their parent aren't counted.
+        """
+        if not self._group_spans_by_trace:
+            return None
+        with self._child_span_counts_lock:
+            counts = self._child_span_counts
+            for span in spans:
+                parent = span.parent
+                if parent is not None and not parent.is_remote:
+                    key = (parent.trace_id, parent.span_id)
+                    counts[key] = counts.get(key, 0) + 1
+            span_counts = [
+                counts.pop((span.context.trace_id, span.context.span_id), 0)
+                for span in spans
+            ]
+            while len(counts) > _MAX_PENDING_CHILD_SPAN_COUNTS:
+                counts.popitem(last=False)
+        return span_counts
+
+    def _translate_to_cloud_trace(
+        self,
+        spans: Sequence[ReadableSpan],
+        project_ids: Optional[Sequence[str]] = None,
+        child_span_counts: Optional[Sequence[int]] = None,
     ) -> List[trace_types.Span]:
         """Translate the spans to Cloud Trace format.
 
         Args:
             spans: Sequence of spans to convert
+            project_ids: Project of each span. Defaults to the exporter's project.
+            child_span_counts: Number of local child spans of each span. Taken with
+                :meth:`_take_child_span_counts` if not given.
         """
 
         cloud_trace_spans: List[trace_types.Span] = []
+        last_resource: Optional[Resource] = None
+        resource_labels: Dict[str, str] = {}
+        value_cache: Optional[_ValueCache] = None
+        if child_span_counts is None:
+            child_span_counts = self._take_child_span_counts(spans)
 
-        for span in spans:
+        for index, span in enumerate(spans):
             ctx = span.get_span_context()
             trace_id = format_trace_id(ctx.trace_id)
             span_id = format_span_id(ctx.span_id)
             span_name = "projects/{}/traces/{}/spans/{}".format(
-                self.project_id, trace_id, span_id
+                project_ids[index] if project_ids else self.project_id,
+                trace_id,
+                span_id,
             )
 
             parent_id = None
@@ -236,18 +817,30 @@ class CloudTraceSpanExporter(SpanExporter):
             end_time = _get_time_from_ns(span.end_time)
 
             if span.attributes and len(span.attributes) > MAX_SPAN_ATTRS:
-                logger.warning(
-                    "Span has more then %s attributes, some will be truncated",
-                    MAX_SPAN_ATTRS,
+                _TRUNCATION_WARNINGS.add(_SPAN_ATTRS_TRUNCATED)
+
+            if span.resource is not last_resource:
+                last_resource = span.resource
+                resource_labels, value_cache = self._get_resource_labels(
+                    span.resource
                 )
 
             # Span does not support a MonitoredResource object. We put the
             # information into attributes instead.
             resources_and_attrs = {
                 **(span.attributes or {}),
-                **_extract_resources(span.resource, self.resource_regex),
+                **resource_labels,
             }
 
+            child_span_count = None
+            same_process_as_parent_span = None
+            if child_span_counts is not None:
+                # children exported after their parent aren't counted, so a zero count
+                # is left unset rather than claiming the span has no children
+                child_span_count = child_span_counts[index] or None
+                if span.parent:
+                    same_process_as_parent_span = not span.parent.is_remote
+
             cloud_trace_spans.append(
                 trace_types.Span(
                     name=span_name,
@@ -260,31 +853,583 @@ class CloudTraceSpanExporter(SpanExporter):
                         resources_and_attrs,
                         MAX_SPAN_ATTRS,
                         add_agent_attr=True,
+                        value_cache=value_cache,
                     ),
                     links=_extract_links(span.links),
                     status=_extract_status(span.status),
                     time_events=_extract_events(span.events),
                     span_kind=_extract_span_kind(span.kind),
+                    same_process_as_parent_span=same_process_as_parent_span,
+                    child_span_count=child_span_count,
+                )
+            )
+
+        return cloud_trace_spans
+
+    def _translate_to_cloud_trace_pb(
+        self,
+        spans: Sequence[ReadableSpan],
+        project_ids: Optional[Sequence[str]] = None,
+        child_span_counts: Optional[Sequence[int]] = None,
+    ) -> List[Message]:
+        """Translate the spans to Cloud Trace format, building the raw protobuf messages.
+
+        Produces the same messages as :meth:`_translate_to_cloud_trace` without going
+        through the proto-plus wrappers.
+
+        Args:
+            spans: Sequence of spans to convert
+            project_ids: Project of each span. Defaults to the exporter's project.
+            child_span_counts: See :meth:`_translate_to_cloud_trace`.
+        """
+
+        cloud_trace_spans: List[Message] = []
+        last_resource: Optional[Resource] = None
+        resource_labels: Dict[str, str] = {}
+        value_cache: Optional[_ValueCache] = None
+        if child_span_counts is None:
+            child_span_counts = self._take_child_span_counts(spans)
+
+        for index, span in enumerate(spans):
+            ctx = span.get_span_context()
+            trace_id = format_trace_id(ctx.trace_id)
+            span_id = format_span_id(ctx.span_id)
+            span_pb = _span_pb_type()(
+                name="projects/{}/traces/{}/spans/{}".format(
+                    project_ids[index] if project_ids else self.project_id,
+                    trace_id,
+                    span_id,
+                ),
+                span_id=span_id,
+                span_kind=_extract_span_kind(span.kind),
+            )
+
+            if span.parent:
+                span_pb.parent_span_id = format_span_id(span.parent.span_id)
+
+            _set_truncatable_str_pb(span_pb.display_name, span.name, 128)
+            if span.start_time:
+                span_pb.start_time.FromNanoseconds(span.start_time)
+            if span.end_time:
+                span_pb.end_time.FromNanoseconds(span.end_time)
+
+            if span.attributes and len(span.attributes) > MAX_SPAN_ATTRS:
+                _TRUNCATION_WARNINGS.add(_SPAN_ATTRS_TRUNCATED)
+
+            if span.resource is not last_resource:
+                last_resource = span.resource
+                resource_labels, value_cache = self._get_resource_labels(
+                    span.resource
                 )
+
+            # Span does not support a MonitoredResource object. We put the
+            # information into attributes instead.
+            _set_attributes_pb(
+                span_pb.attributes,
+                {**(span.attributes or {}), **resource_labels},
+                MAX_SPAN_ATTRS,
+                add_agent_attr=True,
+                value_cache=value_cache,
             )
-            # TODO: Leverage more of the Cloud Trace API, e.g.
-            #  same_process_as_parent_span and child_span_count
+            if span.links:
+                _set_links_pb(span_pb.links, span.links)
+            status = _extract_status(span.status)
+            if status is not None:
+                span_pb.status.CopyFrom(status)
+            if span.events:
+                _set_events_pb(span_pb.time_events, span.events)
+            if child_span_counts is not None:
+                # see _translate_to_cloud_trace
+                if child_span_counts[index]:
+                    span_pb.child_span_count.value = child_span_counts[index]
+                if span.parent:
+                    span_pb.same_process_as_parent_span.value = (
+                        not span.parent.is_remote
+                    )
+
+            cloud_trace_spans.append(span_pb)
 
         return cloud_trace_spans
 
+    def _get_resource_labels(self, resource: Resource) -> _ResourceLabels:
+        """Return the span labels for a resource, memoized per Resource instance.
+
+        Resources are immutable, so the regex matching and monitored resource mapping done by
+        :func:`_extract_resources` only needs to happen once per distinct resource, and so
+        does the translation of the label values, cached by the returned value cache.
+        """
+        key = id(resource)
+        with self._resource_labels_lock:
+            cached = self._resource_labels_cache.get(key)
+            if cached is not None and cached[0] is resource:
+                self._resource_labels_cache.move_to_end(key)
+                return cached[1]
+
+        extracted = _extract_resources(resource, self.resource_regex)
+        labels = _ResourceLabels(
+            extracted,
+            _ResourceValueCache(extracted, self._attribute_value_cache),
+        )
+        with self._resource_labels_lock:
+            self._resource_labels_cache[key] = (resource, labels)
+            self._resource_labels_cache.move_to_end(key)
+            while len(self._resource_labels_cache) > _MAX_CACHED_RESOURCES:
+                self._resource_labels_cache.popitem(last=False)
+        return labels
+
+
+class CloudTraceSpanExporter(_CloudTraceExporterBase, SpanExporter):
+    """Cloud Trace span exporter for OpenTelemetry.
+
+    Args:
+        project_id: GCP project ID for the project to send spans to. Alternatively, can be
+            configured with :envvar:`OTEL_EXPORTER_GCP_TRACE_PROJECT_ID`. Spans with a
+            ``gcp.project_id`` attribute, or whose resource has one, are sent to that
+            project instead, the span's attribute taking precedence. The credentials
+            must be allowed to write traces to every such project.
+        client: Cloud Trace client. If not given, will be taken from gcloud
+            default credentials
+        resource_regex: Resource attributes with keys matching this regex will be added to
+            exported spans as labels (default: None). Alternatively, can be configured with
+            :envvar:`OTEL_EXPORTER_GCP_TRACE_RESOURCE_REGEX`.
+        use_proto_plus: Translate spans through the proto-plus wrapper types instead of
+            building the underlying protobuf messages directly. This is considerably slower
+            and only kept for comparison (default: False).
+        max_concurrent_requests: Maximum number of BatchWriteSpans requests sent concurrently
+            when an export is split into several requests, e.g. one per project the spans
+            are sent to (default: 1).
+        export_timeout_millis: Deadline for a whole export. Requests failing with
+            ``UNAVAILABLE`` or ``DEADLINE_EXCEEDED`` are retried with jittered exponential
+            backoff until it expires (default: 30000).
+        attribute_value_cache_size: Number of translated span attribute values to keep
+            in an LRU cache and reuse for spans with the same values, e.g.
+            ``http.method=GET``. Only strings up to 256 characters, ints and bools are
+            cached. This mostly speeds up ``use_proto_plus``, the default translation
+            only saves truncating the cached strings. See
+            :meth:`attribute_value_cache_info` (default: 0, disabled).
+        group_spans_by_trace: Group the spans of an export by trace, so that the spans
+            of a trace are written in the same BatchWriteSpans request whenever they fit
+            in one, and fill in the ``child_span_count`` and
+            ``same_process_as_parent_span`` span fields. Only children exported before
+            their parent are counted, which is usually all of them as children end
+            first, and ``child_span_count`` is left unset when none were (default:
+            False).
+        spill_directory: Local directory to spill requests to when they still fail with
+            a transient error after retrying. Spilled requests are written again in the
+            background, including those left behind by a previous process. May be
+            shared by several processes, e.g. pre-fork server workers, which each lock
+            their own subdirectory. Disabled by default. Alternatively, can be configured
+            with :envvar:`OTEL_EXPORTER_GCP_TRACE_SPILL_DIRECTORY`.
+        spill_max_bytes: Maximum disk space used by each process in ``spill_directory``.
+            The oldest spilled spans are dropped when it is exceeded (default: 64 MiB).
+        compression: Compression of the requests sent on the channel created when no
+            ``client`` is given, e.g. ``grpc.Compression.Gzip``. Alternatively, can be
+            configured with :envvar:`OTEL_EXPORTER_GCP_TRACE_COMPRESSION` (default: no
+            compression).
+        meter_provider: MeterProvider to report the exporter's own metrics with, as the
+            ``gcp.exporter.*`` instruments of the ``opentelemetry.exporter.cloud_trace``
+            meter: export durations, request sizes and spans per request, failed
+            requests by gRPC status code, and the span attributes, events and links
+            dropped to fit Cloud Trace's limits (default: None, not reported).
+        use_wire_encoder: Write the protobuf wire format of the requests straight from
+            the spans instead of building protobuf messages, and send it through
+            ``client``'s gRPC channel as is. The requests are the same, this only
+            saves allocating the messages. Requires a client with a gRPC transport and
+            can't be combined with ``use_proto_plus`` (default: False).
+        translation_processes: Number of worker processes to translate and serialize
+            the spans in, so that the exporter thread only takes a snapshot of each
+            batch and sends the requests. This keeps the translation from holding the
+            GIL in a CPU-bound application, at the cost of copying the batches to the
+            workers. The workers are started with ``forkserver`` or ``spawn``, which
+            requires the main module to be safe to import, like with
+            :mod:`multiprocessing`. Requires a client with a gRPC transport and can't
+            be combined with ``use_proto_plus`` (default: 0, translated on the
+            exporter thread).
+    """
+
+    def __init__(
+        self,
+        project_id=None,
+        client=None,
+        resource_regex=None,
+        *,
+        use_proto_plus: bool = False,
+        max_concurrent_requests: int = 1,
+        export_timeout_millis: float = 30000,
+        attribute_value_cache_size: int = 0,
+        group_spans_by_trace: bool = False,
+        spill_directory: Optional[str] = None,
+        spill_max_bytes: int = DEFAULT_SPILL_MAX_BYTES,
+        compression: Optional[grpc.Compression] = None,
+        meter_provider: Optional[MeterProvider] = None,
+        use_wire_encoder: bool = False,
+        translation_processes: int = 0,
+    ):
+        if use_wire_encoder and use_proto_plus:
+            raise ValueError(
+                "use_wire_encoder can't be combined with use_proto_plus"
+            )
+        if translation_processes < 0:
+            raise ValueError("translation_processes must not be negative")
+        if translation_processes and use_proto_plus:
+            raise ValueError(
+                "translation_processes can't be combined with use_proto_plus"
+            )
+        if client is None:
+            if compression is None:
+                # pylint: disable=import-outside-toplevel
+                from opentelemetry.resourcedetector.gcp_resource_detector._channel_pool import (
+                    compression_from_env,
+                )
+
+                compression = compression_from_env(
+                    OTEL_EXPORTER_GCP_TRACE_COMPRESSION
+                )
+            client = _create_default_client(compression)
+        self.client: TraceServiceClient = client
+        super().__init__(
+            project_id,
+            resource_regex,
+            use_proto_plus,
+            max_concurrent_requests,
+            export_timeout_millis,
+            attribute_value_cache_size,
+            group_spans_by_trace,
+            meter_provider,
+        )
+
+        self._wire_encoder: Optional[WireEncoder] = None
+        self._encoded_request_sender: Optional[EncodedRequestSender] = None
+        self._translation_pool: Optional[TranslationPool] = None
+        if use_wire_encoder or translation_processes:
+            # pylint: disable=import-outside-toplevel
+            from opentelemetry.exporter.cloud_trace._wire_encoder import (
+                EncodedRequestSender,
+                WireEncoder,
+            )
+
+            self._encoded_request_sender = EncodedRequestSender(client)
+            if use_wire_encoder:
+                self._wire_encoder = WireEncoder()
+        if translation_processes:
+            # pylint: disable=import-outside-toplevel
+            from opentelemetry.exporter.cloud_trace._translation_pool import (
+                TranslationPool,
+                TranslatorConfig,
+            )
+
+            self._translation_pool = TranslationPool(
+                translation_processes,
+                TranslatorConfig(
+                    str(self.project_id),
+                    self.resource_regex.pattern
+                    if self.resource_regex
+                    else None,
+                    attribute_value_cache_size,
+                    group_spans_by_trace,
+                    use_wire_encoder,
+                    self._telemetry is not None,
+                ),
+            )
+
+        self._executor: Optional[ThreadPoolExecutor] = None
+        if max_concurrent_requests > 1:
+            self._executor = ThreadPoolExecutor(
+                max_workers=max_concurrent_requests,
+                thread_name_prefix="CloudTraceSpanExporter",
+            )
+
+        if not spill_directory:
+            spill_directory = environ.get(
+                OTEL_EXPORTER_GCP_TRACE_SPILL_DIRECTORY
+            )
+        self._spill_queue: Optional[SpillQueue] = None
+        if spill_directory:
+            self._spill_queue = SpillQueue(
+                spill_directory,
+                self._write_spilled_request,
+                spill_max_bytes,
+                _SPILL_REPLAY_INTERVAL,
+            )
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        """Export the spans to Cloud Trace.
+
+        See: https://cloud.google.com/trace/docs/reference/v2/rest/v2/projects.traces/batchWrite
+
+        Args:
+            spans: Sequence of spans to export
+        """
+        start = time.monotonic()
+        try:
+            return self._export(spans, start + self._export_timeout)
+        finally:
+            if self._telemetry is not None:
+                self._telemetry.record_export(time.monotonic() - start)
+
+    def _export(
+        self, spans: Sequence[ReadableSpan], deadline: float
+    ) -> SpanExportResult:
+        try:
+            requests: Sequence[_Request]
+            if self._translation_pool is not None:
+                requests = self._translate_in_pool(
+                    self._translation_pool, spans, deadline
+                )
+            elif self._wire_encoder is not None:
+                requests = self._encode_requests(self._wire_encoder, spans)
+            else:
+                requests = self._translate_to_requests(spans)
+        # pylint: disable=broad-except
+        except Exception as ex:
+            logger.error("Error while writing to Cloud Trace", exc_info=ex)
+            return SpanExportResult.FAILURE
+
+        if self._executor is None or len(requests) <= 1:
+            results = [
+                self._write_request(request, deadline) for request in requests
+            ]
+        else:
+            # Run each request in a copy of the current context so that e.g. the SDK's
+            # instrumentation suppression applies to the gRPC calls on the worker threads.
+            futures = [
+                self._executor.submit(
+                    self._write_request_in_context,
+                    contextvars.copy_context(),
+                    request,
+                    deadline,
+                )
+                for request in requests
+            ]
+            results = [future.result() for future in futures]
+
+        if all(results):
+            return SpanExportResult.SUCCESS
+        return SpanExportResult.FAILURE
+
+    def _translate_in_pool(
+        self,
+        translation_pool: TranslationPool,
+        spans: Sequence[ReadableSpan],
+        deadline: float,
+    ) -> List[_EncodedBatchWriteSpansRequest]:
+        """Equivalent of :meth:`_translate_to_requests` translating the spans in
+        ``translation_pool``, waiting for it until ``deadline``."""
+        spans, group_lengths = self._group_spans(spans)
+        translated = translation_pool.translate(
+            spans,
+            group_lengths,
+            self._take_child_span_counts(spans),
+            deadline - time.monotonic(),
+        )
+        if self._telemetry is not None:
+            for size, items in translated.recorded_requests:
+                self._telemetry.record_request(size, items)
+            for dropped_type, count in translated.recorded_dropped:
+                self._telemetry.record_dropped(dropped_type, count)
+        for description, count in translated.truncations.items():
+            _TRUNCATION_WARNINGS.add(description, count)
+        return translated.requests
+
+    def _write_request_in_context(
+        self,
+        ctx: contextvars.Context,
+        request: _Request,
+        deadline: float,
+    ) -> bool:
+        return ctx.run(self._write_request, request, deadline)
+
+    def _write_request(self, request: _Request, deadline: float) -> bool:
+        try:
+            self._send_request(request, deadline)
+        # pylint: disable=broad-except
+        except Exception as ex:
+            logger.error("Error while writing to Cloud Trace", exc_info=ex)
+            if self._telemetry is not None:
+                self._telemetry.record_failure(ex)
+            if self._spill_queue is not None and isinstance(
+                ex, _transient_errors()
+            ):
+                if isinstance(request, _EncodedBatchWriteSpansRequest):
+                    payload = request.payload
+                else:
+                    payload = trace_v2.BatchWriteSpansRequest.pb(
+                        request
+                    ).SerializeToString()
+                self._spill_queue.append(payload)
+            return False
+        return True
+
+    def _send_request(self, request: _Request, deadline: float) -> None:
+        timeout = deadline - time.monotonic()
+        if timeout <= 0:
+            raise api_exceptions.DeadlineExceeded(
+                "Export deadline exceeded before writing to Cloud Trace"
+            )
+        if isinstance(request, _EncodedBatchWriteSpansRequest):
+            # only created with an encoded request sender
+            cast(
+                "EncodedRequestSender", self._encoded_request_sender
+            ).batch_write_spans(
+                request, _retry().with_timeout(timeout), timeout
+            )
+            return
+        self.client.batch_write_spans(
+            request=request,
+            retry=_retry().with_timeout(timeout),
+            timeout=timeout,
+        )
+
+    def _write_spilled_request(self, payload: bytes) -> bool:
+        """Write a request from the spill queue. Returns False if it should be kept to
+        be written again later."""
+        try:
+            request = _make_batch_write_request_from_bytes(payload)
+        except DecodeError as ex:
+            logger.error("Dropping corrupt spilled spans", exc_info=ex)
+            return True
+
+        # like the SDK's span processors, don't trace the exporter's own requests
+        token = attach(set_value(_SUPPRESS_INSTRUMENTATION_KEY, True))
+        try:
+            self._send_request(
+                request, time.monotonic() + self._export_timeout
+            )
+        except _transient_errors():
+            return False
+        # pylint: disable=broad-except
+        except Exception as ex:
+            logger.error("Dropping spilled spans", exc_info=ex)
+        finally:
+            detach(token)
+        return True
+
     def shutdown(self):
-        pass
+        if self._executor is not None:
+            self._executor.shutdown()
+        if self._translation_pool is not None:
+            self._translation_pool.shutdown()
+        if self._spill_queue is not None:
+            self._spill_queue.shutdown()
+        _TRUNCATION_WARNINGS.flush()
+
+
+def _group_by_trace(
+    spans: Sequence[ReadableSpan],
+) -> List[List[ReadableSpan]]:
+    """Group spans by trace, ordered by the first span of each trace."""
+    traces: Dict[int, List[ReadableSpan]] = {}
+    for span in spans:
+        traces.setdefault(span.context.trace_id, []).append(span)
+    return list(traces.values())
+
+
+def _split_by_project(
+    spans_pb: Sequence[_T],
+    group_lengths: Optional[Sequence[int]],
+    project_ids: Sequence[str],
+) -> Dict[str, Tuple[List[_T], List[int]]]:
+    """Split the spans, and the groups of spans to keep together, by project, in the
+    order the projects first appear. A group with spans of several projects is split."""
+    projects: Dict[str, Tuple[List[_T], List[int]]] = {}
+    if group_lengths is None:
+        group_lengths = [1] * len(spans_pb)
+    group_start = 0
+    for group_length in group_lengths:
+        group_end = group_start + group_length
+        group_projects: Dict[str, int] = {}
+        for span_pb, project_id in zip(
+            spans_pb[group_start:group_end],
+            project_ids[group_start:group_end],
+        ):
+            projects.setdefault(project_id, ([], []))[0].append(span_pb)
+            group_projects[project_id] = group_projects.get(project_id, 0) + 1
+        for project_id, length in group_projects.items():
+            projects[project_id][1].append(length)
+        group_start = group_end
+    return projects
+
+
+def _record_dropped(
+    telemetry: ExporterTelemetry, spans_pb: Sequence[Any]
+) -> None:
+    """Count the attributes, events and links dropped while translating the spans, from
+    the dropped counts set in the messages."""
+    attributes = links = events = 0
+    for span_pb in spans_pb:
+        attributes += span_pb.attributes.dropped_attributes_count
+        links += span_pb.links.dropped_links_count
+        for link_pb in span_pb.links.link:
+            attributes += link_pb.attributes.dropped_attributes_count
+        events += span_pb.time_events.dropped_annotations_count
+        for time_event_pb in span_pb.time_events.time_event:
+            attributes += (
+                time_event_pb.annotation.attributes.dropped_attributes_count
+            )
+    telemetry.record_dropped("attribute", attributes)
+    telemetry.record_dropped("link", links)
+    telemetry.record_dropped("event", events)
+
+
+def _make_batch_write_request(
+    name: str, spans_pb: Sequence[Message]
+) -> BatchWriteSpansRequest:
+    # wrap() takes ownership of the raw message without copying it
+    return trace_v2.BatchWriteSpansRequest.wrap(
+        _batch_write_spans_request_pb_type()(name=name, spans=spans_pb)
+    )
+
+
+class _EncodedBatchWriteSpansRequest(NamedTuple):
+    """BatchWriteSpans request already in protobuf wire format, see WireEncoder."""
+
+    name: str
+    payload: bytes
+
+
+# Requests sent by CloudTraceSpanExporter, encoded with use_wire_encoder and
+# translation_processes. Spilled requests are always sent as BatchWriteSpansRequest.
+_Request = Union["BatchWriteSpansRequest", _EncodedBatchWriteSpansRequest]
+
+
+def _make_batch_write_request_from_bytes(
+    data: bytes,
+) -> BatchWriteSpansRequest:
+    return trace_v2.BatchWriteSpansRequest.wrap(
+        _batch_write_spans_request_pb_type().FromString(data)
+    )
 
 
-def _get_time_from_ns(nanoseconds: Optional[int]) -> Optional[Timestamp]:
-    """Given epoch nanoseconds, split into epoch milliseconds and remaining
-    nanoseconds"""
+def _varint_size(value: int) -> int:
+    """Number of bytes needed to encode value as a protobuf varint"""
+    size = 1
+    while value > 0x7F:
+        value >>= 7
+        size += 1
+    return size
+
+
+def _length_delimited_size(byte_size: int) -> int:
+    """Encoded size of a length delimited field of byte_size bytes with a one byte tag"""
+    return 1 + _varint_size(byte_size) + byte_size
+
+
+_NANOS_PER_SECOND = 1_000_000_000
+
+
+def _get_time_from_ns(
+    nanoseconds: Optional[int],
+) -> Optional[Dict[str, int]]:
+    """Given epoch nanoseconds, split into epoch seconds and remaining
+    nanoseconds, as the fields of a Timestamp.
+
+    proto-plus sets a message field from a dict of its fields directly, while a
+    Timestamp message would be marshalled and copied again.
+    """
     if not nanoseconds:
         return None
-    ts = Timestamp()
-    # pylint: disable=no-member
-    ts.FromNanoseconds(nanoseconds)
-    return ts
+    seconds, nanos = divmod(nanoseconds, _NANOS_PER_SECOND)
+    return {"seconds": seconds, "nanos": nanos}
 
 
 def _get_truncatable_str_object(str_to_convert: str, max_length: int):
@@ -297,8 +1442,28 @@ def _get_truncatable_str_object(str_to_convert: str, max_length: int):
     )
 
 
+def _set_truncatable_str_pb(
+    truncatable_str_pb: Any, str_to_convert: str, max_length: int
+) -> None:
+    """Raw protobuf equivalent of :func:`_get_truncatable_str_object`, filling in
+    ``truncatable_str_pb`` in place."""
+    (
+        truncatable_str_pb.value,
+        truncatable_str_pb.truncated_byte_count,
+    ) = _truncate_str(str_to_convert, max_length)
+
+
 def _truncate_str(str_to_check: str, limit: int) -> Tuple[str, int]:
     """Check the length of a string. If exceeds limit, then truncate it."""
+    # A character is at most 4 bytes in UTF-8 and exactly 1 if it is ASCII, so most
+    # strings can be checked without encoding them.
+    length = len(str_to_check)
+    if length * 4 <= limit:
+        return str_to_check, 0
+    if str_to_check.isascii():
+        if length <= limit:
+            return str_to_check, 0
+        return str_to_check[:limit], length - limit
     encoded = str_to_check.encode("utf-8")
     truncated_str = encoded[:limit].decode("utf-8", errors="ignore")
     return truncated_str, len(encoded) - len(truncated_str.encode("utf-8"))
@@ -336,19 +1501,13 @@ def _extract_links(
     extracted_links: List[trace_types.Span.Link] = []
     dropped_links = 0
     if len(links) > MAX_NUM_LINKS:
-        logger.warning(
-            "Exporting more then %s links, some will be truncated",
-            MAX_NUM_LINKS,
-        )
+        _TRUNCATION_WARNINGS.add(_LINKS_TRUNCATED)
         dropped_links = len(links) - MAX_NUM_LINKS
         links = links[:MAX_NUM_LINKS]
     for link in links:
         link_attributes = link.attributes or {}
         if len(link_attributes) > MAX_LINK_ATTRS:
-            logger.warning(
-                "Link has more then %s attributes, some will be truncated",
-                MAX_LINK_ATTRS,
-            )
+            _TRUNCATION_WARNINGS.add(_LINK_ATTRS_TRUNCATED)
         trace_id = format_trace_id(link.context.trace_id)
         span_id = format_span_id(link.context.span_id)
         extracted_links.append(
@@ -375,19 +1534,12 @@ def _extract_events(
     time_events: List[trace_types.Span.TimeEvent] = []
     dropped_annontations = 0
     if len(events) > MAX_NUM_EVENTS:
-        logger.warning(
-            "Exporting more then %s annotations, some will be truncated",
-            MAX_NUM_EVENTS,
-        )
+        _TRUNCATION_WARNINGS.add(_EVENTS_TRUNCATED)
         dropped_annontations = len(events) - MAX_NUM_EVENTS
         events = events[:MAX_NUM_EVENTS]
     for event in events:
         if event.attributes and len(event.attributes) > MAX_EVENT_ATTRS:
-            logger.warning(
-                "Event %s has more then %s attributes, some will be truncated",
-                event.name,
-                MAX_EVENT_ATTRS,
-            )
+            _TRUNCATION_WARNINGS.add(_EVENT_ATTRS_TRUNCATED)
         time_events.append(
             trace_types.Span.TimeEvent(
                 time=_get_time_from_ns(event.timestamp),
@@ -406,21 +1558,73 @@ def _extract_events(
     )
 
 
+def _set_links_pb(links_pb: Any, links: Sequence[trace_api.Link]) -> None:
+    """Raw protobuf equivalent of :func:`_extract_links`, filling in ``links_pb`` in
+    place."""
+    dropped_links = 0
+    if len(links) > MAX_NUM_LINKS:
+        _TRUNCATION_WARNINGS.add(_LINKS_TRUNCATED)
+        dropped_links = len(links) - MAX_NUM_LINKS
+        links = links[:MAX_NUM_LINKS]
+    for link in links:
+        link_attributes = link.attributes or {}
+        if len(link_attributes) > MAX_LINK_ATTRS:
+            _TRUNCATION_WARNINGS.add(_LINK_ATTRS_TRUNCATED)
+        link_pb = links_pb.link.add(
+            trace_id=format_trace_id(link.context.trace_id),
+            span_id=format_span_id(link.context.span_id),
+        )
+        _set_attributes_pb(link_pb.attributes, link_attributes, MAX_LINK_ATTRS)
+    links_pb.dropped_links_count = dropped_links
+
+
+def _set_events_pb(time_events_pb: Any, events: Sequence[Event]) -> None:
+    """Raw protobuf equivalent of :func:`_extract_events`, filling in ``time_events_pb`` in
+    place."""
+    dropped_annontations = 0
+    if len(events) > MAX_NUM_EVENTS:
+        _TRUNCATION_WARNINGS.add(_EVENTS_TRUNCATED)
+        dropped_annontations = len(events) - MAX_NUM_EVENTS
+        events = events[:MAX_NUM_EVENTS]
+    for event in events:
+        if event.attributes and len(event.attributes) > MAX_EVENT_ATTRS:
+            _TRUNCATION_WARNINGS.add(_EVENT_ATTRS_TRUNCATED)
+        time_event_pb = time_events_pb.time_event.add()
+        if event.timestamp:
+            time_event_pb.time.FromNanoseconds(event.timestamp)
+        annotation_pb = time_event_pb.annotation
+        _set_truncatable_str_pb(annotation_pb.description, event.name, 256)
+        _set_attributes_pb(
+            annotation_pb.attributes, event.attributes, MAX_EVENT_ATTRS
+        )
+    time_events_pb.dropped_annotations_count = dropped_annontations
+    time_events_pb.dropped_message_events_count = 0
+
+
 # pylint: disable=no-member
-SPAN_KIND_MAPPING = {
-    trace_api.SpanKind.INTERNAL: trace_types.Span.SpanKind.INTERNAL,
-    trace_api.SpanKind.CLIENT: trace_types.Span.SpanKind.CLIENT,
-    trace_api.SpanKind.SERVER: trace_types.Span.SpanKind.SERVER,
-    trace_api.SpanKind.PRODUCER: trace_types.Span.SpanKind.PRODUCER,
-    trace_api.SpanKind.CONSUMER: trace_types.Span.SpanKind.CONSUMER,
-}
+@lru_cache(maxsize=None)
+def _span_kind_mapping() -> Dict[trace_api.SpanKind, int]:
+    return {
+        trace_api.SpanKind.INTERNAL: trace_types.Span.SpanKind.INTERNAL,
+        trace_api.SpanKind.CLIENT: trace_types.Span.SpanKind.CLIENT,
+        trace_api.SpanKind.SERVER: trace_types.Span.SpanKind.SERVER,
+        trace_api.SpanKind.PRODUCER: trace_types.Span.SpanKind.PRODUCER,
+        trace_api.SpanKind.CONSUMER: trace_types.Span.SpanKind.CONSUMER,
+    }
+
+
+def __getattr__(name: str) -> Any:
+    # SPAN_KIND_MAPPING needs the client library, so it is built on first access
+    if name == "SPAN_KIND_MAPPING":
+        return _span_kind_mapping()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 # pylint: disable=no-member
 def _extract_span_kind(
     span_kind: trace_api.SpanKind,
 ) -> int:
-    return SPAN_KIND_MAPPING.get(
+    return _span_kind_mapping().get(
         span_kind, trace_types.Span.SpanKind.SPAN_KIND_UNSPECIFIED
     )
 
@@ -429,6 +1633,32 @@ def _strip_characters(ot_version):
     return "".join(filter(lambda x: x.isdigit() or x == ".", ot_version))
 
 
+def _agent_attribute_str() -> str:
+    return "opentelemetry-python {}; google-cloud-trace-exporter {}".format(
+        _strip_characters(_OTEL_SDK_VERSION),
+        _strip_characters(__version__),
+    )
+
+
+# The g.co/agent attribute added to every span only depends on the package versions, so
+# it is translated once and copied into each span.
+_AGENT_ATTRIBUTE_KEY = "g.co/agent"
+
+
+@lru_cache(maxsize=None)
+def _agent_attribute_value() -> trace_types.AttributeValue:
+    return trace_types.AttributeValue(
+        string_value=_get_truncatable_str_object(
+            _agent_attribute_str(), MAX_ATTR_VAL_BYTES
+        )
+    )
+
+
+@lru_cache(maxsize=None)
+def _agent_attribute_value_pb() -> Any:
+    return trace_types.AttributeValue.pb(_agent_attribute_value())
+
+
 def _extract_resources(
     resource: Resource, resource_regex: Optional[Pattern] = None
 ) -> Dict[str, str]:
@@ -472,10 +1702,32 @@ LABELS_MAPPING = {
 }
 
 
+# Attribute keys come from instrumentation code and repeat across spans, so their
+# translation is cached. The cache is cleared when it is full, so that keys embedding
+# IDs can't keep the hot keys out of it for good; those are cached again right away.
+_MAX_CACHED_ATTRIBUTE_KEYS = 1024
+_attribute_key_cache: Dict[str, str] = {}
+
+
+def _translate_attribute_key(ot_key: str) -> str:
+    """Truncate an attribute key and map it to its Cloud Trace label, caching the
+    result."""
+    cached_key = _attribute_key_cache.get(ot_key)
+    if cached_key is not None:
+        return cached_key
+    key = _truncate_str(ot_key, MAX_ATTR_KEY_BYTES)[0]
+    key = LABELS_MAPPING.get(key, key)
+    if len(_attribute_key_cache) >= _MAX_CACHED_ATTRIBUTE_KEYS:
+        _attribute_key_cache.clear()
+    _attribute_key_cache[ot_key] = key
+    return key
+
+
 def _extract_attributes(
     attrs: types.Attributes,
     num_attrs_limit: int,
     add_agent_attr: bool = False,
+    value_cache: Optional[_ValueCache] = None,
 ) -> trace_types.Span.Attributes:
     """Convert span.attributes to dict."""
     attributes_dict: BoundedDict[
@@ -483,22 +1735,19 @@ def _extract_attributes(
     ] = BoundedDict(num_attrs_limit)
     invalid_value_dropped_count = 0
     for ot_key, ot_value in attrs.items() if attrs else []:
-        key = _truncate_str(ot_key, MAX_ATTR_KEY_BYTES)[0]
-        if key in LABELS_MAPPING:  # pylint: disable=consider-using-get
-            key = LABELS_MAPPING[key]
-        value = _format_attribute_value(ot_value)
+        key = _translate_attribute_key(ot_key)
+        value = None
+        if value_cache is not None:
+            value = value_cache.get(ot_value, _format_attribute_value)
+        if value is None:
+            value = _format_attribute_value(ot_value)
 
         if value is not None:
             attributes_dict[key] = value
         else:
             invalid_value_dropped_count += 1
     if add_agent_attr:
-        attributes_dict["g.co/agent"] = _format_attribute_value(
-            "opentelemetry-python {}; google-cloud-trace-exporter {}".format(
-                _strip_characters(_OTEL_SDK_VERSION),
-                _strip_characters(__version__),
-            )
-        )
+        attributes_dict[_AGENT_ATTRIBUTE_KEY] = _agent_attribute_value()
     return trace_types.Span.Attributes(
         attribute_map=dict(attributes_dict),
         dropped_attributes_count=attributes_dict.dropped
@@ -506,6 +1755,107 @@ def _extract_attributes(
     )
 
 
+def _set_attributes_pb(
+    attributes_pb: Any,
+    attrs: types.Attributes,
+    num_attrs_limit: int,
+    add_agent_attr: bool = False,
+    value_cache: Optional[_ValueCache] = None,
+) -> None:
+    """Raw protobuf equivalent of :func:`_extract_attributes`, filling in ``attributes_pb``
+    in place. Cached values are copied into the message."""
+    bounded, dropped_count = _bound_attributes(
+        attrs, num_attrs_limit, add_agent_attr
+    )
+    attribute_map = attributes_pb.attribute_map
+    for key, value in bounded.items():
+        cached = None
+        if value_cache is not None:
+            cached = value_cache.get(value, _attribute_value_pb)
+        if cached is not None:
+            attribute_map[key].CopyFrom(cached)
+        else:
+            _set_attribute_value_pb(attribute_map[key], value)
+    if add_agent_attr:
+        attribute_map[_AGENT_ATTRIBUTE_KEY].CopyFrom(
+            _agent_attribute_value_pb()
+        )
+    attributes_pb.dropped_attributes_count = dropped_count
+
+
+def _bound_attributes(
+    attrs: types.Attributes, num_attrs_limit: int, add_agent_attr: bool
+) -> Tuple[Dict[str, Any], int]:
+    """Return the valid attributes to keep by their translated key, and the number of
+    attributes dropped, leaving room for the agent attribute if ``add_agent_attr``."""
+    # Same eviction semantics as the BoundedDict used by _extract_attributes, resolved
+    # before translating the values so evicted attributes are never translated.
+    bounded: Dict[str, Any] = {}
+    dropped_count = 0
+    for ot_key, ot_value in attrs.items() if attrs else []:
+        if not _is_valid_attribute_value(ot_value):
+            _warn_invalid_attribute_value(ot_value)
+            dropped_count += 1
+            continue
+        key = _translate_attribute_key(ot_key)
+        if key in bounded:
+            del bounded[key]
+        elif len(bounded) >= num_attrs_limit:
+            del bounded[next(iter(bounded))]
+            dropped_count += 1
+        bounded[key] = ot_value
+    if add_agent_attr:
+        # make room for the agent attribute, which is set last below
+        if _AGENT_ATTRIBUTE_KEY in bounded:
+            del bounded[_AGENT_ATTRIBUTE_KEY]
+        elif len(bounded) >= num_attrs_limit:
+            del bounded[next(iter(bounded))]
+            dropped_count += 1
+    return bounded, dropped_count
+
+
+def _set_attribute_value_pb(attribute_value_pb: Any, value: Any) -> None:
+    """Raw protobuf equivalent of :func:`_format_attribute_value` for a value already
+    checked with :func:`_is_valid_attribute_value`."""
+    if isinstance(value, bool):
+        attribute_value_pb.bool_value = value
+    elif isinstance(value, int):
+        attribute_value_pb.int_value = value
+    elif isinstance(value, str):
+        _set_truncatable_str_pb(
+            attribute_value_pb.string_value, value, MAX_ATTR_VAL_BYTES
+        )
+    elif isinstance(value, float):
+        _set_truncatable_str_pb(
+            attribute_value_pb.string_value,
+            "{:0.4f}".format(value),
+            MAX_ATTR_VAL_BYTES,
+        )
+    else:
+        _set_truncatable_str_pb(
+            attribute_value_pb.string_value,
+            ",".join(str(x) for x in value),
+            MAX_ATTR_VAL_BYTES,
+        )
+
+
+def _attribute_value_pb(value: Any) -> Any:
+    attribute_value_pb = _attribute_value_pb_type()()
+    _set_attribute_value_pb(attribute_value_pb, value)
+    return attribute_value_pb
+
+
+def _is_valid_attribute_value(value: Any) -> bool:
+    return isinstance(value, (bool, int, str, float, SequenceABC))
+
+
+def _warn_invalid_attribute_value(value: Any) -> None:
+    # values must be bool, int, str or float, or a sequence of these
+    _TRUNCATION_WARNINGS.add(
+        f"attribute values of unsupported type {type(value).__name__}"
+    )
+
+
 @overload
 def _format_attribute_value(
     value: types.AttributeValue,
@@ -541,12 +1891,7 @@ def _format_attribute_value(
             ",".join(str(x) for x in value), MAX_ATTR_VAL_BYTES
         )
     else:
-        logger.warning(
-            "ignoring attribute value %s of type %s. Values type must be one "
-            "of bool, int, string or float, or a sequence of these",
-            value,
-            type(value),
-        )
+        _warn_invalid_attribute_value(value)
         return None
 
     return trace_types.AttributeValue(**{value_type: value})
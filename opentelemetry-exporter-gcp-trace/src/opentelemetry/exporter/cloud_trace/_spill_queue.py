@@ -0,0 +1,321 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Persistent queue of serialized requests that failed to export.
+
+Payloads are appended to segment files in a local directory. Each record is a header with
+the payload length and its CRC32, followed by the payload, so a record torn by a crash is
+detected and skipped on the next read. A background thread replays segments oldest first
+and deletes them once every record was sent. When the directory would grow past its byte
+limit, the oldest segments are deleted to make room.
+
+Several processes may share the directory, e.g. the workers of a pre-fork server. Each
+queue holds an exclusive lock on a numbered slot subdirectory, so that no two processes
+replay the same segments. Segments left behind by a previous process are picked up by the
+next queue locking its slot. Locking requires ``fcntl``; without it, e.g. on Windows, the
+directory must not be shared.
+"""
+
+import logging
+import os
+import struct
+import threading
+import zlib
+from typing import IO, BinaryIO, Callable, Dict, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None  # type: ignore[assignment]
+
+logger = logging.getLogger(__name__)
+
+_SEGMENT_SUFFIX = ".spill"
+_TMP_SUFFIX = ".tmp"
+_SLOT_LOCK_FILENAME = ".lock"
+# length and CRC32 of the payload
+_RECORD_HEADER = struct.Struct(">II")
+DEFAULT_SEGMENT_MAX_BYTES = 4 * 1024 * 1024  # 4 MiB
+
+
+class SpillQueue:
+    """Disk-backed FIFO of byte payloads replayed in the background.
+
+    Args:
+        directory: Directory holding the slot subdirectories with the segment files.
+            Created if missing.
+        send: Called with each spilled payload during replay. Returns False if the payload
+            could not be sent and should be retried later, which stops the current replay.
+        max_bytes: Maximum total size of the segment files of this queue's slot.
+        replay_interval: Seconds between two background replays.
+        segment_max_bytes: Size after which a new segment file is started. Payloads
+            larger than a segment are dropped.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        send: Callable[[bytes], bool],
+        max_bytes: int,
+        replay_interval: float,
+        segment_max_bytes: int = DEFAULT_SEGMENT_MAX_BYTES,
+    ):
+        self._send = send
+        self._max_bytes = max_bytes
+        self._segment_max_bytes = min(segment_max_bytes, max_bytes)
+        self._replay_interval = replay_interval
+
+        # Guards the segment bookkeeping and the active segment file. Sending happens
+        # outside of it so that appends never wait on the network.
+        self._lock = threading.Lock()
+        # Serializes replays so a segment is never sent twice concurrently.
+        self._replay_lock = threading.Lock()
+        # Segment sequence number -> size in bytes, oldest first.
+        self._segments: Dict[int, int] = {}
+        self._total_bytes = 0
+        self._active_seq: Optional[int] = None
+        self._active_file: Optional[BinaryIO] = None
+
+        self._directory, self._slot_lock = _lock_slot(directory)
+        self._load_segments()
+        self._next_seq = max(self._segments, default=-1) + 1
+
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="CloudTraceSpillQueue", daemon=True
+        )
+        self._thread.start()
+
+    def _load_segments(self) -> None:
+        for filename in sorted(os.listdir(self._directory)):
+            if filename.endswith(_TMP_SUFFIX):
+                # left behind by a crash while rewriting a segment, which is still intact
+                _remove(os.path.join(self._directory, filename))
+                continue
+            stem, suffix = os.path.splitext(filename)
+            if suffix != _SEGMENT_SUFFIX or not stem.isdigit():
+                continue
+            size = os.path.getsize(os.path.join(self._directory, filename))
+            self._segments[int(stem)] = size
+            self._total_bytes += size
+
+    def _segment_path(self, seq: int) -> str:
+        return os.path.join(self._directory, f"{seq:020d}{_SEGMENT_SUFFIX}")
+
+    @property
+    def directory(self) -> str:
+        """The slot subdirectory holding this queue's segment files."""
+        return self._directory
+
+    @property
+    def total_bytes(self) -> int:
+        """Total size of the segment files."""
+        return self._total_bytes
+
+    def append(self, payload: bytes) -> None:
+        """Append a payload to the newest segment, evicting the oldest segments if the
+        queue is full."""
+        record = (
+            _RECORD_HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+        )
+        if len(record) > self._segment_max_bytes:
+            logger.warning(
+                "Dropping %d byte payload larger than a spill segment",
+                len(payload),
+            )
+            return
+
+        with self._lock:
+            if self._stop.is_set():
+                return
+            while self._total_bytes + len(record) > self._max_bytes:
+                self._evict_oldest()
+            if (
+                self._active_seq is None
+                or self._segments[self._active_seq] + len(record)
+                > self._segment_max_bytes
+            ):
+                try:
+                    self._open_segment()
+                except OSError as ex:
+                    logger.warning("Error while spilling to disk", exc_info=ex)
+                    return
+            seq, active_file = self._active_seq, self._active_file
+            assert seq is not None and active_file is not None
+            try:
+                active_file.write(record)
+                active_file.flush()
+            except OSError as ex:
+                logger.warning("Error while spilling to disk", exc_info=ex)
+                self._close_active()
+                return
+            self._segments[seq] += len(record)
+            self._total_bytes += len(record)
+
+    def _open_segment(self) -> None:
+        self._close_active()
+        seq = self._next_seq
+        # pylint: disable=consider-using-with
+        self._active_file = open(self._segment_path(seq), "ab")
+        self._next_seq += 1
+        self._active_seq = seq
+        self._segments[seq] = 0
+
+    def _close_active(self) -> None:
+        if self._active_file is not None:
+            self._active_file.close()
+        self._active_file = None
+        self._active_seq = None
+
+    def _evict_oldest(self) -> None:
+        seq = next(iter(self._segments))
+        if seq == self._active_seq:
+            self._close_active()
+        size = self._segments.pop(seq)
+        self._total_bytes -= size
+        logger.warning(
+            "Spill queue full, dropping %d bytes of the oldest spans", size
+        )
+        _remove(self._segment_path(seq))
+
+    def replay(self) -> bool:
+        """Send spilled payloads oldest first until the queue is empty or a payload could
+        not be sent.
+
+        Returns:
+            True if the queue was emptied.
+        """
+        with self._replay_lock:
+            while True:
+                with self._lock:
+                    if not self._segments:
+                        return True
+                    seq = next(iter(self._segments))
+                    if seq == self._active_seq:
+                        # seal it so appends go to a new segment while this one is sent
+                        self._close_active()
+                if not self._replay_segment(seq):
+                    return False
+
+    def _replay_segment(self, seq: int) -> bool:
+        path = self._segment_path(seq)
+        try:
+            with open(path, "rb") as segment:
+                payloads = _read_records(segment)
+        except OSError as ex:
+            logger.warning("Error while reading spilled spans", exc_info=ex)
+            payloads = []
+
+        sent = 0
+        for payload in payloads:
+            if not self._send(payload):
+                break
+            sent += 1
+
+        with self._lock:
+            if seq not in self._segments:
+                # evicted while it was being sent
+                return sent == len(payloads)
+            if sent == len(payloads):
+                self._total_bytes -= self._segments.pop(seq)
+                _remove(path)
+                return True
+            if sent:
+                self._rewrite_segment(seq, payloads[sent:])
+            return False
+
+    def _rewrite_segment(self, seq: int, payloads: List[bytes]) -> None:
+        path = self._segment_path(seq)
+        tmp_path = path + _TMP_SUFFIX
+        data = b"".join(
+            _RECORD_HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+            for payload in payloads
+        )
+        try:
+            with open(tmp_path, "wb") as segment:
+                segment.write(data)
+            os.replace(tmp_path, path)
+        except OSError as ex:
+            logger.warning("Error while rewriting spilled spans", exc_info=ex)
+            return
+        self._total_bytes += len(data) - self._segments[seq]
+        self._segments[seq] = len(data)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._replay_interval):
+            try:
+                self.replay()
+            # pylint: disable=broad-except
+            except Exception as ex:
+                logger.exception("Error while replaying spilled spans: %s", ex)
+
+    def shutdown(self) -> None:
+        """Stop the background replay. Spilled payloads stay on disk and are replayed by
+        the next queue created on the same directory."""
+        self._stop.set()
+        self._thread.join()
+        with self._lock:
+            self._close_active()
+            # releases the slot
+            self._slot_lock.close()
+
+
+def _lock_slot(directory: str) -> Tuple[str, IO[bytes]]:
+    """Lock the first slot subdirectory of ``directory`` not locked by another queue.
+    The lock is held until the returned lock file is closed."""
+    slot = 0
+    while True:
+        slot_directory = os.path.join(directory, str(slot))
+        os.makedirs(slot_directory, exist_ok=True)
+        # pylint: disable=consider-using-with
+        lock_file = open(
+            os.path.join(slot_directory, _SLOT_LOCK_FILENAME), "ab"
+        )
+        if fcntl is None:
+            return slot_directory, lock_file
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            slot += 1
+            continue
+        return slot_directory, lock_file
+
+
+def _read_records(segment: BinaryIO) -> List[bytes]:
+    data = segment.read()
+    payloads = []
+    offset = 0
+    while offset + _RECORD_HEADER.size <= len(data):
+        length, crc = _RECORD_HEADER.unpack_from(data, offset)
+        start = offset + _RECORD_HEADER.size
+        payload = data[start : start + length]
+        if len(payload) != length or zlib.crc32(payload) != crc:
+            break
+        payloads.append(payload)
+        offset = start + length
+    if offset != len(data):
+        logger.warning(
+            "Skipping %d bytes of corrupt spilled spans in %s",
+            len(data) - offset,
+            segment.name,
+        )
+    return payloads
+
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
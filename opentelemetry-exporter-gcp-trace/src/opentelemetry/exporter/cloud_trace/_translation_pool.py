@@ -0,0 +1,348 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Translation of spans in worker processes, used by :class:`CloudTraceSpanExporter`
+with ``translation_processes``.
+
+Translating and serializing spans holds the GIL, so on a CPU-bound service it competes
+with the application's own threads. With a pool, the exporter thread only takes a
+snapshot of each batch, plain tuples of the span fields the translation reads, and sends
+it to a worker process. The worker rebuilds the spans, translates and serializes them
+like the exporter would, and returns the serialized requests, which the exporter sends
+with :class:`EncodedRequestSender`.
+
+Attribute values must be picklable, which all valid attribute values are.
+
+State that spans several exports stays in the exporter's process: the child span counts
+of ``group_spans_by_trace`` are taken before the snapshot, and the truncations and
+dropped items counted by the workers are returned and reported by the exporter.
+
+Workers are started with ``forkserver``, or ``spawn`` where it isn't available, rather
+than forked from a process running gRPC threads. Like with :mod:`multiprocessing`, the
+main module must then be importable without side effects, i.e. start the application
+under ``if __name__ == "__main__":``.
+
+This module imports from the package, so the package only imports it once the pool is
+used.
+"""
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from google.cloud.trace_v2 import BatchWriteSpansRequest
+from opentelemetry.exporter.cloud_trace import (
+    _TRUNCATION_WARNINGS,
+    _CloudTraceExporterBase,
+    _EncodedBatchWriteSpansRequest,
+)
+from opentelemetry.exporter.cloud_trace._wire_encoder import WireEncoder
+from opentelemetry.resourcedetector.gcp_resource_detector._self_telemetry import (
+    ExporterTelemetry,
+)
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import Event, ReadableSpan
+from opentelemetry.trace import Link, SpanContext, SpanKind
+from opentelemetry.trace.status import Status, StatusCode
+
+# attributes as a tuple of (key, value) pairs
+_AttributeItems = Tuple[Tuple[str, Any], ...]
+
+
+class TranslatorConfig(NamedTuple):
+    """Exporter options the workers translate with."""
+
+    project_id: str
+    resource_regex: Optional[str]
+    attribute_value_cache_size: int
+    group_spans_by_trace: bool
+    use_wire_encoder: bool
+    # whether to return what the exporter's self-telemetry would have recorded
+    record_telemetry: bool
+
+
+class TranslatedBatch(NamedTuple):
+    requests: List[_EncodedBatchWriteSpansRequest]
+    # arguments of the ExporterTelemetry.record_request and record_dropped calls
+    recorded_requests: List[Tuple[int, int]]
+    recorded_dropped: List[Tuple[str, int]]
+    # truncations by description, for TruncationWarnings.add
+    truncations: Dict[str, int]
+
+
+class _SpanSnapshot(NamedTuple):
+    trace_id: int
+    span_id: int
+    parent_span_id: Optional[int]
+    parent_is_remote: bool
+    name: str
+    start_time: Optional[int]
+    end_time: Optional[int]
+    kind: int
+    status_code: int
+    status_description: Optional[str]
+    attributes: _AttributeItems
+    resource_index: int
+    # (name, timestamp, attributes)
+    events: Tuple[Tuple[str, int, _AttributeItems], ...]
+    # (trace_id, span_id, attributes)
+    links: Tuple[Tuple[int, int, _AttributeItems], ...]
+
+
+class _BatchSnapshot(NamedTuple):
+    resources: List[_AttributeItems]
+    spans: List[_SpanSnapshot]
+    group_lengths: Optional[Sequence[int]]
+    child_span_counts: Optional[Sequence[int]]
+
+
+class TranslationPool:
+    """Pool of ``processes`` worker processes translating batches of spans.
+
+    The processes are started on first use, and again if one of them died or the
+    exporter's process was forked.
+    """
+
+    def __init__(self, processes: int, config: TranslatorConfig):
+        self._processes = processes
+        self._config = config
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pid = os.getpid()
+
+    def translate(
+        self,
+        spans: Sequence[ReadableSpan],
+        group_lengths: Optional[Sequence[int]],
+        child_span_counts: Optional[Sequence[int]],
+        timeout: float,
+    ) -> TranslatedBatch:
+        """Translate spans grouped by :meth:`_CloudTraceExporterBase._group_spans` in a
+        worker process.
+
+        Raises:
+            concurrent.futures.TimeoutError: the worker didn't finish within
+                ``timeout`` seconds.
+            concurrent.futures.process.BrokenProcessPool: a worker process died. The
+                next batch starts new processes.
+        """
+        batch = _snapshot(spans, group_lengths, child_span_counts)
+        executor = self._get_executor()
+        try:
+            return executor.submit(_translate, batch).result(timeout)
+        except BrokenProcessPool:
+            with self._lock:
+                if self._executor is executor:
+                    self._executor = None
+            raise
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pid != os.getpid():
+                # the executor's processes and threads belong to the parent process
+                self._executor = None
+                self._pid = os.getpid()
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    self._processes,
+                    mp_context=multiprocessing.get_context(_start_method()),
+                    initializer=_init_worker,
+                    initargs=(self._config,),
+                )
+            return self._executor
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown()
+
+
+def _start_method() -> str:
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return "forkserver"
+    return "spawn"
+
+
+def _snapshot(
+    spans: Sequence[ReadableSpan],
+    group_lengths: Optional[Sequence[int]],
+    child_span_counts: Optional[Sequence[int]],
+) -> _BatchSnapshot:
+    resource_indices: Dict[int, int] = {}
+    resources: List[_AttributeItems] = []
+    span_snapshots: List[_SpanSnapshot] = []
+    for span in spans:
+        resource_index = resource_indices.get(id(span.resource))
+        if resource_index is None:
+            resource_index = resource_indices[id(span.resource)] = len(
+                resources
+            )
+            resources.append(tuple(span.resource.attributes.items()))
+        ctx = span.context
+        parent = span.parent
+        span_snapshots.append(
+            _SpanSnapshot(
+                ctx.trace_id,
+                ctx.span_id,
+                parent.span_id if parent else None,
+                parent.is_remote if parent else False,
+                span.name,
+                span.start_time,
+                span.end_time,
+                span.kind.value,
+                span.status.status_code.value,
+                span.status.description,
+                _attribute_items(span.attributes),
+                resource_index,
+                tuple(
+                    (
+                        event.name,
+                        event.timestamp,
+                        _attribute_items(event.attributes),
+                    )
+                    for event in span.events
+                ),
+                tuple(
+                    (
+                        link.context.trace_id,
+                        link.context.span_id,
+                        _attribute_items(link.attributes),
+                    )
+                    for link in span.links
+                ),
+            )
+        )
+    return _BatchSnapshot(
+        resources, span_snapshots, group_lengths, child_span_counts
+    )
+
+
+def _attribute_items(attributes: Any) -> _AttributeItems:
+    return tuple(attributes.items()) if attributes else ()
+
+
+def _restore(batch: _BatchSnapshot) -> List[ReadableSpan]:
+    resources = [Resource(dict(items)) for items in batch.resources]
+    spans: List[ReadableSpan] = []
+    for snapshot in batch.spans:
+        parent = None
+        if snapshot.parent_span_id is not None:
+            parent = SpanContext(
+                snapshot.trace_id,
+                snapshot.parent_span_id,
+                snapshot.parent_is_remote,
+            )
+        spans.append(
+            ReadableSpan(
+                name=snapshot.name,
+                context=SpanContext(
+                    snapshot.trace_id, snapshot.span_id, False
+                ),
+                parent=parent,
+                resource=resources[snapshot.resource_index],
+                attributes=dict(snapshot.attributes),
+                events=[
+                    Event(name, dict(attributes), timestamp)
+                    for name, timestamp, attributes in snapshot.events
+                ],
+                links=[
+                    Link(
+                        SpanContext(trace_id, span_id, False), dict(attributes)
+                    )
+                    for trace_id, span_id, attributes in snapshot.links
+                ],
+                kind=SpanKind(snapshot.kind),
+                status=Status(
+                    StatusCode(snapshot.status_code),
+                    snapshot.status_description,
+                ),
+                start_time=snapshot.start_time,
+                end_time=snapshot.end_time,
+            )
+        )
+    return spans
+
+
+class _TelemetryRecorder(ExporterTelemetry):
+    """Records the calls of the translation, for the exporter to report them with its
+    own telemetry."""
+
+    # pylint: disable=super-init-not-called
+    def __init__(self) -> None:
+        self.requests: List[Tuple[int, int]] = []
+        self.dropped: List[Tuple[str, int]] = []
+
+    def record_request(self, size: int, items: int) -> None:
+        self.requests.append((size, items))
+
+    def record_dropped(self, dropped_type: str, count: int) -> None:
+        if count:
+            self.dropped.append((dropped_type, count))
+
+
+# state of a worker process, set by _init_worker
+_translator: Optional[_CloudTraceExporterBase] = None
+_config: Optional[TranslatorConfig] = None
+
+
+def _init_worker(config: TranslatorConfig) -> None:
+    # pylint: disable=global-statement
+    global _translator, _config
+    _config = config
+    _translator = _CloudTraceExporterBase(
+        config.project_id,
+        config.resource_regex,
+        use_proto_plus=False,
+        # the request and export options are the exporter's business
+        max_concurrent_requests=1,
+        export_timeout_millis=1,
+        attribute_value_cache_size=config.attribute_value_cache_size,
+        group_spans_by_trace=config.group_spans_by_trace,
+        meter_provider=None,
+    )
+    # the exporter logs the truncations counted here
+    _TRUNCATION_WARNINGS.hold()
+
+
+def _translate(batch: _BatchSnapshot) -> TranslatedBatch:
+    assert _translator is not None and _config is not None
+    spans = _restore(batch)
+    recorder = _TelemetryRecorder()
+    if _config.record_telemetry:
+        _translator._telemetry = recorder
+    requests: List[_EncodedBatchWriteSpansRequest]
+    if _config.use_wire_encoder:
+        requests = _translator._encode_grouped(
+            WireEncoder(), spans, batch.group_lengths, batch.child_span_counts
+        )
+    else:
+        requests = [
+            _EncodedBatchWriteSpansRequest(
+                request.name,
+                BatchWriteSpansRequest.pb(request).SerializeToString(),
+            )
+            for request in _translator._translate_grouped(
+                spans, batch.group_lengths, batch.child_span_counts
+            )
+        ]
+    return TranslatedBatch(
+        requests,
+        recorder.requests,
+        recorder.dropped,
+        _TRUNCATION_WARNINGS.take(),
+    )
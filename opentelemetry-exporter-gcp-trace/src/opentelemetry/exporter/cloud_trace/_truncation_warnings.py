@@ -0,0 +1,98 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Aggregated warnings about spans truncated to fit Cloud Trace's limits.
+
+Logging a warning for every span, link or event over a limit means thousands of log calls
+per second on the exporter thread with a noisy instrumentation library, and feeds back
+into the exporter when the logs are exported too. Instead, truncations are counted by
+kind and the counts are logged together at most once per interval. The first truncation
+is logged right away so that it doesn't go unnoticed.
+"""
+
+import logging
+import threading
+import time
+from typing import Dict
+
+logger = logging.getLogger(__name__)
+
+
+class TruncationWarnings:
+    """Counts truncations and logs them as one warning at most every ``interval``
+    seconds.
+
+    Args:
+        interval: Minimum number of seconds between two warnings.
+    """
+
+    def __init__(self, interval: float):
+        self._interval = interval
+        self._lock = threading.Lock()
+        # counts not logged yet, and counts since the process started, by description
+        self._pending: Dict[str, int] = {}
+        self._totals: Dict[str, int] = {}
+        self._next_warning = float("-inf")
+
+    def add(self, description: str, count: int = 1) -> None:
+        """Count ``count`` truncations, described as e.g. "spans with more than 128
+        links", and log the pending counts if the interval has passed."""
+        now = time.monotonic()
+        with self._lock:
+            self._pending[description] = (
+                self._pending.get(description, 0) + count
+            )
+            self._totals[description] = (
+                self._totals.get(description, 0) + count
+            )
+            if now < self._next_warning:
+                return
+            self._next_warning = now + self._interval
+            pending, self._pending = self._pending, {}
+        self._warn(pending)
+
+    def flush(self) -> None:
+        """Log the pending counts now, e.g. when the exporter shuts down."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if pending:
+            self._warn(pending)
+
+    def hold(self) -> None:
+        """Stop logging, and keep the counts pending until :meth:`take`, e.g. in a
+        worker process whose counts are logged by the exporter's process."""
+        with self._lock:
+            self._next_warning = float("inf")
+
+    def take(self) -> Dict[str, int]:
+        """Return the pending counts and forget them, without logging them."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        return pending
+
+    def counts(self) -> Dict[str, int]:
+        """Number of truncations of each kind since the process started."""
+        with self._lock:
+            return dict(self._totals)
+
+    def _warn(self, pending: Dict[str, int]) -> None:
+        logger.warning(
+            "Truncated spans to fit Cloud Trace's limits (further truncations are "
+            "summarized every %s seconds): %s",
+            self._interval,
+            ", ".join(
+                f"{count} {description}"
+                for description, count in pending.items()
+            ),
+        )
@@ -0,0 +1,625 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Encoder writing the protobuf wire format of BatchWriteSpans requests straight from
+the spans, used by :class:`CloudTraceSpanExporter` with ``use_wire_encoder``.
+
+The default translation builds a protobuf message for every span, link, event and
+attribute, which the client then serializes. The encoder skips those messages: it writes
+each span's bytes to one buffer, and requests are sliced from it and sent as they are
+through a gRPC multi-callable with a pass-through serializer, see
+:class:`EncodedRequestSender`.
+
+The bytes are identical to the deterministic serialization of the messages built by
+:meth:`_CloudTraceExporterBase._translate_to_cloud_trace_pb`, i.e. with map entries
+sorted by key. The non-deterministic serialization leaves the order of map entries
+unspecified, so that is the only byte-for-byte reference there is.
+
+This module imports from the package, so the package only imports it once the encoder
+is used.
+"""
+
+from functools import lru_cache
+from operator import attrgetter
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from google.api_core import gapic_v1
+from google.api_core.retry import Retry
+from google.cloud.trace_v2 import TraceServiceClient
+from google.cloud.trace_v2.services.trace_service.transports.base import (
+    DEFAULT_CLIENT_INFO,
+)
+from google.cloud.trace_v2.services.trace_service.transports.grpc import (
+    TraceServiceGrpcTransport,
+)
+from google.protobuf import empty_pb2
+from opentelemetry.exporter.cloud_trace import (
+    _AGENT_ATTRIBUTE_KEY,
+    _EVENT_ATTRS_TRUNCATED,
+    _EVENTS_TRUNCATED,
+    _LINK_ATTRS_TRUNCATED,
+    _LINKS_TRUNCATED,
+    _SPAN_ATTRS_TRUNCATED,
+    _TRUNCATION_WARNINGS,
+    MAX_ATTR_VAL_BYTES,
+    MAX_EVENT_ATTRS,
+    MAX_LINK_ATTRS,
+    MAX_NUM_EVENTS,
+    MAX_NUM_LINKS,
+    MAX_SPAN_ATTRS,
+    _agent_attribute_str,
+    _AttributeValueCache,
+    _bound_attributes,
+    _EncodedBatchWriteSpansRequest,
+    _extract_span_kind,
+    _extract_status,
+    _ResourceLabels,
+    _truncate_str,
+    _ValueCache,
+)
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import ReadableSpan
+from opentelemetry.trace import format_span_id, format_trace_id
+from opentelemetry.trace.status import StatusCode
+from opentelemetry.util import types
+
+_BATCH_WRITE_SPANS_METHOD = (
+    "/google.devtools.cloudtrace.v2.TraceService/BatchWriteSpans"
+)
+
+# Field tags, i.e. the field number shifted left by 3 bits or'ed with the wire type:
+# 0 for varints and 2 for length-delimited fields. Grouped by message.
+_REQUEST_NAME = 0x0A
+_REQUEST_SPANS = 0x12
+_SPAN_NAME = 0x0A
+_SPAN_SPAN_ID = 0x12
+_SPAN_PARENT_SPAN_ID = 0x1A
+_SPAN_DISPLAY_NAME = 0x22
+_SPAN_START_TIME = 0x2A
+_SPAN_END_TIME = 0x32
+_SPAN_ATTRIBUTES = 0x3A
+_SPAN_TIME_EVENTS = 0x4A
+_SPAN_LINKS = 0x52
+_SPAN_STATUS = 0x5A
+_SPAN_SAME_PROCESS_AS_PARENT_SPAN = 0x62
+_SPAN_CHILD_SPAN_COUNT = 0x6A
+_SPAN_SPAN_KIND = 0x70
+_TRUNCATABLE_STRING_VALUE = 0x0A
+_TRUNCATABLE_STRING_TRUNCATED_BYTE_COUNT = 0x10
+_TIMESTAMP_SECONDS = 0x08
+_TIMESTAMP_NANOS = 0x10
+_ATTRIBUTES_ATTRIBUTE_MAP = 0x0A
+_ATTRIBUTES_DROPPED_ATTRIBUTES_COUNT = 0x10
+_MAP_ENTRY_KEY = 0x0A
+_MAP_ENTRY_VALUE = 0x12
+_ATTRIBUTE_VALUE_STRING_VALUE = 0x0A
+_ATTRIBUTE_VALUE_INT_VALUE = 0x10
+_ATTRIBUTE_VALUE_BOOL_VALUE = 0x18
+_TIME_EVENTS_TIME_EVENT = 0x0A
+_TIME_EVENTS_DROPPED_ANNOTATIONS_COUNT = 0x10
+_TIME_EVENT_TIME = 0x0A
+_TIME_EVENT_ANNOTATION = 0x12
+_ANNOTATION_DESCRIPTION = 0x0A
+_ANNOTATION_ATTRIBUTES = 0x12
+_LINKS_LINK = 0x0A
+_LINKS_DROPPED_LINKS_COUNT = 0x10
+_LINK_TRACE_ID = 0x0A
+_LINK_SPAN_ID = 0x12
+_LINK_ATTRIBUTES = 0x22
+_STATUS_CODE = 0x08
+_STATUS_MESSAGE = 0x12
+_WRAPPER_VALUE = 0x08
+
+# google.rpc.Code.UNKNOWN, the code of spans with an error status
+_CODE_UNKNOWN = 2
+
+_NANOS_PER_SECOND = 1_000_000_000
+_INT64_MIN = -(1 << 63)
+_INT64_MAX = (1 << 63) - 1
+_UINT64_MASK = (1 << 64) - 1
+_SMALL_VARINTS = [bytes((value,)) for value in range(0x80)]
+
+
+class EncodedSpans(NamedTuple):
+    """Spans encoded by :meth:`WireEncoder.encode_spans`, each as a ``spans`` field of a
+    BatchWriteSpansRequest."""
+
+    buffer: bytearray
+    # span i is buffer[offsets[i]:offsets[i + 1]]
+    offsets: List[int]
+    dropped_attributes: int
+    dropped_links: int
+    dropped_events: int
+
+    def size(self, index: int) -> int:
+        return self.offsets[index + 1] - self.offsets[index]
+
+
+class EncodedRequestSender:
+    """Sends requests already in the wire format through the gRPC channel of
+    ``client``, bypassing its serialization.
+
+    Args:
+        client: Client with a gRPC transport, whose channel and credentials are used.
+
+    Raises:
+        ValueError: the client doesn't use a gRPC transport.
+    """
+
+    def __init__(self, client: TraceServiceClient):
+        transport = client.transport
+        if not isinstance(transport, TraceServiceGrpcTransport):
+            raise ValueError(
+                "Sending encoded requests requires a client with a gRPC transport"
+            )
+        self._batch_write_spans = gapic_v1.method.wrap_method(
+            transport.grpc_channel.unary_unary(
+                _BATCH_WRITE_SPANS_METHOD,
+                # the payload already is the serialized request
+                request_serializer=attrgetter("payload"),
+                response_deserializer=empty_pb2.Empty.FromString,
+            ),
+            default_timeout=None,
+            client_info=DEFAULT_CLIENT_INFO,
+        )
+
+    def batch_write_spans(
+        self,
+        request: _EncodedBatchWriteSpansRequest,
+        retry: Retry,
+        timeout: float,
+    ) -> None:
+        """Send the request like :meth:`TraceServiceClient.batch_write_spans`."""
+        self._batch_write_spans(
+            request,
+            retry=retry,
+            timeout=timeout,
+            metadata=(
+                gapic_v1.routing_header.to_grpc_metadata(
+                    (("name", request.name),)
+                ),
+            ),
+        )
+
+
+class WireEncoder:
+    """Encodes spans into BatchWriteSpans requests, sent with
+    :class:`EncodedRequestSender`."""
+
+    def encode_spans(
+        self,
+        spans: Sequence[ReadableSpan],
+        project_ids: Sequence[str],
+        get_resource_labels: Callable[[Resource], _ResourceLabels],
+        child_span_counts: Optional[Sequence[int]],
+        value_cache: Optional[_AttributeValueCache],
+    ) -> EncodedSpans:
+        """Encode the spans like the exporter's translation does.
+
+        Args:
+            spans: Spans to encode
+            project_ids: Project of each span
+            get_resource_labels: Returns the span labels of a resource
+            child_span_counts: Number of child spans of each span, if spans are grouped
+                by trace
+            value_cache: Cache of the encoded attribute values
+        """
+        encoder = _SpanEncoder(value_cache)
+        buf = encoder.buf
+        offsets = [0]
+        last_resource: Optional[Resource] = None
+        resource_labels: Optional[_ResourceLabels] = None
+        for index, span in enumerate(spans):
+            if resource_labels is None or span.resource is not last_resource:
+                last_resource = span.resource
+                resource_labels = get_resource_labels(span.resource)
+            child_span_count = None
+            if child_span_counts is not None:
+                child_span_count = child_span_counts[index]
+            encoder.write_span(
+                span, project_ids[index], resource_labels, child_span_count
+            )
+            offsets.append(len(buf))
+        return EncodedSpans(
+            buf,
+            offsets,
+            encoder.dropped_attributes,
+            encoder.dropped_links,
+            encoder.dropped_events,
+        )
+
+    @staticmethod
+    def make_request(
+        name: str, encoded: EncodedSpans, indices: Sequence[int]
+    ) -> _EncodedBatchWriteSpansRequest:
+        """Build the request writing the encoded spans at ``indices`` to ``name``."""
+        buf = bytearray()
+        _write_str(buf, _REQUEST_NAME, name)
+        parts: List[Any] = [buf]
+        view = memoryview(encoded.buffer)
+        offsets = encoded.offsets
+        start = end = -1
+        for index in indices:
+            if offsets[index] != end:
+                if start >= 0:
+                    parts.append(view[start:end])
+                start = offsets[index]
+            end = offsets[index + 1]
+        if start >= 0:
+            parts.append(view[start:end])
+        return _EncodedBatchWriteSpansRequest(name, b"".join(parts))
+
+
+class _SpanEncoder:
+    """Writes spans to one buffer. Messages are written in place and then prefixed with
+    their length, which only moves the bytes of the message itself."""
+
+    def __init__(self, value_cache: Optional[_AttributeValueCache]):
+        self.buf = bytearray()
+        self._value_cache = value_cache
+        self.dropped_attributes = 0
+        self.dropped_links = 0
+        self.dropped_events = 0
+
+    def write_span(
+        self,
+        span: ReadableSpan,
+        project_id: str,
+        resource_labels: _ResourceLabels,
+        child_span_count: Optional[int],
+    ) -> None:
+        buf = self.buf
+        buf.append(_REQUEST_SPANS)
+        start = len(buf)
+
+        ctx = span.get_span_context()
+        span_id = format_span_id(ctx.span_id)
+        _write_str(
+            buf,
+            _SPAN_NAME,
+            "projects/{}/traces/{}/spans/{}".format(
+                project_id, format_trace_id(ctx.trace_id), span_id
+            ),
+        )
+        _write_str(buf, _SPAN_SPAN_ID, span_id)
+        if span.parent:
+            _write_str(
+                buf, _SPAN_PARENT_SPAN_ID, format_span_id(span.parent.span_id)
+            )
+        _write_truncatable_str(buf, _SPAN_DISPLAY_NAME, span.name, 128)
+        if span.start_time:
+            _write_timestamp(buf, _SPAN_START_TIME, span.start_time)
+        if span.end_time:
+            _write_timestamp(buf, _SPAN_END_TIME, span.end_time)
+
+        if span.attributes and len(span.attributes) > MAX_SPAN_ATTRS:
+            _TRUNCATION_WARNINGS.add(_SPAN_ATTRS_TRUNCATED)
+        self._write_attributes(
+            _SPAN_ATTRIBUTES,
+            {**(span.attributes or {}), **resource_labels.labels},
+            MAX_SPAN_ATTRS,
+            add_agent_attr=True,
+            value_cache=resource_labels.value_cache,
+        )
+        if span.events:
+            self._write_events(span.events)
+        if span.links:
+            self._write_links(span.links)
+        _write_status(buf, span.status)
+        if child_span_count is not None:
+            # see _CloudTraceExporterBase._translate_to_cloud_trace
+            if span.parent:
+                buf.append(_SPAN_SAME_PROCESS_AS_PARENT_SPAN)
+                buf += b"\x00" if span.parent.is_remote else b"\x02\x08\x01"
+            if child_span_count:
+                buf.append(_SPAN_CHILD_SPAN_COUNT)
+                wrapper_start = len(buf)
+                _write_varint_field(buf, _WRAPPER_VALUE, child_span_count)
+                _end_message(buf, wrapper_start)
+        _write_varint_field(
+            buf, _SPAN_SPAN_KIND, _extract_span_kind(span.kind)
+        )
+
+        _end_message(buf, start)
+
+    def _write_attributes(
+        self,
+        tag: int,
+        attrs: types.Attributes,
+        num_attrs_limit: int,
+        add_agent_attr: bool = False,
+        value_cache: Optional[_ValueCache] = None,
+    ) -> None:
+        bounded, dropped_count = _bound_attributes(
+            attrs, num_attrs_limit, add_agent_attr
+        )
+        entries = []
+        if value_cache is None:
+            value_cache = self._value_cache
+        for key, value in bounded.items():
+            value_field = None
+            if value_cache is not None:
+                value_field = value_cache.get(value, _encode_value_field)
+            if value_field is None:
+                value_field = _encode_value_field(value)
+            entries.append((*_key_field(key), value_field))
+        if add_agent_attr:
+            entries.append(_agent_attribute_entry())
+        # sort keys are unique, so the other items are never compared
+        entries.sort()
+
+        buf = self.buf
+        buf.append(tag)
+        start = len(buf)
+        small_varints = _SMALL_VARINTS
+        for _, key_field, value_field in entries:
+            # map keys and values are written even when empty
+            buf.append(_ATTRIBUTES_ATTRIBUTE_MAP)
+            size = len(key_field) + len(value_field)
+            buf += small_varints[size] if size < 0x80 else _varint(size)
+            buf += key_field
+            buf += value_field
+        _write_varint_field(
+            buf, _ATTRIBUTES_DROPPED_ATTRIBUTES_COUNT, dropped_count
+        )
+        _end_message(buf, start)
+        self.dropped_attributes += dropped_count
+
+    def _write_events(self, events: Sequence[Any]) -> None:
+        dropped_annotations = 0
+        if len(events) > MAX_NUM_EVENTS:
+            _TRUNCATION_WARNINGS.add(_EVENTS_TRUNCATED)
+            dropped_annotations = len(events) - MAX_NUM_EVENTS
+            events = events[:MAX_NUM_EVENTS]
+        buf = self.buf
+        buf.append(_SPAN_TIME_EVENTS)
+        start = len(buf)
+        for event in events:
+            if event.attributes and len(event.attributes) > MAX_EVENT_ATTRS:
+                _TRUNCATION_WARNINGS.add(_EVENT_ATTRS_TRUNCATED)
+            buf.append(_TIME_EVENTS_TIME_EVENT)
+            event_start = len(buf)
+            if event.timestamp:
+                _write_timestamp(buf, _TIME_EVENT_TIME, event.timestamp)
+            buf.append(_TIME_EVENT_ANNOTATION)
+            annotation_start = len(buf)
+            _write_truncatable_str(
+                buf, _ANNOTATION_DESCRIPTION, event.name, 256
+            )
+            self._write_attributes(
+                _ANNOTATION_ATTRIBUTES, event.attributes, MAX_EVENT_ATTRS
+            )
+            _end_message(buf, annotation_start)
+            _end_message(buf, event_start)
+        _write_varint_field(
+            buf, _TIME_EVENTS_DROPPED_ANNOTATIONS_COUNT, dropped_annotations
+        )
+        _end_message(buf, start)
+        self.dropped_events += dropped_annotations
+
+    def _write_links(self, links: Sequence[Any]) -> None:
+        dropped_links = 0
+        if len(links) > MAX_NUM_LINKS:
+            _TRUNCATION_WARNINGS.add(_LINKS_TRUNCATED)
+            dropped_links = len(links) - MAX_NUM_LINKS
+            links = links[:MAX_NUM_LINKS]
+        buf = self.buf
+        buf.append(_SPAN_LINKS)
+        start = len(buf)
+        for link in links:
+            link_attributes = link.attributes or {}
+            if len(link_attributes) > MAX_LINK_ATTRS:
+                _TRUNCATION_WARNINGS.add(_LINK_ATTRS_TRUNCATED)
+            buf.append(_LINKS_LINK)
+            link_start = len(buf)
+            _write_str(
+                buf, _LINK_TRACE_ID, format_trace_id(link.context.trace_id)
+            )
+            _write_str(
+                buf, _LINK_SPAN_ID, format_span_id(link.context.span_id)
+            )
+            self._write_attributes(
+                _LINK_ATTRIBUTES, link_attributes, MAX_LINK_ATTRS
+            )
+            _end_message(buf, link_start)
+        _write_varint_field(buf, _LINKS_DROPPED_LINKS_COUNT, dropped_links)
+        _end_message(buf, start)
+        self.dropped_links += dropped_links
+
+
+def _varint(value: int) -> bytes:
+    if 0 <= value < 0x80:
+        return _SMALL_VARINTS[value]
+    # negative int32 and int64 values are sign extended to 64 bits
+    value &= _UINT64_MASK
+    out = bytearray()
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def _end_message(buf: bytearray, start: int) -> None:
+    """Prefix the message written to ``buf`` from ``start`` with its length."""
+    size = len(buf) - start
+    buf[start:start] = _SMALL_VARINTS[size] if size < 0x80 else _varint(size)
+
+
+def _write_varint_field(buf: bytearray, tag: int, value: int) -> None:
+    # proto3 scalar fields are left out when they have their default value
+    if value:
+        buf.append(tag)
+        buf += _varint(value)
+
+
+def _write_str(buf: bytearray, tag: int, value: str) -> None:
+    if value:
+        data = value.encode("utf-8")
+        buf.append(tag)
+        buf += _varint(len(data))
+        buf += data
+
+
+def _write_truncatable_str(
+    buf: bytearray, tag: int, value: str, max_length: int
+) -> None:
+    content = _truncatable_str_content(value, max_length)
+    buf.append(tag)
+    buf += _varint(len(content))
+    buf += content
+
+
+def _truncatable_str_content(value: str, max_length: int) -> bytes:
+    """Wire format of a TruncatableString, without its tag and length."""
+    truncated, truncated_byte_count = _truncate_str(value, max_length)
+    data = truncated.encode("utf-8")
+    size = len(data)
+    if truncated_byte_count:
+        return b"".join(
+            (
+                bytes((_TRUNCATABLE_STRING_VALUE,)),
+                _varint(size),
+                data,
+                bytes((_TRUNCATABLE_STRING_TRUNCATED_BYTE_COUNT,)),
+                _varint(truncated_byte_count),
+            )
+        )
+    if not size:
+        return b""
+    if size < 0x80:
+        return bytes((_TRUNCATABLE_STRING_VALUE, size)) + data
+    return bytes((_TRUNCATABLE_STRING_VALUE,)) + _varint(size) + data
+
+
+def _write_timestamp(buf: bytearray, tag: int, nanoseconds: int) -> None:
+    # like Timestamp.FromNanoseconds
+    seconds, nanos = divmod(nanoseconds, _NANOS_PER_SECOND)
+    buf.append(tag)
+    start = len(buf)
+    _write_varint_field(buf, _TIMESTAMP_SECONDS, seconds)
+    _write_varint_field(buf, _TIMESTAMP_NANOS, nanos)
+    _end_message(buf, start)
+
+
+def _write_status(buf: bytearray, status: Any) -> None:
+    status_code = status.status_code
+    if status_code is StatusCode.UNSET:
+        return
+    buf.append(_SPAN_STATUS)
+    start = len(buf)
+    if status_code is StatusCode.ERROR:
+        _write_varint_field(buf, _STATUS_CODE, _CODE_UNKNOWN)
+        _write_str(buf, _STATUS_MESSAGE, status.description or "")
+    elif status_code is not StatusCode.OK:
+        # a status code added later, which _extract_status logs about
+        buf += _extract_status(status).SerializeToString()  # type: ignore[union-attr]
+    _end_message(buf, start)
+
+
+def _encode_value_field(value: Any) -> bytes:
+    """Wire format of an attribute value as the value field of its map entry, the
+    equivalent of :func:`_set_attribute_value_pb`."""
+    # fast paths for the most common values, whose lengths all fit in one byte
+    value_type = type(value)
+    if value_type is str:
+        data = value.encode("utf-8")
+        size = len(data)
+        if 0 < size < 0x80 - 4:
+            return (
+                bytes(
+                    (
+                        _MAP_ENTRY_VALUE,
+                        size + 4,
+                        _ATTRIBUTE_VALUE_STRING_VALUE,
+                        size + 2,
+                        _TRUNCATABLE_STRING_VALUE,
+                        size,
+                    )
+                )
+                + data
+            )
+    elif value_type is int and 0 <= value < 0x80:
+        return bytes((_MAP_ENTRY_VALUE, 2, _ATTRIBUTE_VALUE_INT_VALUE, value))
+
+    if isinstance(value, bool):
+        attribute_value = bytes(
+            (_ATTRIBUTE_VALUE_BOOL_VALUE, 1 if value else 0)
+        )
+    elif isinstance(value, int):
+        if not _INT64_MIN <= value <= _INT64_MAX:
+            # like setting the int64 field of a message
+            raise ValueError("Value out of range: {}".format(value))
+        # the oneof field is written even when it is 0
+        attribute_value = bytes((_ATTRIBUTE_VALUE_INT_VALUE,)) + _varint(value)
+    else:
+        if isinstance(value, str):
+            string_value = value
+        elif isinstance(value, float):
+            string_value = "{:0.4f}".format(value)
+        else:
+            string_value = ",".join(str(x) for x in value)
+        content = _truncatable_str_content(string_value, MAX_ATTR_VAL_BYTES)
+        attribute_value = (
+            bytes((_ATTRIBUTE_VALUE_STRING_VALUE,))
+            + _varint(len(content))
+            + content
+        )
+    return (
+        bytes((_MAP_ENTRY_VALUE,))
+        + _varint(len(attribute_value))
+        + attribute_value
+    )
+
+
+# Attribute keys repeat across spans like in _translate_attribute_key, so their encoding
+# is cached the same way.
+_MAX_CACHED_KEY_FIELDS = 1024
+_key_field_cache: Dict[str, Tuple[bytes, bytes]] = {}
+
+
+def _key_field(key: str) -> Tuple[bytes, bytes]:
+    """Return the sort key of a map entry with this key, and its key field."""
+    cached = _key_field_cache.get(key)
+    if cached is not None:
+        return cached
+    data = key.encode("utf-8")
+    # upb's deterministic serialization sorts map entries by the bytes of their keys,
+    # except that a key comes after the longer keys it is a prefix of. 0xff never occurs
+    # in UTF-8, so appending it puts a key after any key it is a prefix of.
+    key_field = (
+        data + b"\xff",
+        bytes((_MAP_ENTRY_KEY,)) + _varint(len(data)) + data,
+    )
+    if len(_key_field_cache) >= _MAX_CACHED_KEY_FIELDS:
+        _key_field_cache.clear()
+    _key_field_cache[key] = key_field
+    return key_field
+
+
+@lru_cache(maxsize=None)
+def _agent_attribute_entry() -> Tuple[bytes, bytes, bytes]:
+    return (
+        *_key_field(_AGENT_ATTRIBUTE_KEY),
+        _encode_value_field(_agent_attribute_str()),
+    )
@@ -0,0 +1,500 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Span processors keeping the spans waiting to be exported within a memory budget.
+
+The OpenTelemetry SDK's ``BatchSpanProcessor`` bounds its queue by the number of spans
+only, so a burst of spans with large attributes can take gigabytes before the next
+export. :class:`MemoryBoundedBatchSpanProcessor`, and
+:class:`~opentelemetry.exporter.cloud_trace.aio.AsyncBatchSpanProcessor` with
+``max_queue_bytes``, also bound the estimated size of the queued spans, see
+:func:`estimate_span_size`. A span that would exceed the budget is admitted or not
+according to a :class:`SheddingPolicy`.
+
+Shed spans are logged as one warning per export, and reported as dropped ``span`` and
+``attribute`` items by the exporter's ``meter_provider``.
+
+Usage
+-----
+
+.. code-block:: python
+
+    from opentelemetry import trace
+    from opentelemetry.exporter.cloud_trace import CloudTraceSpanExporter
+    from opentelemetry.exporter.cloud_trace.admission import (
+        MemoryBoundedBatchSpanProcessor,
+        SheddingPolicy,
+    )
+    from opentelemetry.sdk.trace import TracerProvider
+
+    trace.set_tracer_provider(TracerProvider())
+    trace.get_tracer_provider().add_span_processor(
+        MemoryBoundedBatchSpanProcessor(
+            CloudTraceSpanExporter(),
+            max_queue_bytes=64 * 1024 * 1024,
+            shedding_policy=SheddingPolicy.STRIP_ATTRIBUTES,
+        )
+    )
+"""
+
+import enum
+import logging
+import os
+import threading
+import time
+import weakref
+from collections import deque
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Deque,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
+
+from opentelemetry.context import (
+    _SUPPRESS_INSTRUMENTATION_KEY,
+    Context,
+    attach,
+    detach,
+    set_value,
+)
+from opentelemetry.sdk.trace import Event, ReadableSpan, Span, SpanProcessor
+from opentelemetry.sdk.trace.export import SpanExporter
+from opentelemetry.trace import Link
+from opentelemetry.util import types
+
+if TYPE_CHECKING:
+    from opentelemetry.resourcedetector.gcp_resource_detector._self_telemetry import (
+        ExporterTelemetry,
+    )
+
+logger = logging.getLogger(__name__)
+
+# Rough encoded sizes of the fixed fields: ids, times, kind and status of a span, times
+# of an event, ids of a link, and the map entry of an attribute. The project and trace
+# ids in the span name count towards the span.
+_SPAN_OVERHEAD = 160
+_EVENT_OVERHEAD = 24
+_LINK_OVERHEAD = 48
+_ATTRIBUTE_OVERHEAD = 8
+# non-string attribute values
+_SCALAR_SIZE = 8
+
+
+class SheddingPolicy(enum.Enum):
+    """What to do with a span that would take the queued spans over the memory budget.
+    Spans bigger than the whole budget are always dropped."""
+
+    #: Drop the span.
+    DROP_NEWEST = "drop_newest"
+    #: Drop the oldest queued spans until the span fits.
+    DROP_OLDEST = "drop_oldest"
+    #: Queue the recorded spans that weren't sampled as well, e.g. with a sampler
+    #: returning ``RECORD_ONLY``, and drop the queued ones first when over the budget.
+    #: Sampled spans that still don't fit are dropped.
+    DROP_UNSAMPLED = "drop_unsampled"
+    #: Remove the attributes of the span and of its events and links, and drop it if it
+    #: still doesn't fit.
+    STRIP_ATTRIBUTES = "strip_attributes"
+
+
+def estimate_span_size(span: ReadableSpan) -> int:
+    """Estimate the size of ``span`` once translated for Cloud Trace, in bytes.
+
+    Strings are counted in characters and in full, rather than truncated to Cloud
+    Trace's limits, since that is what the queued span holds. Resource attributes,
+    shared by all spans of a resource, aren't counted.
+    """
+    size = _SPAN_OVERHEAD + len(span.name) + _attributes_size(span.attributes)
+    for event in span.events:
+        size += (
+            _EVENT_OVERHEAD
+            + len(event.name)
+            + _attributes_size(event.attributes)
+        )
+    for link in span.links:
+        size += _LINK_OVERHEAD + _attributes_size(link.attributes)
+    return size
+
+
+def _attributes_size(attributes: types.Attributes) -> int:
+    size = 0
+    for key, value in attributes.items() if attributes else ():
+        size += _ATTRIBUTE_OVERHEAD + len(key)
+        if isinstance(value, str):
+            size += len(value)
+        elif isinstance(value, (tuple, list)):
+            # translated as a comma separated string
+            for item in value:
+                size += 2 + (
+                    len(item) if isinstance(item, str) else _SCALAR_SIZE
+                )
+        else:
+            size += _SCALAR_SIZE
+    return size
+
+
+def _strip_attributes(span: ReadableSpan) -> Tuple[ReadableSpan, int]:
+    """Copy of the span without the attributes of the span and of its events and links,
+    and the number of attributes removed."""
+    stripped = len(span.attributes or ())
+    stripped += sum(len(event.attributes or ()) for event in span.events)
+    stripped += sum(len(link.attributes or ()) for link in span.links)
+    return (
+        ReadableSpan(
+            name=span.name,
+            context=span.context,
+            parent=span.parent,
+            resource=span.resource,
+            events=[
+                Event(event.name, timestamp=event.timestamp)
+                for event in span.events
+            ],
+            links=[Link(link.context) for link in span.links],
+            kind=span.kind,
+            status=span.status,
+            start_time=span.start_time,
+            end_time=span.end_time,
+            instrumentation_scope=span.instrumentation_scope,
+        ),
+        stripped,
+    )
+
+
+class _QueueCounts(NamedTuple):
+    """Spans an :class:`_AdmissionQueue` didn't keep since the counts were last taken."""
+
+    # spans dropped because the queue held max_spans spans, or by _AdmissionQueue.clear
+    dropped: int
+    # spans dropped to stay within the memory budget
+    shed: int
+    # attributes removed with SheddingPolicy.STRIP_ATTRIBUTES
+    stripped_attributes: int
+
+
+class _AdmissionQueue:
+    """Thread-safe FIFO queue of spans, bounded by the number of spans and by their
+    estimated size.
+
+    Args:
+        max_spans: Maximum number of queued spans. The oldest span is dropped to make
+            room for a new one.
+        max_bytes: Memory budget of the queued spans, see :func:`estimate_span_size`.
+            None for no budget.
+        policy: What to do with a span that would exceed ``max_bytes``.
+    """
+
+    def __init__(
+        self,
+        max_spans: int,
+        max_bytes: Optional[int] = None,
+        policy: SheddingPolicy = SheddingPolicy.DROP_OLDEST,
+    ):
+        if max_bytes is not None and max_bytes <= 0:
+            raise ValueError("max_queue_bytes must be positive")
+        self._max_spans = max_spans
+        self._max_bytes = max_bytes
+        self._policy = policy
+        self._lock = threading.Lock()
+        # spans with their estimated size, oldest first
+        self._spans: Deque[Tuple[ReadableSpan, int]] = deque()
+        self._bytes = 0
+        self._unsampled = 0
+        self._dropped = 0
+        self._shed = 0
+        self._stripped_attributes = 0
+
+    @property
+    def max_bytes(self) -> Optional[int]:
+        return self._max_bytes
+
+    def accepts(self, span: ReadableSpan) -> bool:
+        """Whether ``span`` should be queued: sampled spans, and unsampled ones with
+        :attr:`SheddingPolicy.DROP_UNSAMPLED`."""
+        return (
+            span.context.trace_flags.sampled
+            or self._policy is SheddingPolicy.DROP_UNSAMPLED
+        )
+
+    def put(self, span: ReadableSpan) -> int:
+        """Queue the span, or shed it, and return the number of queued spans."""
+        size = 0
+        if self._max_bytes is not None:
+            size = estimate_span_size(span)
+        with self._lock:
+            if (
+                self._max_bytes is not None
+                and self._bytes + size > self._max_bytes
+            ):
+                admitted = self._make_room(span, size)
+                if admitted is None:
+                    self._shed += 1
+                    return len(self._spans)
+                span, size = admitted
+            if len(self._spans) >= self._max_spans:
+                self._pop()
+                self._dropped += 1
+            self._spans.append((span, size))
+            self._bytes += size
+            if not span.context.trace_flags.sampled:
+                self._unsampled += 1
+            return len(self._spans)
+
+    def _make_room(
+        self, span: ReadableSpan, size: int
+    ) -> Optional[Tuple[ReadableSpan, int]]:
+        """Apply the shedding policy to a span that doesn't fit. Returns the span to
+        queue and its size, or None to shed it."""
+        assert self._max_bytes is not None
+        if size > self._max_bytes:
+            return None
+        if self._policy is SheddingPolicy.DROP_OLDEST:
+            while self._bytes + size > self._max_bytes:
+                self._pop()
+                self._shed += 1
+        elif self._policy is SheddingPolicy.DROP_UNSAMPLED:
+            if self._unsampled:
+                self._shed += self._unsampled
+                self._spans = deque(
+                    (queued, queued_size)
+                    for queued, queued_size in self._spans
+                    if queued.context.trace_flags.sampled
+                )
+                self._bytes = sum(
+                    queued_size for _, queued_size in self._spans
+                )
+                self._unsampled = 0
+        elif self._policy is SheddingPolicy.STRIP_ATTRIBUTES:
+            stripped_span, stripped = _strip_attributes(span)
+            stripped_size = estimate_span_size(stripped_span)
+            if self._bytes + stripped_size <= self._max_bytes:
+                self._stripped_attributes += stripped
+                return stripped_span, stripped_size
+        if self._bytes + size > self._max_bytes:
+            return None
+        return span, size
+
+    def _pop(self) -> ReadableSpan:
+        span, size = self._spans.popleft()
+        self._bytes -= size
+        if not span.context.trace_flags.sampled:
+            self._unsampled -= 1
+        return span
+
+    def get_batch(self, max_spans: int) -> List[ReadableSpan]:
+        """Dequeue up to ``max_spans`` of the oldest spans."""
+        with self._lock:
+            return [
+                self._pop() for _ in range(min(max_spans, len(self._spans)))
+            ]
+
+    def clear(self) -> None:
+        """Drop all queued spans, counting them as dropped."""
+        with self._lock:
+            self._dropped += len(self._spans)
+            self._spans.clear()
+            self._bytes = 0
+            self._unsampled = 0
+
+    def take_counts(self) -> _QueueCounts:
+        """Return the spans dropped or shed since the last call."""
+        with self._lock:
+            counts = _QueueCounts(
+                self._dropped, self._shed, self._stripped_attributes
+            )
+            self._dropped = self._shed = self._stripped_attributes = 0
+        return counts
+
+    @property
+    def queued_bytes(self) -> int:
+        """Estimated size of the queued spans. Only counted with a memory budget."""
+        return self._bytes
+
+    def __len__(self) -> int:
+        return len(self._spans)
+
+
+def _report_queue_counts(
+    queue: _AdmissionQueue,
+    telemetry: Optional["ExporterTelemetry"],
+    log: logging.Logger = logger,
+) -> None:
+    """Log the spans ``queue`` dropped or shed since the last call, and record them with
+    the exporter's ``telemetry``."""
+    counts = queue.take_counts()
+    if counts.dropped:
+        log.warning(
+            "Dropped %d spans because the export queue was full",
+            counts.dropped,
+        )
+    if counts.shed:
+        log.warning(
+            "Dropped %d spans to keep the export queue within its memory budget of "
+            "%d bytes",
+            counts.shed,
+            queue.max_bytes,
+        )
+    if counts.stripped_attributes:
+        log.warning(
+            "Stripped %d span attributes to keep the export queue within its memory "
+            "budget of %d bytes",
+            counts.stripped_attributes,
+            queue.max_bytes,
+        )
+    if telemetry is not None:
+        telemetry.record_dropped("span", counts.shed)
+        telemetry.record_dropped("attribute", counts.stripped_attributes)
+
+
+def _call_if_alive(
+    weak_method: "weakref.WeakMethod[Callable[[], Any]]",
+) -> None:
+    method = weak_method()
+    if method is not None:
+        method()
+
+
+class MemoryBoundedBatchSpanProcessor(SpanProcessor):
+    """Batches ended spans and exports them from a background thread, like the SDK's
+    ``BatchSpanProcessor``, keeping the estimated size of the queued spans within
+    ``max_queue_bytes``.
+
+    Args:
+        exporter: The exporter to send batches of spans to, e.g. a
+            :class:`~opentelemetry.exporter.cloud_trace.CloudTraceSpanExporter`.
+        max_queue_bytes: Memory budget of the queued spans, see
+            :func:`estimate_span_size`.
+        shedding_policy: What to do with a span that would exceed ``max_queue_bytes``
+            (default: :attr:`SheddingPolicy.DROP_OLDEST`).
+        max_queue_size: Maximum number of spans kept in the queue. The oldest spans are
+            dropped when it is full (default: 2048).
+        schedule_delay_millis: Delay between two consecutive exports (default: 5000).
+        max_export_batch_size: Maximum number of spans in one export. An export starts as
+            soon as this many spans are queued (default: 512).
+    """
+
+    def __init__(
+        self,
+        exporter: SpanExporter,
+        max_queue_bytes: int,
+        shedding_policy: SheddingPolicy = SheddingPolicy.DROP_OLDEST,
+        *,
+        max_queue_size: int = 2048,
+        schedule_delay_millis: float = 5000,
+        max_export_batch_size: int = 512,
+    ):
+        if max_export_batch_size > max_queue_size:
+            raise ValueError(
+                "max_export_batch_size must be less than or equal to max_queue_size"
+            )
+        self._exporter = exporter
+        self._max_queue_size = max_queue_size
+        self._max_queue_bytes = max_queue_bytes
+        self._shedding_policy = shedding_policy
+        self._queue = _AdmissionQueue(
+            max_queue_size, max_queue_bytes, shedding_policy
+        )
+        self._schedule_delay = schedule_delay_millis / 1e3
+        self._max_export_batch_size = max_export_batch_size
+        self._shutdown = False
+        self._export_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._worker = self._start_worker()
+        if hasattr(os, "register_at_fork"):
+            weak_after_fork = weakref.WeakMethod(self._after_fork_in_child)
+            os.register_at_fork(
+                after_in_child=lambda: _call_if_alive(weak_after_fork)
+            )
+
+    def _start_worker(self) -> threading.Thread:
+        worker = threading.Thread(
+            name="MemoryBoundedBatchSpanProcessor",
+            target=self._run,
+            daemon=True,
+        )
+        worker.start()
+        return worker
+
+    def _after_fork_in_child(self) -> None:
+        # the worker thread doesn't survive the fork, and the spans queued by the
+        # parent are exported by the parent
+        self._export_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._queue = _AdmissionQueue(
+            self._max_queue_size, self._max_queue_bytes, self._shedding_policy
+        )
+        if not self._shutdown:
+            self._worker = self._start_worker()
+
+    def on_start(
+        self, span: Span, parent_context: Optional[Context] = None
+    ) -> None:
+        pass
+
+    def on_end(self, span: ReadableSpan) -> None:
+        if self._shutdown or not self._queue.accepts(span):
+            return
+        if self._queue.put(span) >= self._max_export_batch_size:
+            self._wake.set()
+
+    def _run(self) -> None:
+        while not self._shutdown:
+            self._wake.wait(self._schedule_delay)
+            self._wake.clear()
+            self._flush(None)
+        self._flush(None)
+
+    def _flush(self, deadline: Optional[float]) -> bool:
+        """Export all queued spans. Returns False if ``deadline`` passed first."""
+        with self._export_lock:
+            # only the Cloud Trace exporters report their own metrics
+            _report_queue_counts(
+                self._queue, getattr(self._exporter, "_telemetry", None)
+            )
+            while self._queue:
+                if deadline is not None and time.monotonic() >= deadline:
+                    return False
+                batch = self._queue.get_batch(self._max_export_batch_size)
+                # don't trace the export itself, e.g. with an instrumented gRPC client
+                token = attach(set_value(_SUPPRESS_INSTRUMENTATION_KEY, True))
+                try:
+                    self._exporter.export(batch)
+                # pylint: disable=broad-except
+                except Exception as ex:
+                    logger.exception(
+                        "Exception while exporting Span batch: %s", ex
+                    )
+                finally:
+                    detach(token)
+        return True
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        """Export all queued spans from the calling thread. Returns False if they
+        weren't all exported within ``timeout_millis``."""
+        if self._shutdown:
+            return False
+        return self._flush(time.monotonic() + timeout_millis / 1e3)
+
+    def shutdown(self) -> None:
+        """Export the remaining spans and shut down the exporter."""
+        if self._shutdown:
+            return
+        self._shutdown = True
+        self._wake.set()
+        self._worker.join()
+        self._exporter.shutdown()
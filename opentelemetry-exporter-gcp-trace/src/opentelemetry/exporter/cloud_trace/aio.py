@@ -0,0 +1,437 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""asyncio Cloud Trace span exporter, for applications that already run an event loop
+(FastAPI, aiohttp, ...). Spans are exported from the event loop with
+:class:`google.cloud.trace_v2.TraceServiceAsyncClient` instead of blocking a thread per
+exporter.
+
+The OpenTelemetry SDK's span processors call exporters synchronously, so
+:class:`AsyncCloudTraceSpanExporter` is used with :class:`AsyncBatchSpanProcessor`, which
+queues ended spans and exports them in batches on the event loop.
+
+Usage
+-----
+
+.. code-block:: python
+
+    from opentelemetry import trace
+    from opentelemetry.exporter.cloud_trace.aio import (
+        AsyncBatchSpanProcessor,
+        AsyncCloudTraceSpanExporter,
+    )
+    from opentelemetry.sdk.trace import TracerProvider
+
+    async def main():
+        tracer_provider = TracerProvider()
+        processor = AsyncBatchSpanProcessor(AsyncCloudTraceSpanExporter())
+        tracer_provider.add_span_processor(processor)
+        trace.set_tracer_provider(tracer_provider)
+
+        ...
+
+        await processor.aclose()
+
+API
+---
+"""
+
+import asyncio
+import logging
+import time
+from typing import Optional, Sequence
+
+import grpc
+from google.api_core.exceptions import DeadlineExceeded
+from google.api_core.retry import AsyncRetry, if_exception_type
+from google.cloud.trace_v2 import (
+    BatchWriteSpansRequest,
+    TraceServiceAsyncClient,
+)
+from google.cloud.trace_v2.services.trace_service.transports import (
+    TraceServiceGrpcAsyncIOTransport,
+)
+from opentelemetry.context import (
+    _SUPPRESS_INSTRUMENTATION_KEY,
+    Context,
+    attach,
+    detach,
+    set_value,
+)
+from opentelemetry.exporter.cloud_trace import (
+    _OPTIONS,
+    _RETRY_DELAY_MULTIPLIER,
+    _RETRY_INITIAL_DELAY,
+    _RETRY_MAX_DELAY,
+    _TRUNCATION_WARNINGS,
+    _CloudTraceExporterBase,
+    _retryable_errors,
+)
+from opentelemetry.exporter.cloud_trace.admission import (
+    SheddingPolicy,
+    _AdmissionQueue,
+    _report_queue_counts,
+)
+from opentelemetry.exporter.cloud_trace.environment_variables import (
+    OTEL_EXPORTER_GCP_TRACE_COMPRESSION,
+)
+from opentelemetry.metrics import MeterProvider
+from opentelemetry.resourcedetector.gcp_resource_detector._channel_pool import (
+    compression_from_env,
+)
+from opentelemetry.sdk.trace import ReadableSpan, Span, SpanProcessor
+from opentelemetry.sdk.trace.export import SpanExportResult
+
+logger = logging.getLogger(__name__)
+
+_RETRY = AsyncRetry(
+    predicate=if_exception_type(*_retryable_errors()),
+    initial=_RETRY_INITIAL_DELAY,
+    maximum=_RETRY_MAX_DELAY,
+    multiplier=_RETRY_DELAY_MULTIPLIER,
+)
+
+
+def _create_default_async_client(
+    compression: Optional[grpc.Compression] = None,
+) -> TraceServiceAsyncClient:
+    return TraceServiceAsyncClient(
+        transport=TraceServiceGrpcAsyncIOTransport(
+            channel=TraceServiceGrpcAsyncIOTransport.create_channel(
+                options=_OPTIONS, compression=compression
+            )
+        )
+    )
+
+
+class AsyncCloudTraceSpanExporter(_CloudTraceExporterBase):
+    """asyncio Cloud Trace span exporter for OpenTelemetry.
+
+    Translates spans exactly like
+    :class:`opentelemetry.exporter.cloud_trace.CloudTraceSpanExporter`.
+
+    Args:
+        project_id: GCP project ID for the project to send spans to. Alternatively, can be
+            configured with :envvar:`OTEL_EXPORTER_GCP_TRACE_PROJECT_ID`. Spans are
+            routed to other projects by their ``gcp.project_id`` attribute like with
+            :class:`opentelemetry.exporter.cloud_trace.CloudTraceSpanExporter`.
+        client: Cloud Trace asyncio client. If not given, one is created from gcloud default
+            credentials on the first export, so that its channel is bound to the running
+            event loop.
+        resource_regex: Resource attributes with keys matching this regex will be added to
+            exported spans as labels (default: None). Alternatively, can be configured with
+            :envvar:`OTEL_EXPORTER_GCP_TRACE_RESOURCE_REGEX`.
+        use_proto_plus: Translate spans through the proto-plus wrapper types instead of
+            building the underlying protobuf messages directly (default: False).
+        max_concurrent_requests: Maximum number of BatchWriteSpans requests awaited
+            concurrently when an export is split into several requests, e.g. one per
+            project (default: 1).
+        export_timeout_millis: Deadline for a whole export. Requests failing with
+            ``UNAVAILABLE`` or ``DEADLINE_EXCEEDED`` are retried with jittered exponential
+            backoff until it expires (default: 30000).
+        attribute_value_cache_size: Number of translated span attribute values to keep
+            in an LRU cache and reuse for spans with the same values, e.g.
+            ``http.method=GET``. Only strings up to 256 characters, ints and bools are
+            cached. This mostly speeds up ``use_proto_plus``, the default translation
+            only saves truncating the cached strings. See
+            :meth:`attribute_value_cache_info` (default: 0, disabled).
+        group_spans_by_trace: Group the spans of an export by trace, so that the spans
+            of a trace are written in the same BatchWriteSpans request whenever they fit
+            in one, and fill in the ``child_span_count`` and
+            ``same_process_as_parent_span`` span fields. Only children exported before
+            their parent are counted, which is usually all of them as children end
+            first, and ``child_span_count`` is left unset when none were (default:
+            False).
+        compression: Compression of the requests sent on the channel created when no
+            ``client`` is given, e.g. ``grpc.Compression.Gzip``. Alternatively, can be
+            configured with :envvar:`OTEL_EXPORTER_GCP_TRACE_COMPRESSION` (default: no
+            compression).
+        meter_provider: MeterProvider to report the exporter's own metrics with, like
+            :class:`~opentelemetry.exporter.cloud_trace.CloudTraceSpanExporter`
+            (default: None, not reported).
+    """
+
+    def __init__(
+        self,
+        project_id: Optional[str] = None,
+        client: Optional[TraceServiceAsyncClient] = None,
+        resource_regex: Optional[str] = None,
+        *,
+        use_proto_plus: bool = False,
+        max_concurrent_requests: int = 1,
+        export_timeout_millis: float = 30000,
+        attribute_value_cache_size: int = 0,
+        group_spans_by_trace: bool = False,
+        compression: Optional[grpc.Compression] = None,
+        meter_provider: Optional[MeterProvider] = None,
+    ):
+        self._client = client
+        if client is None and compression is None:
+            compression = compression_from_env(
+                OTEL_EXPORTER_GCP_TRACE_COMPRESSION
+            )
+        self._compression = compression
+        super().__init__(
+            project_id,
+            resource_regex,
+            use_proto_plus,
+            max_concurrent_requests,
+            export_timeout_millis,
+            attribute_value_cache_size,
+            group_spans_by_trace,
+            meter_provider,
+        )
+
+    @property
+    def client(self) -> TraceServiceAsyncClient:
+        if self._client is None:
+            self._client = _create_default_async_client(self._compression)
+        return self._client
+
+    async def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        """Export the spans to Cloud Trace.
+
+        See: https://cloud.google.com/trace/docs/reference/v2/rest/v2/projects.traces/batchWrite
+
+        Args:
+            spans: Sequence of spans to export
+        """
+        start = time.monotonic()
+        try:
+            return await self._export(spans, start + self._export_timeout)
+        finally:
+            if self._telemetry is not None:
+                self._telemetry.record_export(time.monotonic() - start)
+
+    async def _export(
+        self, spans: Sequence[ReadableSpan], deadline: float
+    ) -> SpanExportResult:
+        try:
+            requests = self._translate_to_requests(spans)
+        # pylint: disable=broad-except
+        except Exception as ex:
+            logger.error("Error while writing to Cloud Trace", exc_info=ex)
+            return SpanExportResult.FAILURE
+
+        semaphore = asyncio.Semaphore(self._max_concurrent_requests)
+
+        async def write_request(request: BatchWriteSpansRequest) -> bool:
+            async with semaphore:
+                return await self._write_request(request, deadline)
+
+        results = await asyncio.gather(
+            *(write_request(request) for request in requests)
+        )
+        if all(results):
+            return SpanExportResult.SUCCESS
+        return SpanExportResult.FAILURE
+
+    async def _write_request(
+        self, request: BatchWriteSpansRequest, deadline: float
+    ) -> bool:
+        timeout = deadline - time.monotonic()
+        if timeout <= 0:
+            logger.error(
+                "Export deadline exceeded before writing to Cloud Trace"
+            )
+            if self._telemetry is not None:
+                self._telemetry.record_failure(
+                    DeadlineExceeded("Export deadline exceeded")
+                )
+            return False
+        try:
+            await self.client.batch_write_spans(
+                request=request,
+                retry=_RETRY.with_timeout(timeout),
+                timeout=timeout,
+            )
+        # pylint: disable=broad-except
+        except Exception as ex:
+            logger.error("Error while writing to Cloud Trace", exc_info=ex)
+            if self._telemetry is not None:
+                self._telemetry.record_failure(ex)
+            return False
+        return True
+
+    async def shutdown(self) -> None:
+        _TRUNCATION_WARNINGS.flush()
+
+
+class AsyncBatchSpanProcessor(SpanProcessor):
+    """Batches ended spans and exports them with an :class:`AsyncCloudTraceSpanExporter`
+    on an asyncio event loop.
+
+    Spans may be ended from any thread. Exports run as a task on ``loop`` and never block
+    the thread ending the span.
+
+    Args:
+        exporter: The exporter to send batches of spans to.
+        loop: Event loop to export on. Defaults to the running event loop, so the processor
+            must be created from a coroutine if not given.
+        max_queue_size: Maximum number of spans kept in the queue. The oldest spans are
+            dropped when it is full, and a warning with their number is logged on the next
+            export (default: 2048).
+        schedule_delay_millis: Delay between two consecutive exports (default: 5000).
+        max_export_batch_size: Maximum number of spans in one export. An export starts as
+            soon as this many spans are queued (default: 512).
+        max_queue_bytes: Memory budget of the queued spans, see
+            :func:`~opentelemetry.exporter.cloud_trace.admission.estimate_span_size`
+            (default: None, only ``max_queue_size`` applies).
+        shedding_policy: What to do with a span that would exceed ``max_queue_bytes``
+            (default: ``SheddingPolicy.DROP_OLDEST``).
+    """
+
+    def __init__(
+        self,
+        exporter: AsyncCloudTraceSpanExporter,
+        *,
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+        max_queue_size: int = 2048,
+        schedule_delay_millis: float = 5000,
+        max_export_batch_size: int = 512,
+        max_queue_bytes: Optional[int] = None,
+        shedding_policy: SheddingPolicy = SheddingPolicy.DROP_OLDEST,
+    ):
+        if max_export_batch_size > max_queue_size:
+            raise ValueError(
+                "max_export_batch_size must be less than or equal to max_queue_size"
+            )
+        self._exporter = exporter
+        self._loop = loop or asyncio.get_running_loop()
+        self._queue = _AdmissionQueue(
+            max_queue_size, max_queue_bytes, shedding_policy
+        )
+        self._schedule_delay = schedule_delay_millis / 1e3
+        self._max_export_batch_size = max_export_batch_size
+        self._shutdown = False
+        self._wake: Optional[asyncio.Event] = None
+        self._worker = asyncio.run_coroutine_threadsafe(
+            self._run(), self._loop
+        )
+
+    def on_start(
+        self, span: Span, parent_context: Optional[Context] = None
+    ) -> None:
+        pass
+
+    def on_end(self, span: ReadableSpan) -> None:
+        if self._shutdown or not self._queue.accepts(span):
+            return
+        if self._queue.put(span) >= self._max_export_batch_size:
+            self._notify()
+
+    def _notify(self) -> None:
+        try:
+            self._loop.call_soon_threadsafe(self._wake_worker)
+        except RuntimeError:
+            # the event loop is closed
+            pass
+
+    def _wake_worker(self) -> None:
+        if self._wake is not None:
+            self._wake.set()
+
+    async def _run(self) -> None:
+        self._wake = asyncio.Event()
+        while not self._shutdown:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self._schedule_delay)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()
+        await self.flush()
+        await self._exporter.shutdown()
+
+    async def flush(self) -> None:
+        """Export all queued spans. Must be awaited on the processor's event loop."""
+        self._log_dropped_spans()
+        while self._queue:
+            batch = self._queue.get_batch(self._max_export_batch_size)
+            # don't trace the export itself, e.g. with an instrumented gRPC client
+            token = attach(set_value(_SUPPRESS_INSTRUMENTATION_KEY, True))
+            try:
+                await self._exporter.export(batch)
+            # pylint: disable=broad-except
+            except Exception as ex:
+                logger.exception(
+                    "Exception while exporting Span batch: %s", ex
+                )
+            finally:
+                detach(token)
+
+    def _log_dropped_spans(self) -> None:
+        _report_queue_counts(
+            self._queue,
+            self._exporter._telemetry,  # pylint: disable=protected-access
+            logger,
+        )
+
+    async def aclose(self) -> None:
+        """Export the remaining spans and shut down the exporter. Must be awaited on the
+        processor's event loop."""
+        self._shutdown = True
+        self._wake_worker()
+        await asyncio.wrap_future(self._worker)
+
+    def _on_loop_thread(self) -> bool:
+        try:
+            return asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            return False
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        """Export all queued spans, waiting up to ``timeout_millis`` for it to finish.
+
+        The SDK calls this synchronously, so when called from the event loop thread itself
+        the flush is only scheduled and False is returned; await :meth:`flush` instead.
+        """
+        if self._on_loop_thread():
+            self._loop.create_task(self.flush())
+            return False
+        future = asyncio.run_coroutine_threadsafe(self.flush(), self._loop)
+        try:
+            future.result(timeout_millis / 1e3)
+        # pylint: disable=broad-except
+        except Exception:
+            return False
+        return True
+
+    def shutdown(self) -> None:
+        """Export the remaining spans and shut down the exporter.
+
+        When called from the event loop thread the shutdown finishes in the background;
+        await :meth:`aclose` instead. If the event loop is stopped, e.g. at exit after
+        :func:`asyncio.run` returned, it is run until the remaining spans are exported.
+        Spans still queued once the event loop is closed, or the export task was cancelled,
+        are dropped with a warning.
+        """
+        self._shutdown = True
+        if self._loop.is_closed() or self._worker.done():
+            self._queue.clear()
+            self._log_dropped_spans()
+            return
+        self._notify()
+        if self._on_loop_thread():
+            return
+        try:
+            if self._loop.is_running():
+                self._worker.result()
+            else:
+                self._loop.run_until_complete(
+                    asyncio.wrap_future(self._worker, loop=self._loop)
+                )
+        # pylint: disable=broad-except
+        except Exception as ex:
+            logger.exception("Exception while shutting down: %s", ex)
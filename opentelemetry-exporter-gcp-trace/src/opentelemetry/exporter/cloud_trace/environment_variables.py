@@ -30,3 +30,23 @@ OTEL_EXPORTER_GCP_TRACE_RESOURCE_REGEX = (
     :class:`opentelemetry.exporter.cloud_trace.CloudTraceSpanExporter`. Equivalent to constructor parameter to
     :class:`opentelemetry.exporter.cloud_trace.CloudTraceSpanExporter`.
 """
+
+OTEL_EXPORTER_GCP_TRACE_SPILL_DIRECTORY = (
+    "OTEL_EXPORTER_GCP_TRACE_SPILL_DIRECTORY"
+)
+"""
+.. envvar:: OTEL_EXPORTER_GCP_TRACE_SPILL_DIRECTORY
+
+    Local directory to spill spans to when they can't be exported, to write them again
+    later. Equivalent to constructor parameter to
+    :class:`opentelemetry.exporter.cloud_trace.CloudTraceSpanExporter`.
+"""
+
+OTEL_EXPORTER_GCP_TRACE_COMPRESSION = "OTEL_EXPORTER_GCP_TRACE_COMPRESSION"
+"""
+.. envvar:: OTEL_EXPORTER_GCP_TRACE_COMPRESSION
+
+    Compression of the requests sent to Cloud Trace, one of ``gzip``, ``deflate`` or
+    ``none``. Equivalent to constructor parameter to
+    :class:`opentelemetry.exporter.cloud_trace.CloudTraceSpanExporter`.
+"""
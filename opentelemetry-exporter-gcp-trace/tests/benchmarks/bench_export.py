@@ -0,0 +1,39 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from fixtures.cloud_trace_fake import CloudTraceFake
+from opentelemetry.sdk.trace.export import SpanExportResult
+
+
+def test_export(
+    benchmark, cloud_trace_fake: CloudTraceFake, span_batch
+) -> None:
+    """A full export() of a batch, written to the in-process fake Cloud Trace."""
+    # connect before measuring
+    assert cloud_trace_fake.exporter.export(span_batch[:1]) == (
+        SpanExportResult.SUCCESS
+    )
+
+    # don't keep the requests of every round
+    result = benchmark.pedantic(
+        cloud_trace_fake.exporter.export,
+        args=(span_batch,),
+        setup=cloud_trace_fake.clear_calls,
+        rounds=20,
+    )
+
+    assert result == SpanExportResult.SUCCESS
+    assert sum(
+        len(call.request.spans) for call in cloud_trace_fake.get_calls()
+    ) == len(span_batch)
@@ -0,0 +1,99 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# pylint: disable=protected-access
+
+from unittest import mock
+
+import grpc
+import pytest
+from google.cloud.trace_v2 import TraceServiceClient
+from google.cloud.trace_v2.services.trace_service.transports.grpc import (
+    TraceServiceGrpcTransport,
+)
+from opentelemetry.exporter.cloud_trace import CloudTraceSpanExporter
+from opentelemetry.exporter.cloud_trace._translation_pool import _snapshot
+
+
+@pytest.mark.parametrize(
+    "use_proto_plus", [False, True], ids=["protobuf", "proto_plus"]
+)
+def test_translate(benchmark, span_batch, use_proto_plus) -> None:
+    """Translating a batch into BatchWriteSpans requests, without sending them."""
+    exporter = CloudTraceSpanExporter(
+        "project", client=mock.Mock(), use_proto_plus=use_proto_plus
+    )
+
+    requests = benchmark(exporter._translate_to_requests, span_batch)
+
+    assert sum(len(request.spans) for request in requests) == len(span_batch)
+
+
+def test_translate_with_attribute_value_cache(benchmark, span_batch) -> None:
+    exporter = CloudTraceSpanExporter(
+        "project", client=mock.Mock(), attribute_value_cache_size=1024
+    )
+
+    requests = benchmark(exporter._translate_to_requests, span_batch)
+
+    assert sum(len(request.spans) for request in requests) == len(span_batch)
+
+
+@pytest.mark.parametrize(
+    "use_proto_plus", [False, True], ids=["protobuf", "proto_plus"]
+)
+def test_translate_with_resource_regex(
+    benchmark, span_batch, use_proto_plus
+) -> None:
+    """Translating a batch with every resource attribute copied to the spans."""
+    exporter = CloudTraceSpanExporter(
+        "project",
+        client=mock.Mock(),
+        resource_regex=r".*",
+        use_proto_plus=use_proto_plus,
+    )
+
+    requests = benchmark(exporter._translate_to_requests, span_batch)
+
+    assert sum(len(request.spans) for request in requests) == len(span_batch)
+
+
+def test_encode(benchmark, span_batch) -> None:
+    """Encoding a batch with the wire encoder, comparable to ``test_translate`` plus
+    serializing the requests."""
+    # nothing is sent, the channel is only needed to create the encoder
+    channel = grpc.insecure_channel("localhost:1")
+    exporter = CloudTraceSpanExporter(
+        "project",
+        client=TraceServiceClient(
+            transport=TraceServiceGrpcTransport(channel=channel)
+        ),
+        use_wire_encoder=True,
+    )
+    assert exporter._wire_encoder is not None
+
+    requests = benchmark(
+        exporter._encode_requests, exporter._wire_encoder, span_batch
+    )
+
+    assert len(requests) == len(exporter._translate_to_requests(span_batch))
+    channel.close()
+
+
+def test_snapshot_for_translation_processes(benchmark, span_batch) -> None:
+    """What is left on the exporter thread with ``translation_processes``, besides
+    pickling the snapshot and sending the requests."""
+    batch = benchmark(_snapshot, span_batch, None, None)
+
+    assert len(batch.spans) == len(span_batch)
@@ -0,0 +1,197 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""pytest-benchmark suite for span translation and export.
+
+The benchmark modules are named ``bench_*.py`` so that they don't run with the tests.
+Run them with ``tox -e benchmark-cloudtrace``, which compares the results with the
+baselines stored in ``tests/benchmarks/baselines``. Timings only compare well on the same
+machine, so before making changes record a baseline of your own with ``tox -e
+benchmark-cloudtrace -- --benchmark-save=baseline``, and afterwards check for
+regressions with ``tox -e benchmark-cloudtrace -- --benchmark-compare-fail=min:10%``.
+"""
+
+# pylint: disable=protected-access
+
+from typing import Dict, List, Sequence
+
+import pytest
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import Event, ReadableSpan
+from opentelemetry.sdk.trace import _Span as Span
+from opentelemetry.trace import Link, SpanContext, SpanKind
+from opentelemetry.util.types import Attributes
+
+_START_TIME = 1_700_000_000_000_000_000
+
+_RESOURCE = Resource(
+    {
+        "cloud.platform": "gcp_kubernetes_engine",
+        "cloud.availability_zone": "us-east4-b",
+        "k8s.cluster.name": "cluster",
+        "k8s.namespace.name": "default",
+        "k8s.pod.name": "frontend-7d9c8b6f5-x2x9z",
+        "service.name": "frontend",
+    }
+)
+
+
+def _make_span(
+    index: int,
+    name: str,
+    attributes: Attributes = None,
+    links: Sequence[Link] = (),
+    events: Sequence[Event] = (),
+) -> ReadableSpan:
+    span = Span(
+        name=name,
+        context=SpanContext(
+            trace_id=0x6E0C63257DE34C92BF9EFCD03927272E + index // 8,
+            span_id=index + 1,
+            is_remote=False,
+        ),
+        kind=SpanKind.SERVER,
+        resource=_RESOURCE,
+        attributes=attributes,
+        links=links,
+        events=events,
+    )
+    span._start_time = _START_TIME + index * 1000
+    span._end_time = span._start_time + 250_000
+    return span
+
+
+def small_spans() -> List[ReadableSpan]:
+    """512 spans with a couple of attributes."""
+    return [
+        _make_span(
+            i,
+            "GET /healthz",
+            {"http.method": "GET", "http.status_code": 200},
+        )
+        for i in range(512)
+    ]
+
+
+def attribute_heavy_spans() -> List[ReadableSpan]:
+    """128 spans with the 32 attributes Cloud Trace keeps, of every type."""
+    spans = []
+    for i in range(128):
+        attributes: Dict[str, object] = {
+            "http.method": "POST",
+            "http.route": "/api/orders/{id}",
+            "http.target": f"/api/orders/{i}?expand=items,customer",
+            "http.status_code": 201,
+            "http.user_agent": "Mozilla/5.0 (X11; Linux x86_64) "
+            "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36",
+            "net.peer.name": "10.0.0.12",
+            "net.peer.port": 443,
+            "db.statement": "SELECT * FROM orders WHERE id = $1 " * 8,
+            "retry": False,
+            "sample.rate": 0.25,
+            "order.item_ids": [i, i + 1, i + 2],
+        }
+        for j in range(32 - len(attributes)):
+            attributes[f"app.attribute_{j}"] = f"value {j} of span {i}"
+        spans.append(_make_span(i, "POST /api/orders/{id}", attributes))
+    return spans
+
+
+def links_and_events_spans() -> List[ReadableSpan]:
+    """16 spans with 128 links and 32 events each, the most Cloud Trace keeps."""
+    spans = []
+    for i in range(16):
+        links = [
+            Link(
+                SpanContext(
+                    trace_id=0x5E0C63257DE34C92BF9EFCD03927272E + j,
+                    span_id=j + 1,
+                    is_remote=True,
+                ),
+                {"messaging.message.id": f"message-{j}", "batch.index": j},
+            )
+            for j in range(128)
+        ]
+        events = [
+            Event(
+                "message",
+                {"message.type": "RECEIVED", "message.id": j},
+                _START_TIME + i * 1000 + j,
+            )
+            for j in range(32)
+        ]
+        spans.append(
+            _make_span(i, "process batch", links=links, events=events)
+        )
+    return spans
+
+
+def event_heavy_spans() -> List[ReadableSpan]:
+    """128 spans with 32 events each, which each have a timestamp to convert."""
+    return [
+        _make_span(
+            i,
+            "GET /api/cart",
+            {"http.method": "GET"},
+            events=[
+                Event(
+                    "cache.lookup",
+                    {"cache.hit": j % 2 == 0},
+                    _START_TIME + i * 1000 + j * 10,
+                )
+                for j in range(32)
+            ],
+        )
+        for i in range(128)
+    ]
+
+
+def non_ascii_spans() -> List[ReadableSpan]:
+    """256 spans with non-ASCII names and attribute values."""
+    return [
+        _make_span(
+            i,
+            "GET /produits/{id} — catégorie",
+            {
+                "http.target": f"/produits/{i}?q=crème brûlée",
+                "user.name": "Grüße aus München",
+                "search.query": "東京都 ラーメン おすすめ",
+                "app.emoji": "🚀✨",
+            },
+        )
+        for i in range(256)
+    ]
+
+
+@pytest.fixture(
+    name="span_batch",
+    params=[
+        small_spans,
+        attribute_heavy_spans,
+        links_and_events_spans,
+        event_heavy_spans,
+        non_ascii_spans,
+    ],
+    ids=[
+        "small",
+        "attribute_heavy",
+        "links_and_events",
+        "event_heavy",
+        "non_ascii",
+    ],
+    scope="module",
+)
+def fixture_span_batch(request) -> List[ReadableSpan]:
+    """Synthetic batches of spans to export"""
+    return request.param()
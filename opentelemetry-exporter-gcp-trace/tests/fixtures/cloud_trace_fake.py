@@ -0,0 +1,318 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""In-process fake of the Cloud Trace API, ``google.devtools.cloudtrace.v2.TraceService``.
+
+The ``cloud_trace_fake`` fixture runs it on a local port for tests and benchmarks. It
+captures the requests and can be told to respond slowly or fail, to test throughput and
+retries without network access.
+
+It can also be run on its own as a load target for an exporter::
+
+    python tests/fixtures/cloud_trace_fake.py --port 50051 --latency 0.05 --error-rate 0.1
+
+and an exporter pointed at it with::
+
+    CloudTraceSpanExporter(
+        client=TraceServiceClient(
+            transport=TraceServiceGrpcTransport(
+                channel=grpc.insecure_channel("localhost:50051")
+            )
+        )
+    )
+"""
+
+import argparse
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import partial
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    cast,
+)
+from unittest.mock import patch
+
+import grpc
+import pytest
+from google.auth.credentials import AnonymousCredentials, Credentials
+from google.cloud.trace_v2 import BatchWriteSpansRequest
+from google.cloud.trace_v2.services.trace_service.transports.grpc import (
+    TraceServiceGrpcTransport,
+)
+
+# pylint: disable=no-name-in-module
+from google.protobuf.empty_pb2 import Empty
+from grpc import (
+    GenericRpcHandler,
+    ServicerContext,
+    insecure_channel,
+    method_handlers_generic_handler,
+    unary_unary_rpc_method_handler,
+)
+from opentelemetry.exporter.cloud_trace import CloudTraceSpanExporter
+from opentelemetry.resourcedetector.gcp_resource_detector._channel_pool import (
+    CHANNEL_POOL,
+)
+
+
+@dataclass
+class BatchWriteSpansCall:
+    # the raw protobuf message, which is much faster to parse than proto-plus
+    request: Any
+    user_agent: str
+
+
+@dataclass
+class FakeStats:
+    requests: int = 0
+    failed_requests: int = 0
+    spans: int = 0
+
+
+PROJECT_ID = "fakeproject"
+
+
+class FakeTraceServiceHandler(GenericRpcHandler):
+    """gRPC handler captures request protos made to Cloud Trace's BatchWriteSpans.
+
+    Args:
+        latency: Seconds to wait before responding to each request.
+        capture: Whether to keep the requests for :meth:`get_calls`. Turn it off to
+            serve a lot of requests, :meth:`get_stats` still counts them.
+    """
+
+    _service = "google.devtools.cloudtrace.v2.TraceService"
+    _method = "BatchWriteSpans"
+
+    def __init__(self, latency: float = 0.0, capture: bool = True):
+        # pylint: disable=no-member
+        super().__init__()
+        self.latency = latency
+        self._capture = capture
+        self._lock = threading.Lock()
+        self._calls: List[BatchWriteSpansCall] = []
+        self._stats = FakeStats()
+        self._injected_errors: Deque[grpc.StatusCode] = deque()
+        self._error_rate = 0.0
+        self._error_code = grpc.StatusCode.UNAVAILABLE
+        self._random = random.Random()
+
+        def batch_write_spans_handler(
+            req: Any, context: ServicerContext
+        ) -> Empty:
+            if self.latency:
+                time.sleep(self.latency)
+            metadata_dict = dict(context.invocation_metadata())
+            with self._lock:
+                self._stats.requests += 1
+                if self._capture:
+                    self._calls.append(
+                        BatchWriteSpansCall(
+                            request=req,
+                            user_agent=cast(str, metadata_dict["user-agent"]),
+                        )
+                    )
+                error = self._next_error()
+                if error is None:
+                    self._stats.spans += len(req.spans)
+                else:
+                    self._stats.failed_requests += 1
+            if error is not None:
+                context.abort(error, "injected by the Cloud Trace fake")
+            return Empty()
+
+        self._wrapped = method_handlers_generic_handler(
+            self._service,
+            {
+                self._method: unary_unary_rpc_method_handler(
+                    batch_write_spans_handler,
+                    request_deserializer=BatchWriteSpansRequest.pb().FromString,
+                    response_serializer=Empty.SerializeToString,
+                )
+            },
+        )
+
+    def _next_error(self) -> Optional[grpc.StatusCode]:
+        if self._injected_errors:
+            return self._injected_errors.popleft()
+        if self._error_rate and self._random.random() < self._error_rate:
+            return self._error_code
+        return None
+
+    def service(self, handler_call_details):
+        return self._wrapped.service(handler_call_details)
+
+    def inject_errors(self, *codes: grpc.StatusCode) -> None:
+        """Fail the next requests, one with each of ``codes`` in order"""
+        with self._lock:
+            self._injected_errors.extend(codes)
+
+    def set_error_rate(
+        self,
+        rate: float,
+        code: grpc.StatusCode = grpc.StatusCode.UNAVAILABLE,
+        seed: Optional[int] = None,
+    ) -> None:
+        """Fail the given fraction of requests, picked at random, with ``code``"""
+        with self._lock:
+            self._error_rate = rate
+            self._error_code = code
+            self._random.seed(seed)
+
+    def get_calls(self) -> List[BatchWriteSpansCall]:
+        """Returns calls made to BatchWriteSpans, including the failed ones"""
+        with self._lock:
+            return list(self._calls)
+
+    def get_stats(self) -> FakeStats:
+        """Returns the number of requests and of spans written successfully"""
+        with self._lock:
+            return FakeStats(**vars(self._stats))
+
+    def clear_calls(self) -> None:
+        """Forget the calls captured so far and reset the stats"""
+        with self._lock:
+            self._calls.clear()
+            self._stats = FakeStats()
+
+
+@contextmanager
+def serve(
+    handler: FakeTraceServiceHandler,
+    port: int = 0,
+    max_workers: int = 1,
+) -> Iterator[int]:
+    """Serve ``handler`` on localhost, yielding the port it listens on.
+
+    Args:
+        port: Port to listen on, any free port if 0.
+        max_workers: Number of requests served concurrently. The default of 1
+            serializes them.
+    """
+    with ThreadPoolExecutor(max_workers) as executor:
+        server = grpc.server(executor, handlers=[handler])
+        port = server.add_insecure_port(f"localhost:{port}")
+        server.start()
+        try:
+            yield port
+        finally:
+            server.stop(None)
+
+
+@dataclass
+class CloudTraceFake:
+    exporter: CloudTraceSpanExporter
+    handler: FakeTraceServiceHandler
+    get_calls: Callable[[], List[BatchWriteSpansCall]]
+    clear_calls: Callable[[], None]
+    # creates another exporter writing to the fake, taking the exporter's options
+    make_exporter: Callable[..., CloudTraceSpanExporter]
+
+
+def _insecure_channel(
+    target: str, credentials: Optional[Credentials] = None, **kwargs: Any
+) -> grpc.Channel:
+    return insecure_channel(target, **kwargs)
+
+
+@pytest.fixture(name="cloud_trace_fake")
+def fixture_cloud_trace_fake() -> Iterable[CloudTraceFake]:
+    """Fixture providing faked Cloud Trace api with captured requests"""
+
+    handler = FakeTraceServiceHandler()
+    exporters: List[CloudTraceSpanExporter] = []
+
+    def make_exporter(**kwargs: Any) -> CloudTraceSpanExporter:
+        exporters.append(
+            CloudTraceSpanExporter(project_id=PROJECT_ID, **kwargs)
+        )
+        return exporters[-1]
+
+    try:
+        # Serve requests concurrently for exporters with max_concurrent_requests
+        with serve(handler, max_workers=8) as port:
+            # patch TraceServiceGrpcTransport.create_channel staticmethod to return an
+            # insecure channel but otherwise respect any parameters passed to it
+            with patch.object(
+                TraceServiceGrpcTransport,
+                "create_channel",
+                partial(_insecure_channel, f"localhost:{port}"),
+            ), patch(
+                "google.auth.default",
+                return_value=(AnonymousCredentials(), None),
+            ):
+                yield CloudTraceFake(
+                    exporter=make_exporter(),
+                    handler=handler,
+                    get_calls=handler.get_calls,
+                    clear_calls=handler.clear_calls,
+                    make_exporter=make_exporter,
+                )
+                for exporter in exporters:
+                    exporter.shutdown()
+    finally:
+        # don't leak the channel to the fake into other tests
+        CHANNEL_POOL.clear()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Serve a fake Cloud Trace API as a load target"
+    )
+    parser.add_argument("--port", type=int, default=50051)
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="seconds per request"
+    )
+    parser.add_argument(
+        "--error-rate",
+        type=float,
+        default=0.0,
+        help="fraction of requests failing with UNAVAILABLE",
+    )
+    parser.add_argument("--max-workers", type=int, default=16)
+    args = parser.parse_args()
+
+    handler = FakeTraceServiceHandler(latency=args.latency, capture=False)
+    handler.set_error_rate(args.error_rate)
+    with serve(handler, args.port, args.max_workers) as port:
+        print(f"Serving on localhost:{port}, Ctrl-C to stop", flush=True)
+        previous = handler.get_stats()
+        try:
+            while True:
+                time.sleep(1)
+                stats = handler.get_stats()
+                print(
+                    f"{stats.requests - previous.requests} requests/s "
+                    f"({stats.failed_requests - previous.failed_requests} "
+                    f"failed), {stats.spans - previous.spans} spans/s",
+                    flush=True,
+                )
+                previous = stats
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# pylint: disable=protected-access
+
+import unittest
+from unittest import mock
+
+from opentelemetry.exporter.cloud_trace import CloudTraceSpanExporter
+from opentelemetry.exporter.cloud_trace.admission import (
+    MemoryBoundedBatchSpanProcessor,
+    SheddingPolicy,
+    _AdmissionQueue,
+    estimate_span_size,
+)
+from opentelemetry.sdk.metrics import MeterProvider
+from opentelemetry.sdk.metrics.export import InMemoryMetricReader
+from opentelemetry.sdk.trace import Event, TracerProvider
+from opentelemetry.sdk.trace import _Span as Span
+from opentelemetry.trace import Link, SpanContext, TraceFlags
+from test_common.metrics import metric_points
+
+TRACE_ID = 0x6E0C63257DE34C92BF9EFCD03927272E
+
+
+def make_span(span_id, value_length=0, sampled=True, name="span_name"):
+    context = SpanContext(
+        trace_id=TRACE_ID,
+        span_id=span_id,
+        is_remote=False,
+        trace_flags=TraceFlags(
+            TraceFlags.SAMPLED if sampled else TraceFlags.DEFAULT
+        ),
+    )
+    return Span(
+        name=name,
+        context=context,
+        attributes={"value": "x" * value_length},
+        events=[Event("event", {"event_attr": "y"}, timestamp=1)],
+        links=[Link(context, {"link_attr": "z"})],
+    )
+
+
+# size of a span from make_span without the value
+SPAN_SIZE = estimate_span_size(make_span(1))
+
+
+def span_ids(queue):
+    return [span.context.span_id for span in queue.get_batch(100)]
+
+
+class TestEstimateSpanSize(unittest.TestCase):
+    def test_counts_strings_in_full(self):
+        self.assertEqual(
+            estimate_span_size(make_span(1, 100_000)), SPAN_SIZE + 100_000
+        )
+
+    def test_counts_sequences_and_scalars(self):
+        span = make_span(1)
+        base = estimate_span_size(span)
+        span._attributes = {"value": "", "ints": (1, 2), "strs": ("ab",)}
+
+        self.assertEqual(
+            estimate_span_size(span), base + 8 + 4 + 2 * (2 + 8) + 8 + 4 + 4
+        )
+
+
+class TestAdmissionQueue(unittest.TestCase):
+    def test_drop_newest(self):
+        queue = _AdmissionQueue(10, 2 * SPAN_SIZE, SheddingPolicy.DROP_NEWEST)
+        for span_id in range(1, 4):
+            queue.put(make_span(span_id))
+
+        self.assertEqual(queue.take_counts(), (0, 1, 0))
+        self.assertEqual(span_ids(queue), [1, 2])
+        self.assertEqual(queue.queued_bytes, 0)
+
+    def test_drop_oldest(self):
+        queue = _AdmissionQueue(10, 3 * SPAN_SIZE, SheddingPolicy.DROP_OLDEST)
+        for span_id in range(1, 4):
+            queue.put(make_span(span_id))
+
+        queue.put(make_span(4, SPAN_SIZE))
+
+        self.assertEqual(queue.take_counts(), (0, 2, 0))
+        self.assertEqual(span_ids(queue), [3, 4])
+
+    def test_span_over_budget_keeps_queue(self):
+        queue = _AdmissionQueue(10, 3 * SPAN_SIZE, SheddingPolicy.DROP_OLDEST)
+        queue.put(make_span(1))
+
+        queue.put(make_span(2, 3 * SPAN_SIZE))
+
+        self.assertEqual(queue.take_counts(), (0, 1, 0))
+        self.assertEqual(span_ids(queue), [1])
+
+    def test_drop_unsampled(self):
+        queue = _AdmissionQueue(
+            10, 3 * SPAN_SIZE, SheddingPolicy.DROP_UNSAMPLED
+        )
+        self.assertTrue(queue.accepts(make_span(1, sampled=False)))
+        queue.put(make_span(1, sampled=False))
+        queue.put(make_span(2))
+        queue.put(make_span(3, sampled=False))
+
+        queue.put(make_span(4))
+        queue.put(make_span(5))
+        # no unsampled span left to drop
+        queue.put(make_span(6))
+
+        self.assertEqual(queue.take_counts(), (0, 3, 0))
+        self.assertEqual(span_ids(queue), [2, 4, 5])
+
+    def test_only_drop_unsampled_accepts_unsampled(self):
+        queue = _AdmissionQueue(10, SPAN_SIZE, SheddingPolicy.DROP_OLDEST)
+
+        self.assertFalse(queue.accepts(make_span(1, sampled=False)))
+        self.assertTrue(queue.accepts(make_span(1)))
+
+    def test_strip_attributes(self):
+        queue = _AdmissionQueue(
+            10, 2 * SPAN_SIZE, SheddingPolicy.STRIP_ATTRIBUTES
+        )
+        queue.put(make_span(1))
+
+        queue.put(make_span(2, SPAN_SIZE))
+        queue.put(make_span(3, SPAN_SIZE))
+
+        self.assertEqual(queue.take_counts(), (0, 1, 3))
+        first, stripped = queue.get_batch(2)
+        self.assertEqual(first.attributes, {"value": ""})
+        self.assertEqual(stripped.context.span_id, 2)
+        self.assertFalse(stripped.attributes)
+        self.assertEqual(
+            [(event.name, event.timestamp) for event in stripped.events],
+            [("event", 1)],
+        )
+        self.assertFalse(stripped.events[0].attributes)
+        self.assertEqual(stripped.links[0].context, stripped.context)
+        self.assertFalse(stripped.links[0].attributes)
+
+    def test_max_spans_drops_oldest(self):
+        queue = _AdmissionQueue(2)
+        for span_id in range(1, 4):
+            queue.put(make_span(span_id))
+
+        self.assertEqual(queue.take_counts(), (1, 0, 0))
+        self.assertEqual(span_ids(queue), [2, 3])
+
+    def test_invalid_budget(self):
+        with self.assertRaises(ValueError):
+            _AdmissionQueue(10, 0)
+
+
+class TestMemoryBoundedBatchSpanProcessor(unittest.TestCase):
+    def setUp(self):
+        self.client = mock.Mock()
+        self.reader = InMemoryMetricReader()
+        self.exporter = CloudTraceSpanExporter(
+            "PROJECT",
+            client=self.client,
+            meter_provider=MeterProvider(metric_readers=[self.reader]),
+        )
+        self.processor = MemoryBoundedBatchSpanProcessor(
+            self.exporter,
+            max_queue_bytes=2 * SPAN_SIZE,
+            shedding_policy=SheddingPolicy.DROP_NEWEST,
+            schedule_delay_millis=60000,
+        )
+        self.addCleanup(self.processor.shutdown)
+
+    def exported_span_ids(self):
+        return [
+            int(span.span_id, 16)
+            for call in self.client.batch_write_spans.call_args_list
+            for span in call.kwargs["request"].spans
+        ]
+
+    def test_force_flush_exports_within_budget(self):
+        for span_id in range(1, 4):
+            self.processor.on_end(make_span(span_id))
+
+        with self.assertLogs(level="WARNING") as logs:
+            self.assertTrue(self.processor.force_flush())
+
+        self.assertEqual(self.exported_span_ids(), [1, 2])
+        self.assertEqual(len(logs.output), 1)
+        self.assertIn(
+            "Dropped 1 spans to keep the export queue", logs.output[0]
+        )
+        self.assertIn(
+            ({"type": "span"}, 1),
+            metric_points(self.reader)["gcp.exporter.dropped"],
+        )
+
+    def test_ignores_unsampled_spans(self):
+        self.processor.on_end(make_span(1, sampled=False))
+
+        self.processor.force_flush()
+
+        self.client.batch_write_spans.assert_not_called()
+
+    def test_exports_full_batch(self):
+        processor = MemoryBoundedBatchSpanProcessor(
+            self.exporter,
+            max_queue_bytes=10 * SPAN_SIZE,
+            schedule_delay_millis=60000,
+            max_export_batch_size=2,
+        )
+        self.addCleanup(processor.shutdown)
+        processor.on_end(make_span(1))
+        processor.on_end(make_span(2))
+
+        for _ in range(100):
+            if self.client.batch_write_spans.called:
+                break
+            processor._worker.join(0.01)
+
+        self.assertEqual(self.exported_span_ids(), [1, 2])
+
+    def test_with_tracer_provider(self):
+        tracer_provider = TracerProvider()
+        tracer_provider.add_span_processor(self.processor)
+        with tracer_provider.get_tracer(__name__).start_as_current_span("foo"):
+            pass
+
+        tracer_provider.shutdown()
+
+        (call,) = self.client.batch_write_spans.call_args_list
+        self.assertEqual(
+            [span.display_name.value for span in call.kwargs["request"].spans],
+            ["foo"],
+        )
+        self.assertFalse(self.processor.force_flush())
@@ -13,20 +13,49 @@
 # limitations under the License.
 
 import re
+import shutil
+import tempfile
+import threading
+import time
 import unittest
 from unittest import mock
 
+import grpc
+from google.api_core.exceptions import (
+    DeadlineExceeded,
+    PermissionDenied,
+    ServiceUnavailable,
+)
+from google.auth.credentials import AnonymousCredentials
+from google.cloud.trace_v2.services.trace_service.transports import (
+    TraceServiceGrpcTransport,
+)
 from google.cloud.trace_v2.types import AttributeValue, BatchWriteSpansRequest
 from google.cloud.trace_v2.types import Span as ProtoSpan
 from google.cloud.trace_v2.types import TruncatableString
+from google.protobuf.timestamp_pb2 import (  # pylint: disable=no-name-in-module
+    Timestamp,
+)
 from google.rpc import code_pb2
 from google.rpc.status_pb2 import Status  # pylint: disable=no-name-in-module
+from opentelemetry.context import (
+    _SUPPRESS_INSTRUMENTATION_KEY,
+    attach,
+    detach,
+    get_value,
+    set_value,
+)
 from opentelemetry.exporter.cloud_trace import (
     MAX_EVENT_ATTRS,
     MAX_LINK_ATTRS,
     MAX_NUM_EVENTS,
     MAX_NUM_LINKS,
+    AttributeValueCacheInfo,
     CloudTraceSpanExporter,
+    _attribute_key_cache,
+    _attribute_value_pb,
+    _AttributeValueCache,
+    _create_default_client,
     _extract_attributes,
     _extract_events,
     _extract_links,
@@ -36,13 +65,18 @@ from opentelemetry.exporter.cloud_trace import (
     _format_attribute_value,
     _get_time_from_ns,
     _strip_characters,
+    _translate_attribute_key,
     _truncate_str,
 )
 from opentelemetry.exporter.cloud_trace.version import __version__
+from opentelemetry.resourcedetector.gcp_resource_detector._channel_pool import (
+    CHANNEL_POOL,
+)
 from opentelemetry.sdk import version as opentelemetry_sdk_version
 from opentelemetry.sdk.resources import Resource
 from opentelemetry.sdk.trace import Event
 from opentelemetry.sdk.trace import _Span as Span
+from opentelemetry.sdk.trace.export import SpanExportResult
 from opentelemetry.trace import Link, SpanContext, SpanKind
 from opentelemetry.trace.status import Status as SpanStatus
 from opentelemetry.trace.status import StatusCode
@@ -115,6 +149,66 @@ class TestCloudTraceSpanExporter(unittest.TestCase):
         self.assertIs(exporter.client, client)
         self.assertEqual(exporter.project_id, self.project_id)
 
+    def test_constructor_compression(self):
+        env_var = "OTEL_EXPORTER_GCP_TRACE_COMPRESSION"
+        for kwargs, environ, expected in (
+            ({}, {}, None),
+            (
+                {"compression": grpc.Compression.Gzip},
+                {},
+                grpc.Compression.Gzip,
+            ),
+            ({}, {env_var: "Deflate"}, grpc.Compression.Deflate),
+            (
+                {"compression": grpc.Compression.NoCompression},
+                {env_var: "gzip"},
+                grpc.Compression.NoCompression,
+            ),
+        ):
+            with self.subTest(kwargs=kwargs, environ=environ):
+                with mock.patch.dict("os.environ", environ), mock.patch(
+                    "opentelemetry.exporter.cloud_trace._create_default_client"
+                ) as create_default_client:
+                    CloudTraceSpanExporter(self.project_id, **kwargs)
+
+                create_default_client.assert_called_once_with(expected)
+
+    def test_create_default_client_compression(self):
+        CHANNEL_POOL.clear()
+        self.addCleanup(CHANNEL_POOL.clear)
+        with mock.patch(
+            "google.auth.default", return_value=(AnonymousCredentials(), None)
+        ), mock.patch.object(
+            TraceServiceGrpcTransport, "create_channel"
+        ) as create_channel:
+            _create_default_client(grpc.Compression.Gzip)
+
+        self.assertEqual(
+            create_channel.call_args.kwargs["compression"],
+            grpc.Compression.Gzip,
+        )
+
+    def test_create_default_client_shares_channel(self):
+        CHANNEL_POOL.clear()
+        self.addCleanup(CHANNEL_POOL.clear)
+        with mock.patch(
+            "google.auth.default", return_value=(AnonymousCredentials(), None)
+        ) as default, mock.patch.object(
+            TraceServiceGrpcTransport, "create_channel"
+        ) as create_channel:
+            _create_default_client()
+            _create_default_client()
+            _create_default_client(grpc.Compression.Gzip)
+
+        default.assert_called_once()
+        self.assertEqual(create_channel.call_count, 2)
+
+    def test_constructor_invalid_compression_env(self):
+        with mock.patch.dict(
+            "os.environ", {"OTEL_EXPORTER_GCP_TRACE_COMPRESSION": "brotli"}
+        ), self.assertRaises(ValueError):
+            CloudTraceSpanExporter(self.project_id)
+
     def test_export(self):
         resource_info = Resource(
             {
@@ -184,8 +278,766 @@ class TestCloudTraceSpanExporter(unittest.TestCase):
             request=BatchWriteSpansRequest(
                 name="projects/{}".format(self.project_id),
                 spans=[cloud_trace_spans],
+            ),
+            retry=mock.ANY,
+            timeout=mock.ANY,
+        )
+
+    def test_export_proto_plus(self):
+        span_datas = [
+            Span(
+                name="span_name",
+                context=SpanContext(
+                    trace_id=int(self.example_trace_id, 16),
+                    span_id=int(self.example_span_id, 16),
+                    is_remote=False,
+                ),
+                attributes={"attr_key": "attr_value"},
+            )
+        ]
+        client = mock.Mock()
+        proto_plus_client = mock.Mock()
+
+        CloudTraceSpanExporter(self.project_id, client=client).export(
+            span_datas
+        )
+        CloudTraceSpanExporter(
+            self.project_id, client=proto_plus_client, use_proto_plus=True
+        ).export(span_datas)
+
+        self.assertEqual(
+            client.batch_write_spans.call_args.kwargs["request"],
+            proto_plus_client.batch_write_spans.call_args.kwargs["request"],
+        )
+
+    def test_translate_pb_matches_proto_plus(self):
+        parent = SpanContext(
+            trace_id=int(self.example_trace_id, 16),
+            span_id=int(self.example_span_id, 16),
+            is_remote=True,
+        )
+        link = Link(context=parent, attributes=self.attributes_variety_pack)
+        span_datas = [
+            Span(
+                name=self.str_300,
+                context=SpanContext(
+                    trace_id=int(self.example_trace_id, 16),
+                    span_id=0x1234,
+                    is_remote=False,
+                ),
+                parent=parent,
+                kind=SpanKind.SERVER,
+                resource=Resource(
+                    {
+                        "cloud.platform": "gcp_compute_engine",
+                        "cloud.provider": "gcp",
+                        "cloud.availability_zone": "us-east4-b",
+                        "host.id": "host",
+                    }
+                ),
+                attributes={
+                    **self.attributes_variety_pack,
+                    **{str(i): i for i in range(40)},
+                    "http.method": "GET",
+                    "/http/method": "POST",
+                    "illegal_attr_value": {},
+                    "list_attr": ["中文翻译", "b"],
+                    self.str_300: self.str_20kb,
+                },
+                links=[link, Link(context=parent)] * 70,
+                events=[
+                    Event(
+                        name="event",
+                        timestamp=self.example_time_in_ns,
+                        attributes={str(i): i for i in range(8)},
+                    ),
+                    Event(name="中文翻译" * 100, attributes=None),
+                ]
+                * 20,
+            ),
+            Span(
+                name="span_name",
+                context=SpanContext(
+                    trace_id=int(self.example_trace_id, 16),
+                    span_id=0x5678,
+                    is_remote=False,
+                ),
+            ),
+        ]
+        span_datas[0].set_status(SpanStatus(StatusCode.ERROR, "error_desc"))
+        span_datas[1].set_status(SpanStatus(StatusCode.OK))
+        # pylint: disable=protected-access
+        span_datas[0]._start_time = self.example_time_in_ns
+        span_datas[0]._end_time = self.example_time_in_ns + 1
+        exporter = CloudTraceSpanExporter(
+            self.project_id, client=mock.Mock(), resource_regex=r".*"
+        )
+
+        proto_plus_spans = exporter._translate_to_cloud_trace(span_datas)
+        pb_spans = exporter._translate_to_cloud_trace_pb(span_datas)
+
+        self.assertEqual(
+            [ProtoSpan.pb(span) for span in proto_plus_spans], pb_spans
+        )
+        self.assertEqual(
+            [
+                ProtoSpan.pb(span).SerializeToString(deterministic=True)
+                for span in proto_plus_spans
+            ],
+            [span.SerializeToString(deterministic=True) for span in pb_spans],
+        )
+
+    def _make_spans(self, count, attributes=None):
+        return [
+            Span(
+                name="span_name",
+                context=SpanContext(
+                    trace_id=int(self.example_trace_id, 16),
+                    span_id=span_id,
+                    is_remote=False,
+                ),
+                attributes=attributes,
+            )
+            for span_id in range(1, count + 1)
+        ]
+
+    def test_export_splits_by_span_count(self):
+        client = mock.Mock()
+        exporter = CloudTraceSpanExporter(self.project_id, client=client)
+
+        with mock.patch(
+            "opentelemetry.exporter.cloud_trace.MAX_BATCH_WRITE_SPANS", 2
+        ):
+            result = exporter.export(self._make_spans(5))
+
+        self.assertEqual(result, SpanExportResult.SUCCESS)
+        self.assertEqual(
+            [
+                len(call.kwargs["request"].spans)
+                for call in client.batch_write_spans.call_args_list
+            ],
+            [2, 2, 1],
+        )
+
+    def test_export_splits_by_byte_size(self):
+        client = mock.Mock()
+        exporter = CloudTraceSpanExporter(self.project_id, client=client)
+        max_bytes = 40000
+
+        with mock.patch(
+            "opentelemetry.exporter.cloud_trace.MAX_BATCH_WRITE_BYTES",
+            max_bytes,
+        ):
+            result = exporter.export(
+                self._make_spans(5, attributes={"big": self.str_16kb})
             )
+
+        self.assertEqual(result, SpanExportResult.SUCCESS)
+        requests = [
+            call.kwargs["request"]
+            for call in client.batch_write_spans.call_args_list
+        ]
+        self.assertEqual(
+            [len(request.spans) for request in requests], [2, 2, 1]
         )
+        for request in requests:
+            self.assertLessEqual(
+                BatchWriteSpansRequest.pb(request).ByteSize(), max_bytes
+            )
+
+    def _make_trace_spans(self, trace_ids):
+        return [
+            Span(
+                name="span_name",
+                context=SpanContext(
+                    trace_id=trace_id, span_id=span_id, is_remote=False
+                ),
+            )
+            for span_id, trace_id in enumerate(trace_ids, 1)
+        ]
+
+    def _exported_trace_ids(self, client):
+        return [
+            [
+                span.name.split("/")[3][-1]
+                for span in call.kwargs["request"].spans
+            ]
+            for call in client.batch_write_spans.call_args_list
+        ]
+
+    def test_export_groups_spans_by_trace(self):
+        spans = self._make_trace_spans([1, 2, 1, 2, 3, 3, 3, 3])
+        for group_spans_by_trace, expected in (
+            (
+                False,
+                [["1", "2", "1"], ["2", "3", "3"], ["3", "3"]],
+            ),
+            (
+                True,
+                [["1", "1"], ["2", "2"], ["3", "3", "3"], ["3"]],
+            ),
+        ):
+            with self.subTest(group_spans_by_trace=group_spans_by_trace):
+                client = mock.Mock()
+                exporter = CloudTraceSpanExporter(
+                    self.project_id,
+                    client=client,
+                    group_spans_by_trace=group_spans_by_trace,
+                )
+
+                with mock.patch(
+                    "opentelemetry.exporter.cloud_trace.MAX_BATCH_WRITE_SPANS",
+                    3,
+                ):
+                    exporter.export(spans)
+
+                self.assertEqual(self._exported_trace_ids(client), expected)
+
+    def test_export_fills_child_span_count(self):
+        trace_id = int(self.example_trace_id, 16)
+        parent = Span(
+            name="parent",
+            context=SpanContext(trace_id=trace_id, span_id=1, is_remote=False),
+            parent=SpanContext(trace_id=trace_id, span_id=9, is_remote=True),
+        )
+        children = [
+            Span(
+                name="child",
+                context=SpanContext(
+                    trace_id=trace_id, span_id=span_id, is_remote=False
+                ),
+                parent=parent.context,
+            )
+            for span_id in (2, 3)
+        ]
+
+        for use_proto_plus in (False, True):
+            with self.subTest(use_proto_plus=use_proto_plus):
+                client = mock.Mock()
+                exporter = CloudTraceSpanExporter(
+                    self.project_id,
+                    client=client,
+                    use_proto_plus=use_proto_plus,
+                    group_spans_by_trace=True,
+                )
+
+                exporter.export(children[:1])
+                exporter.export([children[1], parent])
+
+                exported = {
+                    span.display_name.value: span
+                    for call in client.batch_write_spans.call_args_list
+                    for span in call.kwargs["request"].spans
+                }
+                self.assertEqual(exported["parent"].child_span_count, 2)
+                self.assertFalse(
+                    exported["parent"].same_process_as_parent_span
+                )
+                self.assertIsNone(exported["child"].child_span_count)
+                self.assertTrue(exported["child"].same_process_as_parent_span)
+                # pylint: disable=protected-access
+                self.assertEqual(len(exporter._child_span_counts), 0)
+
+    def test_export_child_span_count_of_child_ending_after_parent(self):
+        trace_id = int(self.example_trace_id, 16)
+        parent = Span(
+            name="parent",
+            context=SpanContext(trace_id=trace_id, span_id=1, is_remote=False),
+        )
+        child = Span(
+            name="child",
+            context=SpanContext(trace_id=trace_id, span_id=2, is_remote=False),
+            parent=parent.context,
+        )
+
+        for use_proto_plus in (False, True):
+            with self.subTest(use_proto_plus=use_proto_plus):
+                client = mock.Mock()
+                exporter = CloudTraceSpanExporter(
+                    self.project_id,
+                    client=client,
+                    use_proto_plus=use_proto_plus,
+                    group_spans_by_trace=True,
+                )
+
+                exporter.export([parent])
+                exporter.export([child])
+
+                (parent_pb,) = (
+                    client.batch_write_spans.call_args_list[0]
+                    .kwargs["request"]
+                    .spans
+                )
+                # the late child isn't counted, and no count is claimed
+                self.assertIsNone(parent_pb.child_span_count)
+                self.assertFalse(
+                    type(parent_pb).pb(parent_pb).HasField("child_span_count")
+                )
+
+    def test_export_drops_span_larger_than_request(self):
+        client = mock.Mock()
+        exporter = CloudTraceSpanExporter(self.project_id, client=client)
+        spans = self._make_spans(1, attributes={"big": self.str_16kb})
+        spans += self._make_spans(1)
+
+        with mock.patch(
+            "opentelemetry.exporter.cloud_trace.MAX_BATCH_WRITE_BYTES",
+            10000,
+        ), self.assertLogs(level="WARNING"):
+            result = exporter.export(spans)
+
+        self.assertEqual(result, SpanExportResult.SUCCESS)
+        client.batch_write_spans.assert_called_once()
+        self.assertEqual(
+            len(client.batch_write_spans.call_args.kwargs["request"].spans), 1
+        )
+
+    def test_export_continues_after_failed_request(self):
+        client = mock.Mock()
+        client.batch_write_spans.side_effect = [Exception("fail"), None]
+        exporter = CloudTraceSpanExporter(self.project_id, client=client)
+
+        with mock.patch(
+            "opentelemetry.exporter.cloud_trace.MAX_BATCH_WRITE_SPANS", 1
+        ), self.assertLogs(level="ERROR"):
+            result = exporter.export(self._make_spans(2))
+
+        self.assertEqual(result, SpanExportResult.FAILURE)
+        self.assertEqual(client.batch_write_spans.call_count, 2)
+
+    def test_export_sends_requests_concurrently(self):
+        barrier = threading.Barrier(3, timeout=5)
+        client = mock.Mock()
+        client.batch_write_spans.side_effect = lambda **kwargs: barrier.wait()
+        exporter = CloudTraceSpanExporter(
+            self.project_id, client=client, max_concurrent_requests=3
+        )
+
+        with mock.patch(
+            "opentelemetry.exporter.cloud_trace.MAX_BATCH_WRITE_SPANS", 1
+        ):
+            # would fail with BrokenBarrierError if requests were sent one at a time
+            result = exporter.export(self._make_spans(3))
+        exporter.shutdown()
+
+        self.assertEqual(result, SpanExportResult.SUCCESS)
+        self.assertEqual(client.batch_write_spans.call_count, 3)
+
+    def test_export_limits_concurrent_requests(self):
+        lock = threading.Lock()
+        # requests pass it in pairs, so it breaks unless two run at once
+        barrier = threading.Barrier(2, timeout=5)
+        in_flight = []
+        max_in_flight = [0]
+
+        def batch_write_spans(request, **kwargs):
+            with lock:
+                in_flight.append(request)
+                max_in_flight[0] = max(max_in_flight[0], len(in_flight))
+            barrier.wait()
+            with lock:
+                in_flight.remove(request)
+
+        client = mock.Mock()
+        client.batch_write_spans.side_effect = batch_write_spans
+        exporter = CloudTraceSpanExporter(
+            self.project_id, client=client, max_concurrent_requests=2
+        )
+
+        with mock.patch(
+            "opentelemetry.exporter.cloud_trace.MAX_BATCH_WRITE_SPANS", 1
+        ):
+            result = exporter.export(self._make_spans(6))
+        exporter.shutdown()
+
+        self.assertEqual(result, SpanExportResult.SUCCESS)
+        self.assertEqual(client.batch_write_spans.call_count, 6)
+        self.assertLessEqual(max_in_flight[0], 2)
+
+    def test_export_concurrent_requests_propagate_context(self):
+        suppressed = []
+        client = mock.Mock()
+        client.batch_write_spans.side_effect = (
+            lambda **kwargs: suppressed.append(
+                get_value(_SUPPRESS_INSTRUMENTATION_KEY)
+            )
+        )
+        exporter = CloudTraceSpanExporter(
+            self.project_id, client=client, max_concurrent_requests=2
+        )
+
+        token = attach(set_value(_SUPPRESS_INSTRUMENTATION_KEY, True))
+        try:
+            with mock.patch(
+                "opentelemetry.exporter.cloud_trace.MAX_BATCH_WRITE_SPANS", 1
+            ):
+                exporter.export(self._make_spans(2))
+        finally:
+            detach(token)
+        exporter.shutdown()
+
+        self.assertEqual(suppressed, [True, True])
+
+    def test_constructor_invalid_max_concurrent_requests(self):
+        with self.assertRaises(ValueError):
+            CloudTraceSpanExporter(
+                self.project_id,
+                client=mock.Mock(),
+                max_concurrent_requests=0,
+            )
+
+    @staticmethod
+    def _retrying_client(rpc):
+        """Mock client applying the retry passed to batch_write_spans to ``rpc``, like the
+        GAPIC client does."""
+        client = mock.Mock()
+        client.batch_write_spans.side_effect = (
+            lambda request, retry, timeout: retry(rpc)(request)
+        )
+        return client
+
+    @mock.patch("time.sleep")
+    def test_export_retries_retryable_errors(self, sleep):
+        rpc = mock.Mock(
+            side_effect=[
+                ServiceUnavailable("unavailable"),
+                DeadlineExceeded("deadline exceeded"),
+                None,
+            ]
+        )
+        exporter = CloudTraceSpanExporter(
+            self.project_id, client=self._retrying_client(rpc)
+        )
+
+        result = exporter.export(self._make_spans(1))
+
+        self.assertEqual(result, SpanExportResult.SUCCESS)
+        self.assertEqual(rpc.call_count, 3)
+        self.assertEqual(sleep.call_count, 2)
+
+    def test_export_does_not_retry_other_errors(self):
+        rpc = mock.Mock(side_effect=PermissionDenied("denied"))
+        exporter = CloudTraceSpanExporter(
+            self.project_id, client=self._retrying_client(rpc)
+        )
+
+        with self.assertLogs(level="ERROR"):
+            result = exporter.export(self._make_spans(1))
+
+        self.assertEqual(result, SpanExportResult.FAILURE)
+        self.assertEqual(rpc.call_count, 1)
+
+    def test_export_retries_until_deadline(self):
+        rpc = mock.Mock(side_effect=ServiceUnavailable("unavailable"))
+        exporter = CloudTraceSpanExporter(
+            self.project_id,
+            client=self._retrying_client(rpc),
+            export_timeout_millis=200,
+        )
+
+        start = time.monotonic()
+        with self.assertLogs(level="ERROR"):
+            result = exporter.export(self._make_spans(1))
+
+        self.assertEqual(result, SpanExportResult.FAILURE)
+        self.assertLess(time.monotonic() - start, 1)
+        self.assertGreaterEqual(rpc.call_count, 1)
+
+    def test_export_requests_share_deadline(self):
+        client = mock.Mock()
+        exporter = CloudTraceSpanExporter(
+            self.project_id, client=client, export_timeout_millis=1000
+        )
+
+        with mock.patch(
+            "opentelemetry.exporter.cloud_trace.MAX_BATCH_WRITE_SPANS", 1
+        ), mock.patch("time.monotonic", side_effect=[0, 0.1, 0.5, 1.5]):
+            with self.assertLogs(level="ERROR"):
+                result = exporter.export(self._make_spans(3))
+
+        self.assertEqual(result, SpanExportResult.FAILURE)
+        self.assertEqual(
+            [
+                call.kwargs["timeout"]
+                for call in client.batch_write_spans.call_args_list
+            ],
+            [0.9, 0.5],
+        )
+
+    def test_constructor_invalid_export_timeout(self):
+        with self.assertRaises(ValueError):
+            CloudTraceSpanExporter(
+                self.project_id, client=mock.Mock(), export_timeout_millis=0
+            )
+
+    def test_export_spills_and_replays_transient_failures(self):
+        client = mock.Mock()
+        client.batch_write_spans.side_effect = ServiceUnavailable("down")
+        with tempfile.TemporaryDirectory() as spill_directory:
+            exporter = CloudTraceSpanExporter(
+                self.project_id,
+                client=client,
+                spill_directory=spill_directory,
+            )
+            with self.assertLogs(level="ERROR"):
+                result = exporter.export(self._make_spans(2))
+            request = client.batch_write_spans.call_args.kwargs["request"]
+
+            self.assertEqual(result, SpanExportResult.FAILURE)
+            # pylint: disable=protected-access
+            self.assertGreater(exporter._spill_queue.total_bytes, 0)
+            self.assertFalse(exporter._spill_queue.replay())
+
+            client.batch_write_spans.side_effect = None
+            self.assertTrue(exporter._spill_queue.replay())
+            exporter.shutdown()
+
+        self.assertEqual(
+            client.batch_write_spans.call_args.kwargs["request"], request
+        )
+        self.assertEqual(client.batch_write_spans.call_count, 3)
+
+    def test_export_does_not_spill_permanent_failures(self):
+        client = mock.Mock()
+        client.batch_write_spans.side_effect = PermissionDenied("denied")
+        with tempfile.TemporaryDirectory() as spill_directory:
+            exporter = CloudTraceSpanExporter(
+                self.project_id,
+                client=client,
+                spill_directory=spill_directory,
+            )
+            with self.assertLogs(level="ERROR"):
+                exporter.export(self._make_spans(1))
+            exporter.shutdown()
+
+            # pylint: disable=protected-access
+            self.assertEqual(exporter._spill_queue.total_bytes, 0)
+
+    def test_export_fails_when_spilling_fails(self):
+        client = mock.Mock()
+        client.batch_write_spans.side_effect = ServiceUnavailable("down")
+        with tempfile.TemporaryDirectory() as spill_directory:
+            exporter = CloudTraceSpanExporter(
+                self.project_id,
+                client=client,
+                spill_directory=spill_directory,
+            )
+            shutil.rmtree(spill_directory)
+
+            with self.assertLogs(level="WARNING"):
+                result = exporter.export(self._make_spans(1))
+            exporter.shutdown()
+
+        self.assertEqual(result, SpanExportResult.FAILURE)
+
+    def test_spill_directory_from_env(self):
+        with tempfile.TemporaryDirectory() as spill_directory, mock.patch.dict(
+            "os.environ",
+            {"OTEL_EXPORTER_GCP_TRACE_SPILL_DIRECTORY": spill_directory},
+        ):
+            exporter = CloudTraceSpanExporter(
+                self.project_id, client=mock.Mock()
+            )
+            exporter.shutdown()
+
+        # pylint: disable=protected-access
+        self.assertIsNotNone(exporter._spill_queue)
+
+    def test_resource_labels_cached_per_resource(self):
+        resource = Resource(
+            {
+                "cloud.platform": "gcp_compute_engine",
+                "cloud.provider": "gcp",
+                "cloud.availability_zone": "us-east4-b",
+                "host.id": "host",
+            }
+        )
+        span_datas = [
+            Span(
+                name="span_name",
+                context=SpanContext(
+                    trace_id=int(self.example_trace_id, 16),
+                    span_id=span_id,
+                    is_remote=False,
+                ),
+                resource=resource,
+            )
+            for span_id in range(1, 4)
+        ]
+        exporter = CloudTraceSpanExporter(self.project_id, client=mock.Mock())
+
+        with mock.patch(
+            "opentelemetry.exporter.cloud_trace._extract_resources",
+            wraps=_extract_resources,
+        ) as extract_resources:
+            # pylint: disable=protected-access
+            first = exporter._translate_to_cloud_trace(span_datas)
+            second = exporter._translate_to_cloud_trace(span_datas)
+
+        extract_resources.assert_called_once_with(resource, None)
+        self.assertEqual(first, second)
+        self.assertIn(
+            "g.co/r/gce_instance/instance_id",
+            first[2].attributes.attribute_map,
+        )
+
+    def test_resource_label_values_translated_once_per_resource(self):
+        resource = Resource({"service.name": "svc", "host.id": "host"})
+        span_datas = [
+            Span(
+                name="span_name",
+                context=SpanContext(
+                    trace_id=int(self.example_trace_id, 16),
+                    span_id=span_id,
+                    is_remote=False,
+                ),
+                resource=resource,
+                # translates the same as the resource label
+                attributes={"peer.service": "svc", "other": "value"},
+            )
+            for span_id in range(1, 4)
+        ]
+        exporter = CloudTraceSpanExporter(
+            self.project_id, client=mock.Mock(), resource_regex=r".*"
+        )
+
+        with mock.patch(
+            "opentelemetry.exporter.cloud_trace._attribute_value_pb",
+            wraps=_attribute_value_pb,
+        ) as attribute_value_pb:
+            # pylint: disable=protected-access
+            spans_pb = exporter._translate_to_cloud_trace_pb(span_datas)
+
+        # once per label value, other values are set in place
+        self.assertEqual(
+            sorted(call.args[0] for call in attribute_value_pb.call_args_list),
+            ["host", "svc"],
+        )
+        self.assertEqual(
+            {
+                key: value.string_value.value
+                for key, value in spans_pb[2].attributes.attribute_map.items()
+                if key != "g.co/agent"
+            },
+            {
+                "service.name": "svc",
+                "host.id": "host",
+                "peer.service": "svc",
+                "other": "value",
+            },
+        )
+
+    def test_resource_labels_cache_evicts_oldest(self):
+        exporter = CloudTraceSpanExporter(self.project_id, client=mock.Mock())
+        resources = [Resource({"service.name": str(i)}) for i in range(3)]
+
+        with mock.patch(
+            "opentelemetry.exporter.cloud_trace._MAX_CACHED_RESOURCES", 2
+        ), mock.patch(
+            "opentelemetry.exporter.cloud_trace._extract_resources",
+            wraps=_extract_resources,
+        ) as extract_resources:
+            # pylint: disable=protected-access
+            for resource in resources:
+                exporter._get_resource_labels(resource)
+            # most recently used resources are still cached
+            exporter._get_resource_labels(resources[1])
+            exporter._get_resource_labels(resources[2])
+            self.assertEqual(extract_resources.call_count, 3)
+            # the oldest was evicted
+            exporter._get_resource_labels(resources[0])
+            self.assertEqual(extract_resources.call_count, 4)
+
+    def test_attribute_value_cache(self):
+        spans = self._make_spans(
+            3,
+            attributes={
+                "http.method": "GET",
+                "http.status_code": 200,
+                "float": 1.5,
+                "list": [1, 2],
+            },
+        )
+        exporter = CloudTraceSpanExporter(
+            self.project_id,
+            client=mock.Mock(),
+            use_proto_plus=True,
+            attribute_value_cache_size=16,
+        )
+        uncached_exporter = CloudTraceSpanExporter(
+            self.project_id, client=mock.Mock(), use_proto_plus=True
+        )
+
+        # pylint: disable=protected-access
+        self.assertEqual(
+            exporter._translate_to_requests(spans),
+            uncached_exporter._translate_to_requests(spans),
+        )
+        self.assertEqual(
+            exporter.attribute_value_cache_info(),
+            AttributeValueCacheInfo(hits=4, misses=2, maxsize=16, currsize=2),
+        )
+        self.assertEqual(
+            uncached_exporter.attribute_value_cache_info(),
+            AttributeValueCacheInfo(0, 0, 0, 0),
+        )
+
+    def test_attribute_value_cache_pb(self):
+        spans = self._make_spans(
+            3, attributes={"http.method": "GET", "float": 1.5}
+        )
+        exporter = CloudTraceSpanExporter(
+            self.project_id, client=mock.Mock(), attribute_value_cache_size=16
+        )
+        uncached_exporter = CloudTraceSpanExporter(
+            self.project_id, client=mock.Mock()
+        )
+
+        # pylint: disable=protected-access
+        self.assertEqual(
+            exporter._translate_to_requests(spans),
+            uncached_exporter._translate_to_requests(spans),
+        )
+        self.assertEqual(
+            exporter.attribute_value_cache_info(),
+            AttributeValueCacheInfo(hits=2, misses=1, maxsize=16, currsize=1),
+        )
+
+    def test_attribute_value_cache_evicts_least_recently_used(self):
+        cache = _AttributeValueCache(2)
+        translate = mock.Mock(side_effect=_format_attribute_value)
+
+        for value in ("foo", "bar", "foo", "baz", "foo", "bar"):
+            cache.get(value, translate)
+
+        self.assertEqual(
+            [call.args[0] for call in translate.call_args_list],
+            ["foo", "bar", "baz", "bar"],
+        )
+        self.assertEqual(cache.info(), AttributeValueCacheInfo(2, 4, 2, 2))
+
+    def test_attribute_value_cache_distinguishes_types(self):
+        cache = _AttributeValueCache(8)
+
+        self.assertEqual(
+            cache.get(1, _format_attribute_value),
+            AttributeValue(int_value=1),
+        )
+        self.assertEqual(
+            cache.get(True, _format_attribute_value),
+            AttributeValue(bool_value=True),
+        )
+        self.assertIsNone(cache.get(1.0, _format_attribute_value))
+        self.assertIsNone(cache.get((1, 2), _format_attribute_value))
+        self.assertIsNone(cache.get("a" * 1000, _format_attribute_value))
+
+    def test_constructor_invalid_attribute_value_cache_size(self):
+        with self.assertRaises(ValueError):
+            CloudTraceSpanExporter(
+                self.project_id,
+                client=mock.Mock(),
+                attribute_value_cache_size=-1,
+            )
 
     def test_extract_status_code_unset(self):
         self.assertIsNone(
@@ -404,6 +1256,56 @@ class TestCloudTraceSpanExporter(unittest.TestCase):
             ),
         )
 
+    def test_attribute_key_cache(self):
+        _attribute_key_cache.clear()
+        self.addCleanup(_attribute_key_cache.clear)
+
+        self.assertEqual(
+            _translate_attribute_key("http.method"), "/http/method"
+        )
+        self.assertEqual(_translate_attribute_key(self.str_300), self.str_128)
+        self.assertEqual(_translate_attribute_key(""), "")
+
+        self.assertEqual(
+            _attribute_key_cache,
+            {
+                "http.method": "/http/method",
+                self.str_300: self.str_128,
+                "": "",
+            },
+        )
+
+    def test_attribute_key_cache_cleared_when_full(self):
+        _attribute_key_cache.clear()
+        self.addCleanup(_attribute_key_cache.clear)
+
+        with mock.patch(
+            "opentelemetry.exporter.cloud_trace._MAX_CACHED_ATTRIBUTE_KEYS", 2
+        ):
+            _extract_attributes(
+                {"key1": "value", "key2": "value", "http.method": "GET"},
+                num_attrs_limit=4,
+            )
+            self.assertEqual(
+                _attribute_key_cache, {"http.method": "/http/method"}
+            )
+            _translate_attribute_key("key1")
+
+        self.assertEqual(
+            _attribute_key_cache,
+            {"http.method": "/http/method", "key1": "key1"},
+        )
+
+    def test_get_time_from_ns(self):
+        self.assertIsNone(_get_time_from_ns(None))
+        self.assertIsNone(_get_time_from_ns(0))
+        expected = Timestamp()
+        expected.FromNanoseconds(self.example_time_in_ns)
+
+        span = ProtoSpan(start_time=_get_time_from_ns(self.example_time_in_ns))
+
+        self.assertEqual(ProtoSpan.pb(span).start_time, expected)
+
     def test_extract_empty_events(self):
         self.assertIsNone(_extract_events([]))
 
@@ -748,6 +1650,11 @@ class TestCloudTraceSpanExporter(unittest.TestCase):
         self.assertEqual(_truncate_str("aaaa", limit=5), ("aaaa", 0))
         self.assertEqual(_truncate_str("aaaa", limit=4), ("aaaa", 0))
         self.assertEqual(_truncate_str("中文翻译", limit=4), ("中", 9))
+        self.assertEqual(_truncate_str("中文翻译", limit=12), ("中文翻译", 0))
+        self.assertEqual(_truncate_str("中文翻译", limit=11), ("中文翻", 3))
+        self.assertEqual(_truncate_str("a中", limit=3), ("a", 3))
+        self.assertEqual(_truncate_str("", limit=0), ("", 0))
+        self.assertEqual(_truncate_str("a" * 300, limit=128), ("a" * 128, 172))
 
     def test_strip_characters(self):
         self.assertEqual("0.10.0", _strip_characters("0.10.0b"))
@@ -0,0 +1,304 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import threading
+import unittest
+from unittest import mock
+
+from google.api_core.exceptions import ServiceUnavailable
+from opentelemetry.context import _SUPPRESS_INSTRUMENTATION_KEY, get_value
+from opentelemetry.exporter.cloud_trace import CloudTraceSpanExporter
+from opentelemetry.exporter.cloud_trace.admission import (
+    SheddingPolicy,
+    estimate_span_size,
+)
+from opentelemetry.exporter.cloud_trace.aio import (
+    AsyncBatchSpanProcessor,
+    AsyncCloudTraceSpanExporter,
+)
+from opentelemetry.sdk.trace import ReadableSpan, TracerProvider
+from opentelemetry.sdk.trace import _Span as Span
+from opentelemetry.sdk.trace.export import SpanExportResult
+from opentelemetry.trace import SpanContext
+
+PROJECT_ID = "PROJECT"
+TRACE_ID = 0x6E0C63257DE34C92BF9EFCD03927272E
+
+
+def make_spans(count):
+    return [
+        Span(
+            name="span_name",
+            context=SpanContext(
+                trace_id=TRACE_ID, span_id=span_id, is_remote=False
+            ),
+            attributes={"attr_key": "attr_value"},
+        )
+        for span_id in range(1, count + 1)
+    ]
+
+
+class TestAsyncCloudTraceSpanExporter(unittest.IsolatedAsyncioTestCase):
+    async def test_export_matches_sync_exporter(self):
+        client = mock.AsyncMock()
+        sync_client = mock.Mock()
+        spans = make_spans(3)
+
+        result = await AsyncCloudTraceSpanExporter(
+            PROJECT_ID, client=client
+        ).export(spans)
+        CloudTraceSpanExporter(PROJECT_ID, client=sync_client).export(spans)
+
+        self.assertEqual(result, SpanExportResult.SUCCESS)
+        self.assertEqual(
+            client.batch_write_spans.await_args.kwargs["request"],
+            sync_client.batch_write_spans.call_args.kwargs["request"],
+        )
+
+    async def test_export_failure(self):
+        client = mock.AsyncMock()
+        client.batch_write_spans.side_effect = Exception("fail")
+        exporter = AsyncCloudTraceSpanExporter(PROJECT_ID, client=client)
+
+        with self.assertLogs(level="ERROR"):
+            result = await exporter.export(make_spans(1))
+
+        self.assertEqual(result, SpanExportResult.FAILURE)
+
+    async def test_export_retries_retryable_errors(self):
+        rpc = mock.AsyncMock(
+            side_effect=[ServiceUnavailable("unavailable"), None]
+        )
+
+        async def batch_write_spans(request, retry, timeout):
+            return await retry(rpc)(request)
+
+        client = mock.AsyncMock()
+        client.batch_write_spans.side_effect = batch_write_spans
+        exporter = AsyncCloudTraceSpanExporter(PROJECT_ID, client=client)
+
+        with mock.patch("asyncio.sleep", mock.AsyncMock()):
+            result = await exporter.export(make_spans(1))
+
+        self.assertEqual(result, SpanExportResult.SUCCESS)
+        self.assertEqual(rpc.await_count, 2)
+
+    async def test_export_limits_concurrent_requests(self):
+        in_flight = []
+        max_in_flight = 0
+
+        async def batch_write_spans(request, **kwargs):
+            nonlocal max_in_flight
+            in_flight.append(request)
+            max_in_flight = max(max_in_flight, len(in_flight))
+            await asyncio.sleep(0.01)
+            in_flight.remove(request)
+
+        client = mock.AsyncMock()
+        client.batch_write_spans.side_effect = batch_write_spans
+        exporter = AsyncCloudTraceSpanExporter(
+            PROJECT_ID, client=client, max_concurrent_requests=2
+        )
+
+        with mock.patch(
+            "opentelemetry.exporter.cloud_trace.MAX_BATCH_WRITE_SPANS", 1
+        ):
+            result = await exporter.export(make_spans(5))
+
+        self.assertEqual(result, SpanExportResult.SUCCESS)
+        self.assertEqual(client.batch_write_spans.await_count, 5)
+        self.assertEqual(max_in_flight, 2)
+
+
+class TestAsyncBatchSpanProcessor(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.client = mock.AsyncMock()
+        self.processor = AsyncBatchSpanProcessor(
+            AsyncCloudTraceSpanExporter(PROJECT_ID, client=self.client),
+            max_export_batch_size=2,
+        )
+        self.tracer_provider = TracerProvider()
+        self.tracer_provider.add_span_processor(self.processor)
+        self.tracer = self.tracer_provider.get_tracer(__name__)
+
+    async def asyncTearDown(self):
+        await self.processor.aclose()
+
+    def exported_span_names(self):
+        return [
+            span.display_name.value
+            for call in self.client.batch_write_spans.await_args_list
+            for span in call.kwargs["request"].spans
+        ]
+
+    async def test_flush(self):
+        with self.tracer.start_as_current_span("foo"):
+            pass
+
+        await self.processor.flush()
+
+        self.assertEqual(self.exported_span_names(), ["foo"])
+
+    async def test_exports_full_batch(self):
+        for name in ("foo", "bar"):
+            with self.tracer.start_as_current_span(name):
+                pass
+
+        for _ in range(100):
+            if self.client.batch_write_spans.await_count:
+                break
+            await asyncio.sleep(0.01)
+
+        self.assertEqual(self.exported_span_names(), ["foo", "bar"])
+
+    async def test_export_suppresses_instrumentation(self):
+        suppressed = []
+
+        async def batch_write_spans(**kwargs):
+            suppressed.append(get_value(_SUPPRESS_INSTRUMENTATION_KEY))
+
+        self.client.batch_write_spans.side_effect = batch_write_spans
+        with self.tracer.start_as_current_span("foo"):
+            pass
+
+        await self.processor.flush()
+
+        self.assertEqual(suppressed, [True])
+        self.assertIsNone(get_value(_SUPPRESS_INSTRUMENTATION_KEY))
+
+    async def test_logs_dropped_spans(self):
+        processor = AsyncBatchSpanProcessor(
+            AsyncCloudTraceSpanExporter(PROJECT_ID, client=self.client),
+            max_queue_size=2,
+            max_export_batch_size=2,
+        )
+        self.tracer_provider.add_span_processor(processor)
+        for name in ("foo", "bar", "baz"):
+            with self.tracer.start_as_current_span(name):
+                pass
+
+        with self.assertLogs(level="WARNING") as logs:
+            await processor.aclose()
+
+        self.assertIn("Dropped 1 spans", logs.output[0])
+
+    async def test_sheds_spans_over_memory_budget(self):
+        client = mock.AsyncMock()
+        processor = AsyncBatchSpanProcessor(
+            AsyncCloudTraceSpanExporter(PROJECT_ID, client=client),
+            # room for two of the spans
+            max_queue_bytes=2 * estimate_span_size(ReadableSpan(name="foo")),
+            shedding_policy=SheddingPolicy.DROP_OLDEST,
+        )
+        self.tracer_provider.add_span_processor(processor)
+        for name in ("foo", "bar", "baz"):
+            with self.tracer.start_as_current_span(name):
+                pass
+
+        with self.assertLogs(level="WARNING") as logs:
+            await processor.aclose()
+
+        self.assertIn(
+            "Dropped 1 spans to keep the export queue", logs.output[0]
+        )
+        self.assertEqual(
+            [
+                span.display_name.value
+                for call in client.batch_write_spans.await_args_list
+                for span in call.kwargs["request"].spans
+            ],
+            ["bar", "baz"],
+        )
+
+    async def test_aclose_exports_remaining_spans(self):
+        with self.tracer.start_as_current_span("foo"):
+            pass
+
+        await self.processor.aclose()
+
+        self.assertEqual(self.exported_span_names(), ["foo"])
+        with self.tracer.start_as_current_span("after_shutdown"):
+            pass
+        await self.processor.flush()
+        self.assertEqual(self.exported_span_names(), ["foo"])
+
+
+class TestAsyncBatchSpanProcessorStoppedLoop(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.client = mock.AsyncMock()
+        self.processor = AsyncBatchSpanProcessor(
+            AsyncCloudTraceSpanExporter(PROJECT_ID, client=self.client),
+            loop=self.loop,
+        )
+        tracer_provider = TracerProvider()
+        tracer_provider.add_span_processor(self.processor)
+        self.tracer = tracer_provider.get_tracer(__name__)
+        # start the export task, then stop the loop like asyncio.run() returning
+        self.loop.run_until_complete(asyncio.sleep(0))
+
+    def tearDown(self):
+        self.loop.close()
+
+    def test_shutdown_runs_stopped_loop(self):
+        with self.tracer.start_as_current_span("foo"):
+            pass
+
+        self.processor.shutdown()
+
+        self.assertEqual(self.client.batch_write_spans.await_count, 1)
+
+    def test_shutdown_closed_loop_logs_dropped_spans(self):
+        with self.tracer.start_as_current_span("foo"):
+            pass
+        self.loop.close()
+
+        with self.assertLogs(level="WARNING") as logs:
+            self.processor.shutdown()
+
+        self.assertIn("Dropped 1 spans", logs.output[0])
+        self.client.batch_write_spans.assert_not_awaited()
+
+
+class TestAsyncBatchSpanProcessorOtherThread(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever)
+        self.thread.start()
+
+    def tearDown(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+
+    def test_force_flush_and_shutdown(self):
+        client = mock.AsyncMock()
+        processor = AsyncBatchSpanProcessor(
+            AsyncCloudTraceSpanExporter(PROJECT_ID, client=client),
+            loop=self.loop,
+        )
+        tracer_provider = TracerProvider()
+        tracer_provider.add_span_processor(processor)
+        tracer = tracer_provider.get_tracer(__name__)
+
+        with tracer.start_as_current_span("foo"):
+            pass
+        self.assertTrue(processor.force_flush())
+        self.assertEqual(client.batch_write_spans.await_count, 1)
+
+        with tracer.start_as_current_span("bar"):
+            pass
+        processor.shutdown()
+        self.assertEqual(client.batch_write_spans.await_count, 2)
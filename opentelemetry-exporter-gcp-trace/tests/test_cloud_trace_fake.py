@@ -0,0 +1,404 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests of the exporter writing to the in-process fake Cloud Trace."""
+
+# pylint: disable=protected-access
+
+import time
+from typing import List, Optional
+from unittest import mock
+
+import grpc
+import pytest
+from fixtures.cloud_trace_fake import CloudTraceFake
+from opentelemetry.exporter.cloud_trace import (
+    _LINKS_TRUNCATED,
+    _TRUNCATION_WARNINGS,
+    CloudTraceSpanExporter,
+)
+from opentelemetry.sdk.metrics import MeterProvider
+from opentelemetry.sdk.metrics.export import InMemoryMetricReader
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import Event, ReadableSpan
+from opentelemetry.sdk.trace import _Span as Span
+from opentelemetry.sdk.trace.export import SpanExportResult
+from opentelemetry.trace import Link, SpanContext
+from opentelemetry.trace.status import Status, StatusCode
+from opentelemetry.util.types import Attributes
+from test_common.metrics import metric_points
+
+
+def make_spans(
+    count: int,
+    resource: Optional[Resource] = None,
+    attributes: Optional[Attributes] = None,
+) -> List[ReadableSpan]:
+    spans = []
+    for i in range(count):
+        span = Span(
+            name=f"span {i}",
+            context=SpanContext(
+                trace_id=0x6E0C63257DE34C92BF9EFCD03927272E,
+                span_id=i + 1,
+                is_remote=False,
+            ),
+            resource=resource or Resource({}),
+            attributes=attributes,
+        )
+        span._start_time = 1_000_000_000
+        span._end_time = 2_000_000_000
+        spans.append(span)
+    return spans
+
+
+def test_export(cloud_trace_fake: CloudTraceFake) -> None:
+    result = cloud_trace_fake.exporter.export(make_spans(3))
+
+    assert result == SpanExportResult.SUCCESS
+    (call,) = cloud_trace_fake.get_calls()
+    assert call.request.name == "projects/fakeproject"
+    assert [span.display_name.value for span in call.request.spans] == [
+        "span 0",
+        "span 1",
+        "span 2",
+    ]
+    assert "opentelemetry" in call.user_agent
+
+
+def test_export_retries_unavailable(cloud_trace_fake: CloudTraceFake) -> None:
+    cloud_trace_fake.handler.inject_errors(grpc.StatusCode.UNAVAILABLE)
+
+    result = cloud_trace_fake.exporter.export(make_spans(1))
+
+    assert result == SpanExportResult.SUCCESS
+    assert len(cloud_trace_fake.get_calls()) == 2
+    stats = cloud_trace_fake.handler.get_stats()
+    assert (stats.requests, stats.failed_requests, stats.spans) == (2, 1, 1)
+
+
+def test_export_does_not_retry_invalid_argument(
+    cloud_trace_fake: CloudTraceFake,
+) -> None:
+    cloud_trace_fake.handler.inject_errors(grpc.StatusCode.INVALID_ARGUMENT)
+
+    result = cloud_trace_fake.exporter.export(make_spans(1))
+
+    assert result == SpanExportResult.FAILURE
+    assert len(cloud_trace_fake.get_calls()) == 1
+
+
+def test_export_timeout(cloud_trace_fake: CloudTraceFake) -> None:
+    cloud_trace_fake.handler.latency = 0.5
+    exporter = cloud_trace_fake.make_exporter(export_timeout_millis=100)
+
+    start = time.monotonic()
+    result = exporter.export(make_spans(1))
+
+    assert result == SpanExportResult.FAILURE
+    assert time.monotonic() - start < 0.5
+
+
+def test_concurrent_requests(cloud_trace_fake: CloudTraceFake) -> None:
+    cloud_trace_fake.handler.latency = 0.5
+    exporter = cloud_trace_fake.make_exporter(max_concurrent_requests=4)
+
+    # split into 4 requests of at most 1000 spans
+    start = time.monotonic()
+    result = exporter.export(make_spans(4000))
+
+    assert result == SpanExportResult.SUCCESS
+    assert time.monotonic() - start < 4 * 0.5
+    assert len(cloud_trace_fake.get_calls()) == 4
+    assert cloud_trace_fake.handler.get_stats().spans == 4000
+
+
+def test_routes_spans_by_project(cloud_trace_fake: CloudTraceFake) -> None:
+    tenant_resource = Resource({"gcp.project_id": "tenant-a"})
+    spans = [
+        *make_spans(1),
+        *make_spans(1, resource=tenant_resource),
+        # the span's attribute takes precedence over the resource's
+        *make_spans(
+            1,
+            resource=tenant_resource,
+            attributes={"gcp.project_id": "tenant-b"},
+        ),
+        *make_spans(1, resource=tenant_resource),
+    ]
+
+    result = cloud_trace_fake.exporter.export(spans)
+
+    assert result == SpanExportResult.SUCCESS
+    requests = {
+        call.request.name: [span.name for span in call.request.spans]
+        for call in cloud_trace_fake.get_calls()
+    }
+    span_name = "projects/{}/traces/6e0c63257de34c92bf9efcd03927272e/spans/0000000000000001"
+    assert requests == {
+        "projects/fakeproject": [span_name.format("fakeproject")],
+        "projects/tenant-a": [span_name.format("tenant-a")] * 2,
+        "projects/tenant-b": [span_name.format("tenant-b")],
+    }
+
+
+def test_routes_projects_concurrently(
+    cloud_trace_fake: CloudTraceFake,
+) -> None:
+    cloud_trace_fake.handler.latency = 0.5
+    exporter = cloud_trace_fake.make_exporter(
+        max_concurrent_requests=4, group_spans_by_trace=True
+    )
+    # one trace spread over 4 projects
+    spans = [
+        span
+        for tenant in range(4)
+        for span in make_spans(
+            2, resource=Resource({"gcp.project_id": f"tenant-{tenant}"})
+        )
+    ]
+
+    start = time.monotonic()
+    result = exporter.export(spans)
+
+    assert result == SpanExportResult.SUCCESS
+    assert time.monotonic() - start < 4 * 0.5
+    assert sorted(
+        (call.request.name, len(call.request.spans))
+        for call in cloud_trace_fake.get_calls()
+    ) == [(f"projects/tenant-{tenant}", 2) for tenant in range(4)]
+
+
+def test_error_rate(cloud_trace_fake: CloudTraceFake) -> None:
+    cloud_trace_fake.handler.set_error_rate(
+        0.5, grpc.StatusCode.PERMISSION_DENIED, seed=1
+    )
+
+    results = [
+        cloud_trace_fake.exporter.export(make_spans(1)) for _ in range(20)
+    ]
+
+    stats = cloud_trace_fake.handler.get_stats()
+    assert results.count(SpanExportResult.FAILURE) == stats.failed_requests
+    assert 0 < stats.failed_requests < 20
+    assert stats.spans == 20 - stats.failed_requests
+
+
+def test_self_telemetry(cloud_trace_fake: CloudTraceFake) -> None:
+    reader = InMemoryMetricReader()
+    exporter = cloud_trace_fake.make_exporter(
+        meter_provider=MeterProvider(metric_readers=[reader])
+    )
+    spans = make_spans(2)
+    # 128 links are kept with up to 32 attributes each
+    spans[0]._links = tuple(
+        Link(spans[1].context, {str(i): i for i in range(33)})
+        for _ in range(130)
+    )
+    cloud_trace_fake.handler.inject_errors(grpc.StatusCode.PERMISSION_DENIED)
+
+    assert exporter.export(spans) == SpanExportResult.FAILURE
+    assert exporter.export(spans) == SpanExportResult.SUCCESS
+
+    points = metric_points(reader)
+    assert len(points.pop("gcp.exporter.export.duration")) == 1
+    ((_, request_size),) = points.pop("gcp.exporter.request.size")
+    assert request_size == sum(
+        call.request.ByteSize() for call in cloud_trace_fake.get_calls()
+    )
+    assert points == {
+        "gcp.exporter.request.items": [({}, 4)],
+        "gcp.exporter.request.failures": [
+            ({"rpc.grpc.status_code": "PERMISSION_DENIED"}, 1)
+        ],
+        "gcp.exporter.dropped": [
+            ({"type": "attribute"}, 2 * 128),
+            ({"type": "link"}, 2 * 2),
+        ],
+    }
+
+
+def make_varied_spans() -> List[ReadableSpan]:
+    resource = Resource(
+        {"cloud.platform": "gcp_compute_engine", "host.id": "1"}
+    )
+    spans = make_spans(
+        6,
+        resource=resource,
+        attributes={
+            "str": "value",
+            "": "empty key",
+            "日本語": "非ASCII",
+            "long": "x" * 300,
+            "int": 7,
+            "negative": -1,
+            "big": 2**62,
+            "float": 1.5,
+            "bool": False,
+            "sequence": ("a", "b"),
+            "invalid": {"not": "supported"},
+            "http.status_code": 200,
+        },
+    )
+    spans[1]._attributes = {str(i): i for i in range(40)}
+    spans[2]._status = Status(StatusCode.ERROR, "failed")
+    spans[3]._status = Status(StatusCode.OK)
+    spans[4]._links = tuple(
+        Link(spans[0].context, {str(i): i for i in range(33)})
+        for _ in range(130)
+    )
+    spans[5]._events = tuple(
+        Event(f"event {i}", {"a": i, "b": "x" * 300}, timestamp=i)
+        for i in range(40)
+    )
+    spans[5]._parent = spans[0].context
+    # routed to another project
+    spans += make_spans(2, resource=Resource({"gcp.project_id": "tenant"}))
+    return spans
+
+
+@pytest.mark.parametrize("resource_regex", [None, ".*"])
+@pytest.mark.parametrize("group_spans_by_trace", [False, True])
+def test_wire_encoder_matches_translation(
+    cloud_trace_fake: CloudTraceFake,
+    group_spans_by_trace: bool,
+    resource_regex: Optional[str],
+) -> None:
+    spans = make_varied_spans()
+    cloud_trace_fake.make_exporter(
+        group_spans_by_trace=group_spans_by_trace,
+        resource_regex=resource_regex,
+    ).export(spans)
+    expected = cloud_trace_fake.get_calls()
+    cloud_trace_fake.clear_calls()
+
+    result = cloud_trace_fake.make_exporter(
+        group_spans_by_trace=group_spans_by_trace,
+        resource_regex=resource_regex,
+        use_wire_encoder=True,
+    ).export(spans)
+
+    assert result == SpanExportResult.SUCCESS
+    calls = cloud_trace_fake.get_calls()
+    assert len(calls) == len(expected) == 2
+    for call, expected_call in zip(calls, expected):
+        assert call.request.SerializeToString(
+            deterministic=True
+        ) == expected_call.request.SerializeToString(deterministic=True)
+        assert call.user_agent == expected_call.user_agent
+
+
+def test_wire_encoder_splits_requests(
+    cloud_trace_fake: CloudTraceFake,
+) -> None:
+    exporter = cloud_trace_fake.make_exporter(use_wire_encoder=True)
+
+    result = exporter.export(make_spans(2500))
+
+    assert result == SpanExportResult.SUCCESS
+    assert [
+        len(call.request.spans) for call in cloud_trace_fake.get_calls()
+    ] == [1000, 1000, 500]
+
+
+def test_wire_encoder_retries_unavailable(
+    cloud_trace_fake: CloudTraceFake,
+) -> None:
+    exporter = cloud_trace_fake.make_exporter(use_wire_encoder=True)
+    cloud_trace_fake.handler.inject_errors(grpc.StatusCode.UNAVAILABLE)
+
+    result = exporter.export(make_spans(1))
+
+    assert result == SpanExportResult.SUCCESS
+    stats = cloud_trace_fake.handler.get_stats()
+    assert (stats.requests, stats.failed_requests, stats.spans) == (2, 1, 1)
+
+
+def test_wire_encoder_requires_grpc_transport() -> None:
+    with pytest.raises(ValueError, match="gRPC"):
+        CloudTraceSpanExporter(
+            "project", client=mock.Mock(), use_wire_encoder=True
+        )
+
+
+def test_wire_encoder_excludes_proto_plus() -> None:
+    with pytest.raises(ValueError, match="use_proto_plus"):
+        CloudTraceSpanExporter(
+            "project",
+            client=mock.Mock(),
+            use_wire_encoder=True,
+            use_proto_plus=True,
+        )
+
+
+@pytest.mark.parametrize(
+    "options, match",
+    [
+        ({"translation_processes": -1}, "negative"),
+        ({"translation_processes": 1, "use_proto_plus": True}, "proto_plus"),
+        ({"translation_processes": 1}, "gRPC"),
+    ],
+)
+def test_translation_processes_invalid(options, match) -> None:
+    with pytest.raises(ValueError, match=match):
+        CloudTraceSpanExporter("project", client=mock.Mock(), **options)
+
+
+@pytest.mark.parametrize("use_wire_encoder", [False, True])
+def test_translation_processes_match_translation(
+    cloud_trace_fake: CloudTraceFake, use_wire_encoder: bool
+) -> None:
+    spans = make_varied_spans()
+    cloud_trace_fake.make_exporter(group_spans_by_trace=True).export(spans)
+    expected = cloud_trace_fake.get_calls()
+    cloud_trace_fake.clear_calls()
+
+    result = cloud_trace_fake.make_exporter(
+        group_spans_by_trace=True,
+        use_wire_encoder=use_wire_encoder,
+        translation_processes=1,
+    ).export(spans)
+
+    assert result == SpanExportResult.SUCCESS
+    calls = cloud_trace_fake.get_calls()
+    assert len(calls) == len(expected) == 2
+    for call, expected_call in zip(calls, expected):
+        assert call.request.SerializeToString(
+            deterministic=True
+        ) == expected_call.request.SerializeToString(deterministic=True)
+
+
+def test_translation_processes_report_telemetry(
+    cloud_trace_fake: CloudTraceFake,
+) -> None:
+    reader = InMemoryMetricReader()
+    exporter = cloud_trace_fake.make_exporter(
+        meter_provider=MeterProvider(metric_readers=[reader]),
+        translation_processes=1,
+    )
+    spans = make_spans(2)
+    spans[0]._links = tuple(Link(spans[1].context) for _ in range(130))
+    links_truncated = _TRUNCATION_WARNINGS.counts().get(_LINKS_TRUNCATED, 0)
+
+    assert exporter.export(spans) == SpanExportResult.SUCCESS
+
+    points = metric_points(reader)
+    ((_, request_size),) = points["gcp.exporter.request.size"]
+    (call,) = cloud_trace_fake.get_calls()
+    assert request_size == call.request.ByteSize()
+    assert points["gcp.exporter.request.items"] == [({}, 2)]
+    assert points["gcp.exporter.dropped"] == [({"type": "link"}, 2)]
+    assert _TRUNCATION_WARNINGS.counts()[_LINKS_TRUNCATED] == (
+        links_truncated + 1
+    )
@@ -0,0 +1,207 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from opentelemetry.exporter.cloud_trace._spill_queue import SpillQueue, fcntl
+
+# long enough that the background replay never runs during a test
+REPLAY_INTERVAL = 3600
+
+
+class TestSpillQueue(unittest.TestCase):
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.directory = self._tmpdir.name
+        # slot of the first queue on the directory
+        self.slot_directory = os.path.join(self.directory, "0")
+        self.sent = []
+        self.send = mock.Mock(side_effect=self._send)
+        self.queues = []
+
+    def tearDown(self):
+        for queue in self.queues:
+            queue.shutdown()
+        self._tmpdir.cleanup()
+
+    def _send(self, payload):
+        self.sent.append(payload)
+        return True
+
+    def make_queue(self, max_bytes=1000, segment_max_bytes=100):
+        queue = SpillQueue(
+            self.directory,
+            self.send,
+            max_bytes,
+            REPLAY_INTERVAL,
+            segment_max_bytes=segment_max_bytes,
+        )
+        self.queues.append(queue)
+        return queue
+
+    def segment_files(self):
+        return sorted(
+            filename
+            for filename in os.listdir(self.slot_directory)
+            if filename.endswith(".spill")
+        )
+
+    def test_replay_in_order(self):
+        queue = self.make_queue()
+        payloads = [b"payload%d" % i for i in range(20)]
+        for payload in payloads:
+            queue.append(payload)
+
+        self.assertGreater(len(self.segment_files()), 1)
+        self.assertTrue(queue.replay())
+
+        self.assertEqual(self.sent, payloads)
+        self.assertEqual(self.segment_files(), [])
+        self.assertEqual(queue.total_bytes, 0)
+
+    def test_replay_stops_at_failure(self):
+        queue = self.make_queue()
+        for i in range(4):
+            queue.append(b"payload%d" % i)
+        self.send.side_effect = [True, False]
+
+        self.assertFalse(queue.replay())
+        self.send.side_effect = self._send
+        self.assertTrue(queue.replay())
+
+        self.assertEqual(self.sent, [b"payload1", b"payload2", b"payload3"])
+
+    def test_evicts_oldest_segments(self):
+        queue = self.make_queue(max_bytes=100, segment_max_bytes=50)
+        payloads = [b"x" * 12 + b"%d" % i for i in range(10)]
+
+        with self.assertLogs(level="WARNING"):
+            for payload in payloads:
+                queue.append(payload)
+
+        self.assertLessEqual(queue.total_bytes, 100)
+        self.assertLessEqual(
+            sum(
+                os.path.getsize(os.path.join(self.slot_directory, filename))
+                for filename in self.segment_files()
+            ),
+            100,
+        )
+        queue.replay()
+        self.assertEqual(self.sent, payloads[-len(self.sent) :])
+        self.assertLess(len(self.sent), len(payloads))
+
+    def test_drops_payload_larger_than_segment(self):
+        queue = self.make_queue()
+
+        with self.assertLogs(level="WARNING"):
+            queue.append(b"x" * 100)
+
+        self.assertEqual(queue.total_bytes, 0)
+
+    def test_reload_after_restart(self):
+        queue = self.make_queue()
+        queue.append(b"foo")
+        queue.append(b"bar")
+        queue.shutdown()
+
+        restarted = self.make_queue()
+        restarted.append(b"baz")
+        self.assertTrue(restarted.replay())
+
+        self.assertEqual(self.sent, [b"foo", b"bar", b"baz"])
+
+    def test_skips_torn_record(self):
+        queue = self.make_queue()
+        queue.append(b"foo")
+        queue.shutdown()
+        (filename,) = self.segment_files()
+        with open(
+            os.path.join(self.slot_directory, filename), "ab"
+        ) as segment:
+            segment.write(b"\x00\x00\x00\x10partial")
+
+        restarted = self.make_queue()
+        with self.assertLogs(level="WARNING"):
+            self.assertTrue(restarted.replay())
+
+        self.assertEqual(self.sent, [b"foo"])
+
+    def test_removes_stale_tmp_files(self):
+        queue = self.make_queue()
+        queue.append(b"foo")
+        queue.shutdown()
+        (filename,) = self.segment_files()
+        tmp_path = os.path.join(self.slot_directory, filename + ".tmp")
+        with open(tmp_path, "wb") as tmp:
+            tmp.write(b"partial")
+
+        restarted = self.make_queue()
+
+        self.assertFalse(os.path.exists(tmp_path))
+        self.assertTrue(restarted.replay())
+        self.assertEqual(self.sent, [b"foo"])
+
+    @unittest.skipIf(fcntl is None, "requires fcntl")
+    def test_shared_directory_uses_separate_slots(self):
+        first = self.make_queue()
+        second = self.make_queue()
+        first.append(b"foo")
+        second.append(b"bar")
+
+        self.assertNotEqual(first.directory, second.directory)
+        self.assertTrue(second.replay())
+        self.assertEqual(self.sent, [b"bar"])
+        self.assertTrue(first.replay())
+        self.assertEqual(self.sent, [b"bar", b"foo"])
+
+    @unittest.skipIf(fcntl is None, "requires fcntl")
+    def test_reuses_slot_released_by_shutdown(self):
+        first = self.make_queue()
+        self.make_queue()
+        first.append(b"foo")
+        first.shutdown()
+
+        restarted = self.make_queue()
+
+        self.assertEqual(restarted.directory, first.directory)
+        self.assertTrue(restarted.replay())
+        self.assertEqual(self.sent, [b"foo"])
+
+    def test_open_segment_error(self):
+        queue = self.make_queue()
+        shutil.rmtree(self.directory)
+
+        with self.assertLogs(level="WARNING"):
+            queue.append(b"foo")
+
+        self.assertEqual(queue.total_bytes, 0)
+
+    def test_background_replay(self):
+        replayed = mock.Mock()
+        queue = SpillQueue(self.directory, replayed, 1000, 0.01)
+        self.queues.append(queue)
+
+        queue.append(b"foo")
+
+        for _ in range(500):
+            if not self.segment_files():
+                break
+            queue._stop.wait(0.01)  # pylint: disable=protected-access
+        replayed.assert_called_once_with(b"foo")
+        self.assertEqual(self.segment_files(), [])
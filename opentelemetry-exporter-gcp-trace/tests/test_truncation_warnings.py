@@ -0,0 +1,144 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+from unittest import mock
+
+from opentelemetry.exporter.cloud_trace import (
+    MAX_NUM_LINKS,
+    CloudTraceSpanExporter,
+)
+from opentelemetry.exporter.cloud_trace._truncation_warnings import (
+    TruncationWarnings,
+    logger,
+)
+from opentelemetry.sdk.trace import _Span as Span
+from opentelemetry.trace import Link, SpanContext
+
+LOGGER = "opentelemetry.exporter.cloud_trace._truncation_warnings"
+
+
+class TestTruncationWarnings(unittest.TestCase):
+    def setUp(self):
+        self.now = 1000.0
+        patcher = mock.patch("time.monotonic", side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_first_truncation_logged_immediately(self):
+        warnings = TruncationWarnings(60)
+
+        with self.assertLogs(LOGGER, level="WARNING") as logs:
+            warnings.add("spans with more than 128 links")
+
+        self.assertEqual(len(logs.records), 1)
+        self.assertIn("1 spans with more than 128 links", logs.output[0])
+
+    def test_aggregated_within_interval(self):
+        warnings = TruncationWarnings(60)
+        with self.assertLogs(LOGGER, level="WARNING"):
+            warnings.add("spans with more than 128 links")
+
+        with mock.patch.object(logger, "warning") as warning:
+            for _ in range(1000):
+                warnings.add("spans with more than 128 links")
+            warnings.add("links with more than 32 attributes", 3)
+            self.now += 59
+        warning.assert_not_called()
+
+        self.now += 1
+        with self.assertLogs(LOGGER, level="WARNING") as logs:
+            warnings.add("spans with more than 128 links")
+
+        self.assertEqual(len(logs.records), 1)
+        self.assertIn("1001 spans with more than 128 links", logs.output[0])
+        self.assertIn("3 links with more than 32 attributes", logs.output[0])
+
+    def test_flush(self):
+        warnings = TruncationWarnings(60)
+        with self.assertLogs(LOGGER, level="WARNING"):
+            warnings.add("spans with more than 32 events")
+        warnings.add("spans with more than 32 events", 2)
+
+        with self.assertLogs(LOGGER, level="WARNING") as logs:
+            warnings.flush()
+        with mock.patch.object(logger, "warning") as warning:
+            warnings.flush()
+        warning.assert_not_called()
+
+        self.assertIn("2 spans with more than 32 events", logs.output[0])
+
+    def test_counts(self):
+        warnings = TruncationWarnings(60)
+        with self.assertLogs(LOGGER, level="WARNING"):
+            warnings.add("spans with more than 32 events")
+            warnings.add("spans with more than 32 events", 2)
+            warnings.add("events with more than 4 attributes")
+
+        self.assertEqual(
+            warnings.counts(),
+            {
+                "spans with more than 32 events": 3,
+                "events with more than 4 attributes": 1,
+            },
+        )
+
+    def test_hold_and_take(self):
+        warnings = TruncationWarnings(60)
+        warnings.hold()
+
+        with mock.patch.object(logger, "warning") as warning:
+            warnings.add("spans with more than 128 links")
+            warnings.add("spans with more than 128 links", 2)
+            self.now += 3600
+            warnings.add("links with more than 32 attributes")
+        warning.assert_not_called()
+
+        self.assertEqual(
+            warnings.take(),
+            {
+                "spans with more than 128 links": 3,
+                "links with more than 32 attributes": 1,
+            },
+        )
+        self.assertEqual(warnings.take(), {})
+
+    @mock.patch("opentelemetry.exporter.cloud_trace._create_default_client")
+    def test_exporter_warns_once_per_interval(self, _):
+        warnings = TruncationWarnings(60)
+        link = Link(SpanContext(trace_id=1, span_id=1, is_remote=False))
+        spans = [
+            Span(
+                name="span_name",
+                context=SpanContext(
+                    trace_id=1, span_id=span_id, is_remote=False
+                ),
+                links=[link] * (MAX_NUM_LINKS + 1),
+            )
+            for span_id in range(1, 101)
+        ]
+        exporter = CloudTraceSpanExporter("PROJECT", client=mock.Mock())
+
+        with mock.patch(
+            "opentelemetry.exporter.cloud_trace._TRUNCATION_WARNINGS",
+            warnings,
+        ), self.assertLogs(LOGGER, level="WARNING") as logs:
+            exporter.export(spans)
+            exporter.export(spans)
+
+        self.assertEqual(len(logs.records), 1)
+        self.assertEqual(
+            warnings.counts(),
+            {f"spans with more than {MAX_NUM_LINKS} links": 200},
+        )
@@ -0,0 +1,253 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Process-wide pool of gRPC channels shared by the Cloud Trace, Cloud Monitoring and Cloud
+Logging exporters, which all depend on this package. It requires the ``grpc`` extra of
+this package, which the exporters install.
+
+Exporters get a :class:`PooledChannel` for an endpoint and credentials. All exporters
+asking for the same key share one channel, and exporters using the Application Default
+Credentials share one set of them, so a process refreshes its access token once for
+every signal.
+
+:func:`compression_from_env` reads the exporters' compression environment variables.
+
+gRPC channels can't be used in a child process after ``fork()``, e.g. in gunicorn
+pre-fork workers. After a fork the child drops the channels it inherited, and every
+:class:`PooledChannel` transparently creates a new channel on its next call.
+"""
+
+import os
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+import google.auth
+import grpc
+from google.auth.credentials import Credentials
+
+_CLOUD_PLATFORM_SCOPE = "https://www.googleapis.com/auth/cloud-platform"
+
+_COMPRESSION_ALGORITHMS = {
+    "gzip": grpc.Compression.Gzip,
+    "deflate": grpc.Compression.Deflate,
+    "none": grpc.Compression.NoCompression,
+}
+
+
+def compression_from_env(variable: str) -> Optional[grpc.Compression]:
+    """Compression named by the environment variable ``variable``, one of ``gzip``,
+    ``deflate`` or ``none``. None if it isn't set.
+
+    Raises:
+        ValueError: the variable names an unknown compression.
+    """
+    name = os.environ.get(variable, "").strip().lower()
+    if not name:
+        return None
+    if name not in _COMPRESSION_ALGORITHMS:
+        raise ValueError(
+            "Invalid {} {!r}, must be one of {}".format(
+                variable, name, ", ".join(_COMPRESSION_ALGORITHMS)
+            )
+        )
+    return _COMPRESSION_ALGORITHMS[name]
+
+
+class ChannelPool:
+    """Keyed registry of gRPC channels, re-created in child processes after a fork."""
+
+    def __init__(self) -> None:
+        # Guards the channels. Channels are created while holding it, so it must not be
+        # taken by anything called from ``create``.
+        self._lock = threading.Lock()
+        self._credentials_lock = threading.Lock()
+        self._channels: Dict[Hashable, grpc.Channel] = {}
+        self._credentials: Optional[Credentials] = None
+        # Bumped whenever the pooled channels are dropped, so that PooledChannels know
+        # to look up their channel again.
+        self._generation = 0
+
+    def default_credentials(self) -> Credentials:
+        """Application Default Credentials with the ``cloud-platform`` scope, which
+        covers the Cloud Trace, Cloud Monitoring and Cloud Logging APIs. Loaded once and
+        shared by all exporters using the pool.
+
+        Resolve the credentials before :meth:`channel` and make them part of the key,
+        rather than from ``create``.
+        """
+        with self._credentials_lock:
+            if self._credentials is None:
+                self._credentials, _ = google.auth.default(
+                    scopes=[_CLOUD_PLATFORM_SCOPE]
+                )
+            return self._credentials
+
+    def channel(
+        self, key: Hashable, create: Callable[[], grpc.Channel]
+    ) -> "PooledChannel":
+        """Get the channel for ``key``, calling ``create`` if the pool has none yet.
+
+        Args:
+            key: Identifies the channel: the endpoint, the credentials and the channel
+                settings. Callers using the same key share the channel, so it must cover
+                everything ``create`` configures the channel with.
+            create: Creates the channel. Called again to replace it after a fork or
+                :meth:`clear`.
+        """
+        channel = PooledChannel(self, key, create)
+        # create it right away so that missing credentials are reported when the
+        # exporter is created, like without the pool
+        channel.resolve()
+        return channel
+
+    def _get(
+        self, key: Hashable, create: Callable[[], grpc.Channel]
+    ) -> Tuple[grpc.Channel, int]:
+        with self._lock:
+            channel = self._channels.get(key)
+            if channel is None:
+                channel = self._channels[key] = create()
+            return channel, self._generation
+
+    def clear(self) -> None:
+        """Close all pooled channels and forget the default credentials. Channels
+        handed out before are re-created on their next call."""
+        with self._lock:
+            channels = list(self._channels.values())
+            self._channels = {}
+            self._generation += 1
+        with self._credentials_lock:
+            self._credentials = None
+        for channel in channels:
+            channel.close()
+
+    def _after_fork_in_child(self) -> None:
+        # The lock may have been held by another thread at the time of the fork, and
+        # the inherited channels must not be used or even closed in the child. The
+        # credentials are plain Python objects and are kept.
+        self._lock = threading.Lock()
+        self._credentials_lock = threading.Lock()
+        self._channels = {}
+        self._generation += 1
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+
+class PooledChannel(grpc.Channel):
+    """:class:`grpc.Channel` delegating to the channel for its key in a
+    :class:`ChannelPool`, looking it up again after a fork.
+
+    Closing it does nothing since the channel is shared, see :meth:`ChannelPool.clear`.
+    """
+
+    def __init__(
+        self,
+        pool: ChannelPool,
+        key: Hashable,
+        create: Callable[[], grpc.Channel],
+    ):
+        self._pool = pool
+        self._key = key
+        self._create = create
+        self._channel: Optional[grpc.Channel] = None
+        self._generation = -1
+
+    def resolve(self) -> grpc.Channel:
+        """The pooled channel currently backing this channel."""
+        channel = self._channel
+        if channel is None or self._generation != self._pool.generation:
+            channel, self._generation = self._pool._get(
+                self._key, self._create
+            )
+            self._channel = channel
+        return channel
+
+    def subscribe(self, callback, try_to_connect=False):
+        self.resolve().subscribe(callback, try_to_connect)
+
+    def unsubscribe(self, callback):
+        self.resolve().unsubscribe(callback)
+
+    def unary_unary(self, method, *args, **kwargs):
+        return _PooledMultiCallable(self, "unary_unary", method, args, kwargs)
+
+    def unary_stream(self, method, *args, **kwargs):
+        return _PooledMultiCallable(self, "unary_stream", method, args, kwargs)
+
+    def stream_unary(self, method, *args, **kwargs):
+        return _PooledMultiCallable(self, "stream_unary", method, args, kwargs)
+
+    def stream_stream(self, method, *args, **kwargs):
+        return _PooledMultiCallable(
+            self, "stream_stream", method, args, kwargs
+        )
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+
+class _PooledMultiCallable:
+    """Multi-callable created from the pooled channel on first use, and again whenever
+    the pooled channel was replaced. GAPIC transports create their multi-callables once
+    and keep them, so they have to follow the channel too."""
+
+    def __init__(
+        self,
+        channel: PooledChannel,
+        kind: str,
+        method: str,
+        args: Any,
+        kwargs: Any,
+    ):
+        self._channel = channel
+        self._kind = kind
+        self._method = method
+        self._args = args
+        self._kwargs = kwargs
+        self._resolved_channel: Optional[grpc.Channel] = None
+        self._callable: Any = None
+
+    def _resolve(self) -> Any:
+        channel = self._channel.resolve()
+        if channel is not self._resolved_channel:
+            self._callable = getattr(channel, self._kind)(
+                self._method, *self._args, **self._kwargs
+            )
+            self._resolved_channel = channel
+        return self._callable
+
+    def __call__(self, *args, **kwargs):
+        return self._resolve()(*args, **kwargs)
+
+    def with_call(self, *args, **kwargs):
+        return self._resolve().with_call(*args, **kwargs)
+
+    def future(self, *args, **kwargs):
+        return self._resolve().future(*args, **kwargs)
+
+
+CHANNEL_POOL = ChannelPool()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(
+        after_in_child=CHANNEL_POOL._after_fork_in_child  # pylint: disable=protected-access
+    )
@@ -0,0 +1,42 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Lazily imported modules for the Cloud Trace, Cloud Monitoring and Cloud Logging
+exporters.
+
+Importing the Google Cloud client libraries, gRPC and google-auth takes hundreds of
+milliseconds, which adds to the cold start of e.g. Cloud Run and Cloud Functions even if
+nothing is exported yet. The exporters refer to them through :class:`LazyModule` so they
+are only imported once an exporter is created or used.
+"""
+
+import importlib
+from types import ModuleType
+from typing import Any
+
+
+class LazyModule(ModuleType):
+    """Placeholder for the module ``name``, imported on first attribute access.
+
+    The module's attributes are then copied to the placeholder, so that later accesses
+    are as fast as on the module itself. Attributes patched on the module afterwards,
+    e.g. with :func:`unittest.mock.patch`, aren't seen through the placeholder.
+    """
+
+    def __getattr__(self, attr: str) -> Any:
+        # only called for attributes not copied yet. Importing is thread-safe, and
+        # concurrent first accesses copy the same attributes.
+        module = importlib.import_module(self.__name__)
+        self.__dict__.update(vars(module))
+        return getattr(module, attr)
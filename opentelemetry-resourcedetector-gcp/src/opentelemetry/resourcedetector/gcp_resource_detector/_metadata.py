@@ -16,8 +16,6 @@ import logging
 from functools import lru_cache
 from typing import TypedDict, Union
 
-import requests
-
 _GCP_METADATA_URL = "http://metadata.google.internal/computeMetadata/v1/"
 _INSTANCE = "instance"
 _RECURSIVE_PARAMS = {"recursive": "true"}
@@ -62,6 +60,9 @@ def get_metadata() -> Metadata:
 
     Cached for the lifetime of the process.
     """
+    # imported here as importing requests is slow, see _lazy
+    import requests  # pylint: disable=import-outside-toplevel
+
     try:
         res = requests.get(
             f"{_GCP_METADATA_URL}",
@@ -78,6 +79,8 @@ def get_metadata() -> Metadata:
 
 @lru_cache(maxsize=None)
 def is_available() -> bool:
+    import requests  # pylint: disable=import-outside-toplevel
+
     try:
         requests.get(
             f"{_GCP_METADATA_URL}{_INSTANCE}/",
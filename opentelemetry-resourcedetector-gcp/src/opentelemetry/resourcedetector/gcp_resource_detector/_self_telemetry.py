@@ -0,0 +1,112 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Metrics the Cloud Trace, Cloud Monitoring and Cloud Logging exporters report about
+themselves when given a ``meter_provider``, e.g. to alert on an exporter falling behind
+before it drops data.
+
+All exporters report the same instruments, under a meter named after the exporter's
+package:
+
+* ``gcp.exporter.export.duration``: histogram of the duration of ``export()`` calls
+* ``gcp.exporter.request.size``: histogram of the serialized size of each request
+* ``gcp.exporter.request.items``: histogram of the spans, points or log entries in each
+  request, in the unit ``{span}``, ``{point}`` or ``{entry}``
+* ``gcp.exporter.request.failures``: requests failed, by ``rpc.grpc.status_code``
+* ``gcp.exporter.dropped``: items the exporter dropped or truncated, by ``type``, e.g.
+  span attributes over the Cloud Trace limit
+"""
+
+from typing import Optional
+
+from opentelemetry.metrics import MeterProvider
+
+# status code of failures that aren't gRPC errors, e.g. a request that wasn't sent
+_UNKNOWN_STATUS_CODE = "UNKNOWN"
+
+
+class ExporterTelemetry:
+    """Instruments an exporter records its own metrics with.
+
+    Args:
+        meter_provider: The user's MeterProvider to create the instruments with.
+        name: Name of the exporter's package, used as the meter name.
+        version: Version of the exporter's package.
+        item_unit: Unit of the items written by the exporter, e.g. ``{span}``.
+    """
+
+    def __init__(
+        self,
+        meter_provider: MeterProvider,
+        name: str,
+        version: str,
+        item_unit: str,
+    ):
+        meter = meter_provider.get_meter(name, version)
+        self._export_duration = meter.create_histogram(
+            "gcp.exporter.export.duration",
+            unit="s",
+            description="Duration of the exporter's export() calls",
+        )
+        self._request_size = meter.create_histogram(
+            "gcp.exporter.request.size",
+            unit="By",
+            description="Serialized size of the exporter's requests",
+        )
+        self._request_items = meter.create_histogram(
+            "gcp.exporter.request.items",
+            unit=item_unit,
+            description="Number of items written by each request",
+        )
+        self._request_failures = meter.create_counter(
+            "gcp.exporter.request.failures",
+            unit="{request}",
+            description="Number of the exporter's requests that failed",
+        )
+        self._dropped = meter.create_counter(
+            "gcp.exporter.dropped",
+            unit="{item}",
+            description="Number of items the exporter dropped",
+        )
+
+    def record_export(self, seconds: float) -> None:
+        self._export_duration.record(seconds)
+
+    def record_request(self, size: int, items: int) -> None:
+        self._request_size.record(size)
+        self._request_items.record(items)
+
+    def record_failure(self, ex: Optional[BaseException]) -> None:
+        """Count a failed request, by the gRPC status code of the error it failed with."""
+        self._request_failures.add(
+            1, {"rpc.grpc.status_code": _status_code(ex)}
+        )
+
+    def record_dropped(self, dropped_type: str, count: int) -> None:
+        if count:
+            self._dropped.add(count, {"type": dropped_type})
+
+
+def _status_code(ex: Optional[BaseException]) -> str:
+    # google.api_core raises RetryError with the last error as cause when the retries
+    # time out
+    cause = getattr(ex, "cause", None)
+    if isinstance(cause, BaseException):
+        ex = cause
+    # google.api_core exceptions have the code of the gRPC error they wrap, while
+    # grpc.RpcError has a code() method. google.api_core's ``code`` is an HTTP status.
+    code = getattr(ex, "grpc_status_code", None)
+    if code is None and callable(getattr(ex, "code", None)):
+        code = ex.code()  # type: ignore[union-attr]
+    return getattr(code, "name", _UNKNOWN_STATUS_CODE)
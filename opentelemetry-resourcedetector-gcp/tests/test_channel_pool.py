@@ -0,0 +1,160 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+from typing import Iterable
+from unittest.mock import Mock, patch
+
+import pytest
+
+grpc = pytest.importorskip("grpc")
+
+# pylint: disable=wrong-import-position
+from opentelemetry.resourcedetector.gcp_resource_detector._channel_pool import (  # noqa: E402
+    CHANNEL_POOL,
+    ChannelPool,
+    compression_from_env,
+)
+
+
+@pytest.fixture(name="pool")
+def fixture_pool() -> Iterable[ChannelPool]:
+    pool = ChannelPool()
+    yield pool
+    pool.clear()
+
+
+def make_channel() -> Mock:
+    return Mock(spec=grpc.Channel)
+
+
+def test_shares_channel_per_key(pool: ChannelPool) -> None:
+    create = Mock(side_effect=make_channel)
+
+    first = pool.channel("foo", create)
+    second = pool.channel("foo", create)
+    other = pool.channel("bar", create)
+
+    assert create.call_count == 2
+    assert first.resolve() is second.resolve()
+    assert other.resolve() is not first.resolve()
+
+
+def test_default_credentials_loaded_once(pool: ChannelPool) -> None:
+    credentials = Mock()
+    with patch(
+        "google.auth.default", return_value=(credentials, "project")
+    ) as default:
+        assert pool.default_credentials() is credentials
+        assert pool.default_credentials() is credentials
+
+    default.assert_called_once()
+
+
+def test_create_may_load_credentials(pool: ChannelPool) -> None:
+    def create() -> Mock:
+        pool.default_credentials()
+        return make_channel()
+
+    with patch("google.auth.default", return_value=(Mock(), "project")):
+        pool.channel("foo", create)
+
+
+def test_multi_callable_follows_channel(pool: ChannelPool) -> None:
+    channels = []
+
+    def create() -> Mock:
+        channels.append(make_channel())
+        return channels[-1]
+
+    channel = pool.channel("foo", create)
+    multi_callable = channel.unary_unary("/Service/Method", None, None)
+
+    multi_callable("request", timeout=1)
+    pool.clear()
+    multi_callable.with_call("request")
+
+    assert len(channels) == 2
+    channels[0].close.assert_called_once()
+    channels[0].unary_unary.return_value.assert_called_once_with(
+        "request", timeout=1
+    )
+    channels[1].unary_unary.assert_called_once_with(
+        "/Service/Method", None, None
+    )
+    channels[1].unary_unary.return_value.with_call.assert_called_once_with(
+        "request"
+    )
+
+
+def test_close_keeps_shared_channel(pool: ChannelPool) -> None:
+    channel = pool.channel("foo", make_channel)
+
+    channel.close()
+
+    channel.resolve().close.assert_not_called()
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires fork()")
+def test_recreated_after_fork() -> None:
+    created = []
+
+    def create() -> Mock:
+        created.append(os.getpid())
+        return make_channel()
+
+    channel = CHANNEL_POOL.channel(("test_recreated_after_fork",), create)
+    parent_channel = channel.resolve()
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        # child: report whether a new channel was created for this process
+        ok = channel.resolve() is not parent_channel and created[-1] == (
+            os.getpid()
+        )
+        os.write(write_fd, b"1" if ok else b"0")
+        os._exit(0)  # pylint: disable=protected-access
+
+    os.close(write_fd)
+    try:
+        assert os.read(read_fd, 1) == b"1"
+        # the parent keeps its channel
+        assert channel.resolve() is parent_channel
+        assert created == [os.getpid()]
+    finally:
+        os.close(read_fd)
+        os.waitpid(pid, 0)
+        CHANNEL_POOL.clear()
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        (None, None),
+        ("", None),
+        ("gzip", grpc.Compression.Gzip),
+        (" Deflate ", grpc.Compression.Deflate),
+        ("none", grpc.Compression.NoCompression),
+    ],
+)
+def test_compression_from_env(value, expected) -> None:
+    environ = {} if value is None else {"TEST_COMPRESSION": value}
+    with patch.dict(os.environ, environ):
+        assert compression_from_env("TEST_COMPRESSION") == expected
+
+
+def test_compression_from_env_invalid() -> None:
+    with patch.dict(os.environ, {"TEST_COMPRESSION": "brotli"}):
+        with pytest.raises(ValueError, match="TEST_COMPRESSION"):
+            compression_from_env("TEST_COMPRESSION")
@@ -0,0 +1,40 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import sys
+from unittest.mock import patch
+
+import pytest
+from opentelemetry.resourcedetector.gcp_resource_detector._lazy import (
+    LazyModule,
+)
+
+
+def test_imports_on_first_access() -> None:
+    with patch.dict(sys.modules):
+        sys.modules.pop("colorsys", None)
+        colorsys = LazyModule("colorsys")
+        assert "colorsys" not in sys.modules
+
+        assert colorsys.rgb_to_hsv(1.0, 0.0, 0.0) == (0.0, 1.0, 1.0)
+        assert "colorsys" in sys.modules
+        # copied so that later accesses don't go through __getattr__
+        assert "rgb_to_hsv" in vars(colorsys)
+
+
+def test_missing_attribute() -> None:
+    with pytest.raises(AttributeError):
+        LazyModule(
+            "colorsys"
+        ).does_not_exist  # pylint: disable=expression-not-assigned
@@ -0,0 +1,95 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+from opentelemetry.resourcedetector.gcp_resource_detector._self_telemetry import (
+    ExporterTelemetry,
+)
+from opentelemetry.sdk.metrics import MeterProvider
+from opentelemetry.sdk.metrics.export import InMemoryMetricReader
+from test_common.metrics import metric_points
+
+grpc = pytest.importorskip("grpc")
+
+
+class ApiCoreError(Exception):
+    # like google.api_core.exceptions.ServiceUnavailable
+    code = 503
+    grpc_status_code = grpc.StatusCode.UNAVAILABLE
+
+
+class RetryError(Exception):
+    # like google.api_core.exceptions.RetryError
+    def __init__(self, cause: Exception):
+        super().__init__()
+        self.cause = cause
+
+
+class RpcError(grpc.RpcError):
+    def code(self) -> grpc.StatusCode:
+        return grpc.StatusCode.PERMISSION_DENIED
+
+
+@pytest.fixture(name="reader")
+def fixture_reader() -> InMemoryMetricReader:
+    return InMemoryMetricReader()
+
+
+@pytest.fixture(name="telemetry")
+def fixture_telemetry(reader: InMemoryMetricReader) -> ExporterTelemetry:
+    return ExporterTelemetry(
+        MeterProvider(metric_readers=[reader]), "exporter", "1.0", "{span}"
+    )
+
+
+def test_records_exports_and_requests(
+    telemetry: ExporterTelemetry, reader: InMemoryMetricReader
+) -> None:
+    telemetry.record_export(0.25)
+    telemetry.record_request(1000, 10)
+    telemetry.record_request(500, 5)
+    telemetry.record_dropped("attribute", 3)
+    telemetry.record_dropped("link", 0)
+
+    assert metric_points(reader) == {
+        "gcp.exporter.export.duration": [({}, 0.25)],
+        "gcp.exporter.request.size": [({}, 1500)],
+        "gcp.exporter.request.items": [({}, 15)],
+        "gcp.exporter.dropped": [({"type": "attribute"}, 3)],
+    }
+
+
+@pytest.mark.parametrize(
+    "ex, expected",
+    [
+        (ApiCoreError(), "UNAVAILABLE"),
+        (RetryError(ApiCoreError()), "UNAVAILABLE"),
+        (RpcError(), "PERMISSION_DENIED"),
+        (ValueError(), "UNKNOWN"),
+        (None, "UNKNOWN"),
+    ],
+)
+def test_failures_by_status_code(
+    telemetry: ExporterTelemetry,
+    reader: InMemoryMetricReader,
+    ex: Exception,
+    expected: str,
+) -> None:
+    telemetry.record_failure(ex)
+
+    assert metric_points(reader) == {
+        "gcp.exporter.request.failures": [
+            ({"rpc.grpc.status_code": expected}, 1)
+        ]
+    }
@@ -0,0 +1,60 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import subprocess
+import sys
+from typing import Dict
+
+# Slow to import libraries that the exporters must only import once they are used
+HEAVY_MODULES = (
+    "google.api_core",
+    "google.auth",
+    "google.cloud",
+    "google.protobuf.timestamp_pb2",
+    "grpc",
+    "requests",
+)
+
+
+def import_times(module: str) -> Dict[str, int]:
+    """Import ``module`` in a new interpreter with ``python -X importtime`` and return
+    the cumulative import time in microseconds of every module it imported."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    times = {}
+    # lines look like "import time:   self [us] | cumulative | imported package"
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+def heavy_imports(module: str) -> Dict[str, int]:
+    """The modules in :data:`HEAVY_MODULES`, or their submodules, imported by
+    importing ``module``, with their import times."""
+    return {
+        name: cumulative
+        for name, cumulative in import_times(module).items()
+        if any(
+            name == heavy or name.startswith(heavy + ".")
+            for heavy in HEAVY_MODULES
+        )
+    }
@@ -0,0 +1,44 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from typing import Any, Dict, List, Tuple
+
+from opentelemetry.sdk.metrics.export import (
+    HistogramDataPoint,
+    InMemoryMetricReader,
+)
+
+
+def metric_points(
+    reader: InMemoryMetricReader,
+) -> Dict[str, List[Tuple[Dict[str, Any], Any]]]:
+    """Collect the metrics of ``reader`` as the attributes and value of the points of
+    each instrument, by instrument name. The value of histogram points is their sum."""
+    points: Dict[str, List[Tuple[Dict[str, Any], Any]]] = {}
+    metrics_data = reader.get_metrics_data()
+    for resource_metrics in (
+        metrics_data.resource_metrics if metrics_data else []
+    ):
+        for scope_metrics in resource_metrics.scope_metrics:
+            for metric in scope_metrics.metrics:
+                for point in metric.data.data_points:
+                    value = (
+                        point.sum
+                        if isinstance(point, HistogramDataPoint)
+                        else point.value  # type: ignore[union-attr]
+                    )
+                    points.setdefault(metric.name, []).append(
+                        (dict(point.attributes or {}), value)
+                    )
+    return points